@@ -1,19 +1,36 @@
 """Agent definitions for the multi-agent debate system."""
 
 import os
+from typing import Optional
+
 from crewai import Agent, LLM
 from config import DebateConfig
+from protocols import RoleStep, round_graph
+
 
+def create_llm(config: DebateConfig, role: Optional[str] = None) -> LLM:
+    """Create an LLM instance with proper Anthropic configuration (routed per role if given)."""
+    model_name = config.model_for(role) if role else config.model_name
+    temperature = config.temperature_for(role) if role else config.temperature
+    return anthropic_llm(model_name, temperature, config.api_base_url)
 
-def create_llm(config: DebateConfig) -> LLM:
-    """Create an LLM instance with proper Anthropic configuration."""
+
+def anthropic_llm(model_name: str, temperature: float, base_url: Optional[str] = None) -> LLM:
     return LLM(
-        model=f"anthropic/{config.model_name}",
-        temperature=config.temperature,
-        api_key=os.getenv("ANTHROPIC_API_KEY")
+        model=f"anthropic/{model_name}",
+        temperature=temperature,
+        api_key=os.getenv("ANTHROPIC_API_KEY"),
+        base_url=base_url,
     )
 
 
+def escalated_agent(agent: Agent, model_name: str) -> Agent:
+    """Copy of an agent running on a different model at the same temperature."""
+    escalated = agent.copy()
+    escalated.llm = anthropic_llm(model_name, agent.llm.temperature, agent.llm.base_url)
+    return escalated
+
+
 def create_researcher(config: DebateConfig) -> Agent:
     """Create a Researcher agent that gathers evidence and forms initial arguments."""
     return Agent(
@@ -25,7 +42,7 @@ def create_researcher(config: DebateConfig) -> Agent:
         sides of an argument and present balanced, evidence-based perspectives.""",
         verbose=config.verbose,
         allow_delegation=False,
-        llm=create_llm(config),
+        llm=create_llm(config, "Researcher"),
     )
 
 
@@ -41,7 +58,7 @@ def create_critic(config: DebateConfig) -> Agent:
         through rigorous scrutiny.""",
         verbose=config.verbose,
         allow_delegation=False,
-        llm=create_llm(config),
+        llm=create_llm(config, "Critic"),
     )
 
 
@@ -57,7 +74,7 @@ def create_synthesizer(config: DebateConfig) -> Agent:
         narratives from multiple perspectives.""",
         verbose=config.verbose,
         allow_delegation=False,
-        llm=create_llm(config),
+        llm=create_llm(config, "Synthesizer"),
     )
 
 
@@ -74,7 +91,7 @@ def create_judge(config: DebateConfig) -> Agent:
         consensus was not reached if the debate remains unresolved.""",
         verbose=config.verbose,
         allow_delegation=False,
-        llm=create_llm(config),
+        llm=create_llm(config, "Judge"),
     )
 
 
@@ -90,25 +107,65 @@ def create_devil_advocate(config: DebateConfig) -> Agent:
         all angles, no matter how uncomfortable.""",
         verbose=config.verbose,
         allow_delegation=False,
-        llm=create_llm(config),
+        llm=create_llm(config, "Devil's Advocate"),
+    )
+
+
+# Goal and backstory templates for roster roles without a dedicated factory
+STEP_AGENT_TEMPLATES = {
+    "research": (
+        "Research the topic: '{topic}' and build the strongest evidence-based case for your position",
+        """You are an expert researcher with deep knowledge in business,
+        technology, and organizational behavior. You find relevant data, case
+        studies, and trends, and argue your assigned position rigorously while
+        acknowledging the strongest opposing evidence.""",
+    ),
+    "critique": (
+        "Critically evaluate arguments on '{topic}', identifying weaknesses, gaps in evidence, and counterarguments",
+        """You are a sharp critical thinker who stress-tests arguments from your
+        own area of expertise. You spot unsupported claims and ask the questions
+        that others in the debate are not equipped to ask.""",
+    ),
+    "synthesis": (
+        "Integrate the perspectives on '{topic}' into a refined argument that incorporates valid critiques",
+        """You are a master at finding common ground between opposing
+        viewpoints and producing refined, nuanced arguments that acknowledge
+        complexity.""",
+    ),
+    "devil_advocate": (
+        "Challenge the emerging consensus on '{topic}' with contrarian viewpoints and unconsidered edge cases",
+        """You are a contrarian thinker who prevents groupthink by presenting
+        alternative perspectives, even unpopular ones.""",
+    ),
+}
+
+ROLE_FACTORIES = {
+    "Researcher": create_researcher,
+    "Critic": create_critic,
+    "Synthesizer": create_synthesizer,
+    "Devil's Advocate": create_devil_advocate,
+}
+
+
+def create_step_agent(config: DebateConfig, step: RoleStep) -> Agent:
+    """Create the agent for a round step: a built-in role, or one built from its kind and stance."""
+    if step.role in ROLE_FACTORIES and step.stance is None:
+        return ROLE_FACTORIES[step.role](config)
+    goal, backstory = STEP_AGENT_TEMPLATES[step.kind]
+    if step.stance:
+        focus = "position" if step.kind == "research" else "focus"
+        backstory = f"{backstory}\n        Your {focus}: {step.stance}"
+    return Agent(
+        role=step.role,
+        goal=goal.format(topic=config.topic),
+        backstory=backstory,
+        verbose=config.verbose,
+        allow_delegation=False,
+        llm=create_llm(config, step.role),
     )
 
 
 def get_debate_agents(config: DebateConfig) -> list[Agent]:
-    """Get the appropriate agents based on configuration."""
-    if config.num_agents == 2:
-        # Simplified debate: Researcher and Judge only
-        return [create_researcher(config), create_judge(config)]
-    elif config.num_agents == 4:
-        agents = [
-            create_researcher(config),
-            create_critic(config),
-            create_synthesizer(config),
-            create_judge(config),
-        ]
-        if config.include_devil_advocate:
-            # Replace Synthesizer with Devil's Advocate for role swap
-            agents[2] = create_devil_advocate(config)
-        return agents
-    else:
-        raise ValueError(f"num_agents must be 2 or 4, got {config.num_agents}")
+    """Get one agent per step of the config's round protocol, followed by the Judge."""
+    graph = round_graph(config)
+    return [create_step_agent(config, step) for step in graph.steps] + [create_judge(config)]
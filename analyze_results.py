@@ -1,15 +1,29 @@
 """Analyze debate results and extract key metrics."""
 
-import json
 import re
+import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 
+import numpy as np
 
-def extract_scores(verdict_text: str) -> Dict[str, int]:
+from config import RUBRIC_CRITERIA
+from results_store import list_results, read_header
+from convergence import analyze_convergence, format_curve
+
+
+# Word-boundary patterns, so e.g. "disagreement" does not count as "agree"
+CONVERGENCE_PATTERN = re.compile(r"\b(?:consensus|agree[sd]?|agreement|concluded|resolved)\b")
+NON_CONVERGENCE_PATTERN = re.compile(
+    r"\b(?:no consensus|lack of consensus|disagree(?:s|d|ment)?|unresolved|not resolved|loops?)\b"
+)
+
+
+def extract_scores(verdict_text: str, criteria: Optional[Iterable[str]] = None) -> Dict[str, int]:
     """Extract rubric scores from judge's verdict."""
     scores = {}
-    score_pattern = r"(Evidence|Feasibility|Risks|Clarity):\s*(\d+)/5"
+    names = "|".join(re.escape(c.title()) for c in (criteria or RUBRIC_CRITERIA))
+    score_pattern = rf"({names})[*_]*:[\s*_]*(\d+)/5"  # Also "**Evidence**: **4/5**"
 
     matches = re.findall(score_pattern, verdict_text, re.IGNORECASE)
     for criterion, score in matches:
@@ -18,27 +32,59 @@ def extract_scores(verdict_text: str) -> Dict[str, int]:
     return scores
 
 
+def extract_team_scores(verdict_text: str, teams: Iterable[str],
+                        criteria: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, int]]:
+    """Extract each team's rubric scores from a head-to-head verdict.
+
+    Section headers match in any case and with markdown around them, e.g.
+    "PRO SCORES:", "**Pro Scores:**" or "## CON SCORES".
+    """
+    names = "|".join(re.escape(team.upper()) for team in teams)
+    sections = re.split(rf"^[\s*_#>]*({names})[\s*_]+SCORES[\s*_]*(?::|$)", verdict_text,
+                        flags=re.MULTILINE | re.IGNORECASE)
+    # split() alternates text and captured team names: [before, team, section, team, section, ...]
+    return {
+        team.lower(): extract_scores(section, criteria)
+        for team, section in zip(sections[1::2], sections[2::2])
+    }
+
+
+def extract_winner(verdict_text: str, teams: Iterable[str]) -> Optional[str]:
+    """The team named on a head-to-head verdict's WINNER line ("tie", or None if missing)."""
+    names = "|".join(re.escape(team.upper()) for team in teams)
+    match = re.search(rf"WINNER[*_]*:\W*({names}|TIE)\b", verdict_text, re.IGNORECASE)
+    return match.group(1).lower() if match else None
+
+
+def result_scores(data: Dict[str, Any]) -> Dict[str, int]:
+    """A results file's headline scores.
+
+    Team debates are never re-parsed as a whole: the verdict holds one section
+    per team, and the last match would win. Unparsable team scores stay empty.
+    """
+    if "teams" in data:
+        return data.get("scores") or {}
+    return data.get("scores") or extract_scores(data["final_verdict"])
+
+
 def analyze_debate_file(filepath: Path) -> Dict[str, Any]:
     """Analyze a single debate result file."""
-    with open(filepath, "r") as f:
-        data = json.load(f)
+    # Only the header is needed; compressed transcripts are never decoded here
+    data = read_header(filepath)
 
     config = data["config"]
     verdict = data["final_verdict"]
 
-    # Extract scores
-    scores = extract_scores(verdict)
+    # Extract scores (team debates store the winning side's scores)
+    scores = result_scores(data)
 
     # Calculate average score
     avg_score = sum(scores.values()) / len(scores) if scores else 0
 
     # Check for convergence indicators
-    convergence_keywords = ["consensus", "agree", "concluded", "resolved"]
-    non_convergence_keywords = ["no consensus", "disagreement", "unresolved", "loop"]
-
     verdict_lower = verdict.lower()
-    converged = any(kw in verdict_lower for kw in convergence_keywords)
-    diverged = any(kw in verdict_lower for kw in non_convergence_keywords)
+    converged = CONVERGENCE_PATTERN.search(verdict_lower) is not None
+    diverged = NON_CONVERGENCE_PATTERN.search(verdict_lower) is not None
 
     convergence_status = "Converged" if converged and not diverged else \
                         "Diverged" if diverged else "Unclear"
@@ -47,11 +93,12 @@ def analyze_debate_file(filepath: Path) -> Dict[str, Any]:
         "filename": filepath.name,
         "config": config,
         "scores": scores,
+        "scores_unparsable": data.get("scores_unparsable", []),
         "average_score": round(avg_score, 2),
         "total_duration": round(data["total_duration"], 2),
-        "rounds": len(data["rounds"]),
+        "rounds": len(data["round_durations"]),
         "convergence": convergence_status,
-        "round_durations": [round(r["duration"], 2) for r in data["rounds"]],
+        "round_durations": [round(d, 2) for d in data["round_durations"]],
     }
 
     return analysis
@@ -71,6 +118,8 @@ def print_analysis(analysis: Dict[str, Any]):
     print(f"  Model: {config['model']}")
 
     print(f"\nScores (0-5):")
+    if analysis["scores_unparsable"]:
+        print(f"  Unparsable for: {', '.join(analysis['scores_unparsable'])}")
     for criterion, score in analysis["scores"].items():
         print(f"  {criterion.title()}: {score}/5")
     print(f"  Average: {analysis['average_score']}/5")
@@ -81,6 +130,9 @@ def print_analysis(analysis: Dict[str, Any]):
         print(f"  Round {i}: {duration}s")
 
     print(f"\nConvergence: {analysis['convergence']}")
+    if "convergence_curve" in analysis:
+        print(f"  Inter-agent similarity per round: {analysis['convergence_curve']}")
+        print(f"  Trend: {analysis['convergence_trend']}")
     print(f"{'='*80}\n")
 
 
@@ -120,19 +172,43 @@ def compare_experiments(analyses: list[Dict[str, Any]]):
 
     # Convergence
     print(f"{'Convergence':<25} | {a1['convergence']:<30} | {a2['convergence']:<30}")
+    print(f"{'Similarity Trend':<25} | {str(a1.get('convergence_trend', 'N/A')):<30} | {str(a2.get('convergence_trend', 'N/A')):<30}")
 
     print(f"{'='*80}\n")
 
 
+def print_parquet_summary(dataset_dir: Path):
+    """Print per-configuration summaries computed straight from the Parquet dataset."""
+    # pyarrow is optional, so the exporter is only imported when asked for
+    from export_parquet import read_dataset, summarize
+
+    table = read_dataset(dataset_dir)
+    print(f"\n{'='*80}")
+    print(f"PARQUET SUMMARY: {table.num_rows} debates in {dataset_dir}/")
+    print(f"{'='*80}\n")
+    print(f"{'Model':<26} | {'Agents':>6} | {'Rounds':>6} | {'Temp':>4} | {'DA':<3} | {'Runs':>4} | {'Avg Score':>9} | {'Duration (s)':>12}")
+    print(f"{'-'*26}-|-{'-'*6}-|-{'-'*6}-|-{'-'*4}-|-{'-'*3}-|-{'-'*4}-|-{'-'*9}-|-{'-'*12}")
+    for row in summarize(table).to_pylist():
+        avg = row["average_score_mean"]
+        print(f"{row['model']:<26} | {row['num_agents']:>6} | {row['num_rounds']:>6} | {row['temperature']:>4} | "
+              f"{'Yes' if row['include_devil_advocate'] else 'No':<3} | {row['file_count']:>4} | "
+              f"{avg if avg is None else round(avg, 2):>9} | {round(row['total_duration_mean'], 1):>12}")
+    print(f"{'='*80}\n")
+
+
 def main():
-    """Analyze all results in the results directory."""
+    """Analyze all results in the results directory (--convergence adds similarity curves)."""
+    if len(sys.argv) > 2 and sys.argv[1] == "--parquet":
+        print_parquet_summary(Path(sys.argv[2]))
+        return
+
     results_dir = Path("results")
 
     if not results_dir.exists():
         print("No results directory found. Run some debates first!")
         return
 
-    json_files = list(results_dir.glob("*.json"))
+    json_files = list_results(results_dir)
 
     if not json_files:
         print("No result files found in results/")
@@ -143,9 +219,17 @@ def main():
 
     print(f"\nFound {len(json_files)} result files\n")
 
+    # Transcript similarity for all debates at once (one vectorized pass). Opt-in, since it
+    # decompresses every transcript while everything else reads only the headers
+    curves = analyze_convergence(json_files) if "--convergence" in sys.argv[1:] else {}
+
     analyses = []
     for filepath in json_files:
         analysis = analyze_debate_file(filepath)
+        if filepath.name in curves:
+            result = curves[filepath.name]
+            analysis["convergence_curve"] = format_curve(result.curve)
+            analysis["convergence_trend"] = "n/a" if np.isnan(result.trend) else round(result.trend, 3)
         print_analysis(analysis)
         analyses.append(analysis)
 
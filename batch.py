@@ -0,0 +1,490 @@
+"""Offline batch execution of debate sweeps via a Message Batches-style API.
+
+All debates in a sweep advance in lock-step: every agent step that is ready
+in any unfinished debate (several per debate when its round protocol has
+parallel branches) is gathered into a single batch submission, the batch is
+polled until it ends, and the outputs are fed back into each debate's
+protocol. Sweep state is checkpointed after every submission so a run can be
+resumed if the process exits while a batch is still pending.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from dataclasses import asdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Optional
+
+from crewai import Agent, Task
+from dotenv import load_dotenv
+
+from config import DebateConfig
+from debate import DebateOrchestrator, DebateStep
+from metrics import DEBATES_IN_FLIGHT, ERRORS, RETRIES, record_call
+from transcript import Message
+
+
+API_URL = "https://api.anthropic.com"
+API_VERSION = "2023-06-01"
+BATCH_MAX_TOKENS = 4096
+STATE_DIR = Path("results") / "batch_state"
+# Settings that act on individual live calls, which a batch never makes
+UNSUPPORTED_FIELDS = ("hedge_percentile", "cascade_model")
+
+
+def render_prompt(agent: Agent, task: Task) -> tuple[str, str]:
+    """Render an agent/task pair into a (system, user) message pair."""
+    system = (
+        f"You are {agent.role}. {agent.backstory}\n"
+        f"Your personal goal is: {agent.goal}"
+    )
+    user = (
+        f"{task.description}\n\n"
+        f"This is the expected criteria for your final answer: {task.expected_output}\n"
+        "You MUST return the actual complete content as the final answer, not a summary."
+    )
+    return system, user
+
+
+class BatchClient:
+    """Minimal client for the Message Batches REST endpoints."""
+
+    def __init__(self, base_url: str = API_URL, api_key: Optional[str] = None):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY", "")
+
+    def _request(self, method: str, url: str, body: Optional[dict] = None) -> bytes:
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(url, data=data, method=method, headers={
+            "x-api-key": self.api_key,
+            "anthropic-version": API_VERSION,
+            "content-type": "application/json",
+        })
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.read()
+
+    def create(self, requests: list[dict]) -> dict:
+        """Submit a batch of message requests."""
+        url = f"{self.base_url}/v1/messages/batches"
+        return json.loads(self._request("POST", url, {"requests": requests}))
+
+    def retrieve(self, batch_id: str) -> dict:
+        """Fetch the current status of a batch."""
+        url = f"{self.base_url}/v1/messages/batches/{batch_id}"
+        return json.loads(self._request("GET", url))
+
+    def results(self, batch: dict) -> dict[str, dict]:
+        """Download the results of an ended batch, keyed by custom_id."""
+        url = batch.get("results_url") or f"{self.base_url}/v1/messages/batches/{batch['id']}/results"
+        lines = self._request("GET", url).decode().splitlines()
+        entries = [json.loads(line) for line in lines if line.strip()]
+        return {e["custom_id"]: e["result"] for e in entries}
+
+
+def result_text(result: dict) -> Optional[str]:
+    """Return the message text of a succeeded batch result, or None."""
+    if result.get("type") != "succeeded":
+        return None
+    content = result["message"].get("content", [])
+    return "".join(block.get("text", "") for block in content if block.get("type") == "text")
+
+
+class BatchSweep:
+    """Runs a set of debates in lock-step through a batch API."""
+
+    def __init__(self, state: dict, client: BatchClient, state_path: Path,
+                 max_attempts: int = 3):
+        self.state = state
+        self.client = client
+        self.state_path = state_path
+        self.max_attempts = max_attempts
+        self._start()
+
+    @classmethod
+    def from_configs(cls, configs: dict[str, DebateConfig], client: BatchClient,
+                     state_path: Optional[Path] = None) -> "BatchSweep":
+        """Start a new sweep over labelled debate configs."""
+        state = {
+            "created": datetime.now().isoformat(),
+            "debates": [
+                {"label": label, "config": asdict(config), "debate_id": uuid.uuid4().hex[:8], "steps": [],
+                 "attempts": 0}
+                for label, config in configs.items()
+            ],
+            "pending": None,
+            "batch_ids": [],
+        }
+        state_path = state_path or STATE_DIR / f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        return cls(state, client, state_path)
+
+    @classmethod
+    def resume(cls, state_path: Path, client: BatchClient) -> "BatchSweep":
+        """Reload a checkpointed sweep and fast-forward every debate."""
+        with open(state_path, "r") as f:
+            state = json.load(f)
+        return cls(state, client, state_path)
+
+    def _start(self) -> None:
+        """Create each debate's protocol generator and replay recorded outputs."""
+        self.orchestrators = []
+        self.generators = []
+        self.current = []
+        self.results = {}
+        for i, debate in enumerate(self.state["debates"]):
+            config = DebateConfig(**{**debate["config"], "save_results": False, "verbose": False})
+            for name in UNSUPPORTED_FIELDS:
+                if getattr(config, name) is not None:
+                    raise ValueError(f"Debate {debate['label']}: {name} is not supported in batch mode, "
+                                     "which has no live calls to hedge or escalate")
+            orchestrator = DebateOrchestrator(config, debate_id=debate.get("debate_id"))
+            steps = orchestrator.debate_steps()
+            self.orchestrators.append(orchestrator)
+            self.generators.append(steps)
+            self.current.append([])
+            self._advance(i, None)
+            # Outputs replayed on resume were already recorded in the evidence store
+            if orchestrator.evidence is not None:
+                orchestrator.evidence.replaying = True
+            for step in debate["steps"]:
+                self._advance(i, self._message(i, step))
+            if orchestrator.evidence is not None:
+                orchestrator.evidence.replaying = False
+
+    def _step(self, index: int, role: Optional[str]) -> DebateStep:
+        """A debate's outstanding step for a role (state files without roles have one per debate)."""
+        return next((s for s in self.current[index] if s.agent.role == role), self.current[index][0])
+
+    def _message(self, index: int, record: dict) -> Message:
+        """Build the transcript message for one of a debate's outstanding steps from a step record."""
+        step = self._step(index, record.get("role"))
+        return Message(
+            step.round, step.agent.role, record["output"], record.get("start", 0.0),
+            record["duration"], record.get("prompt_tokens", 0), record.get("completion_tokens", 0),
+        )
+
+    def _advance(self, index: int, message: Optional[Message]) -> None:
+        """Send a step's message into a debate and record the steps it starts (or its results)."""
+        if message is not None:
+            self.current[index] = [s for s in self.current[index] if s.agent.role != message.role]
+        try:
+            started = self.generators[index].send(message)
+        except StopIteration as stop:
+            self.current[index] = []
+            self.results[index] = stop.value
+            return
+        self.current[index].extend([started] if isinstance(started, DebateStep) else started)
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        tmp.replace(self.state_path)
+
+    def _submit(self) -> bool:
+        """Submit every outstanding step of every active debate as one batch."""
+        requests, custom_ids = [], {}
+        for i, steps in enumerate(self.current):
+            for j, step in enumerate(steps):
+                config = self.orchestrators[i].config
+                system, user = render_prompt(step.agent, step.task)
+                custom_id = f"d{i:04d}-s{len(self.state['debates'][i]['steps']) + j:02d}"
+                custom_ids[custom_id] = [i, step.agent.role]
+                # A debate budget may have capped this call below the batch default
+                max_tokens = min(BATCH_MAX_TOKENS, getattr(step.agent.llm, "max_tokens", None) or BATCH_MAX_TOKENS)
+                requests.append({
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": config.model_for(step.agent.role),
+                        "max_tokens": max_tokens,
+                        "temperature": config.temperature_for(step.agent.role),
+                        "system": system,
+                        "messages": [{"role": "user", "content": user}],
+                    },
+                })
+        if not requests:
+            return False
+
+        batch = self.client.create(requests)
+        self.state["pending"] = {
+            "batch_id": batch["id"],
+            "custom_ids": custom_ids,
+            "submitted_at": time.time(),
+        }
+        self.state["batch_ids"].append(batch["id"])
+        self._save_state()
+        print(f"Submitted batch {batch['id']} with {len(requests)} requests")
+        return True
+
+    def _wait(self, deadline: Optional[float], initial_delay: float, max_delay: float) -> Optional[dict]:
+        """Poll the pending batch with exponential backoff until it ends or the deadline passes."""
+        batch_id = self.state["pending"]["batch_id"]
+        delay = initial_delay
+        while True:
+            batch = self.client.retrieve(batch_id)
+            if batch["processing_status"] == "ended":
+                return batch
+            if deadline is not None and time.time() + delay > deadline:
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    def _apply(self, batch: dict) -> None:
+        """Feed a finished batch's outputs back into the debates."""
+        pending = self.state["pending"]
+        elapsed = time.time() - pending["submitted_at"]
+        results = self.client.results(batch)
+        for custom_id, target in pending["custom_ids"].items():
+            # Older state files map custom ids to a debate index only
+            index, role = target if isinstance(target, list) else (target, None)
+            debate = self.state["debates"][index]
+            step = self._step(index, role)
+            result = results.get(custom_id, {})
+            text = result_text(result)
+            if text is None:
+                # Failed or expired requests are retried in the next batch
+                ERRORS.inc(role=step.agent.role, error=result.get("type", "missing"))
+                RETRIES.inc(reason="batch")
+                debate["attempts"] += 1
+                if debate["attempts"] >= self.max_attempts:
+                    raise RuntimeError(f"Debate {debate['label']} failed {debate['attempts']} times in batch mode")
+                continue
+            debate["attempts"] = 0
+            usage = result["message"].get("usage", {})
+            record = {
+                "round": step.round,
+                "role": step.agent.role,
+                "output": text,
+                "start": pending["submitted_at"],
+                "duration": elapsed,
+                "prompt_tokens": usage.get("input_tokens", 0),
+                "completion_tokens": usage.get("output_tokens", 0),
+            }
+            debate["steps"].append(record)
+            record_call(step.agent.role, self.orchestrators[index].config.model_for(step.agent.role), elapsed, record)
+            self._advance(index, self._message(index, record))
+        self.state["pending"] = None
+        DEBATES_IN_FLIGHT.set(sum(bool(steps) for steps in self.current))
+        self._save_state()
+
+    def _finalize(self, index: int) -> dict:
+        """Rewrite timings from batch turnaround and save the debate results."""
+        debate = self.state["debates"][index]
+        results = self.results[index]
+        # Steps submitted in the same batch ran concurrently: count each batch's turnaround once
+        batches = {}
+        for s in debate["steps"]:
+            batches[(s["round"], s.get("start"))] = s["duration"]
+        for round_data in results["rounds"]:
+            round_data["duration"] = sum(d for (r, _), d in batches.items() if r == round_data["round"])
+        results["total_duration"] = sum(batches.values())
+        results["batch"] = {"batch_ids": self.state["batch_ids"], "state_file": str(self.state_path)}
+
+        orchestrator = self.orchestrators[index]
+        if debate["config"].get("save_results", True):
+            results["results_file"] = str(orchestrator._save_results(results))
+        return results
+
+    def run(self, max_wait: Optional[float] = None, initial_delay: float = 5.0,
+            max_delay: float = 60.0) -> Optional[dict[str, dict]]:
+        """Run the sweep to completion; return None if a batch is still pending at max_wait."""
+        deadline = time.time() + max_wait if max_wait is not None else None
+        while True:
+            if self.state["pending"] is None and not self._submit():
+                break
+            batch = self._wait(deadline, initial_delay, max_delay)
+            if batch is None:
+                print(f"Batch {self.state['pending']['batch_id']} still pending.")
+                print(f"Resume with: python batch.py resume {self.state_path}")
+                return None
+            self._apply(batch)
+
+        return {
+            debate["label"]: self._finalize(i)
+            for i, debate in enumerate(self.state["debates"])
+        }
+
+
+def stub_responder(params: dict) -> str:
+    """Default local-server response: a canned argument, or rubric scores for the Judge."""
+    prompt = params["messages"][-1]["content"]
+    if "SCORES:" in prompt:
+        return ("SCORES:\n- Evidence: 3/5\n- Feasibility: 3/5\n- Risks: 3/5\n- Clarity: 3/5\n\n"
+                "Verdict: consensus was reached on a balanced position.")
+    return f"[stub response from {params['model']}] {prompt[:200]}"
+
+
+class LocalBatchServer:
+    """In-process stand-in for the Message Batches API, for testing."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5,
+                 responder: Callable[[dict], str] = stub_responder):
+        self.latency = latency
+        self.responder = responder
+        self.batches = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _status(self, batch: dict) -> dict:
+        ended = time.time() >= batch["ready_at"]
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else len(batch["requests"]),
+                "succeeded": len(batch["requests"]) if ended else 0,
+                "errored": 0, "canceled": 0, "expired": 0,
+            },
+            "results_url": f"{self.url}/v1/messages/batches/{batch['id']}/results" if ended else None,
+        }
+
+    def _results(self, batch: dict) -> str:
+        lines = []
+        for request in batch["requests"]:
+            params = request["params"]
+            text = self.responder(params)
+            lines.append(json.dumps({
+                "custom_id": request["custom_id"],
+                "result": {"type": "succeeded", "message": {
+                    "id": f"msg_{uuid.uuid4().hex[:24]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": params["model"],
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "usage": {"input_tokens": len(params["messages"][-1]["content"]) // 4,
+                              "output_tokens": len(text) // 4},
+                }},
+            }))
+        return "\n".join(lines) + "\n"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, code: int, body: str, content_type: str = "application/json"):
+                payload = body.encode()
+                self.send_response(code)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/messages/batches":
+                    return self._send(404, json.dumps({"type": "error", "error": {"type": "not_found_error"}}))
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length))
+                batch = {
+                    "id": f"msgbatch_{uuid.uuid4().hex[:24]}",
+                    "requests": body["requests"],
+                    "ready_at": time.time() + server.latency,
+                }
+                with server.lock:
+                    server.batches[batch["id"]] = batch
+                self._send(200, json.dumps(server._status(batch)))
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                batch = server.batches.get(parts[3]) if len(parts) >= 4 else None
+                if batch is None:
+                    return self._send(404, json.dumps({"type": "error", "error": {"type": "not_found_error"}}))
+                if len(parts) == 5 and parts[4] == "results":
+                    return self._send(200, server._results(batch), "application/x-jsonl")
+                self._send(200, json.dumps(server._status(batch)))
+
+        return Handler
+
+    def start(self) -> "LocalBatchServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    """Run, resume or serve batch sweeps from the command line."""
+    from run_experiments import EXPERIMENTS, experiment_configs
+
+    parser = argparse.ArgumentParser(description="Offline batch execution of debate sweeps")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Start a new batch sweep")
+    run_p.add_argument("experiments", nargs="*", type=int, default=[1, 2])
+    resume_p = sub.add_parser("resume", help="Resume a checkpointed sweep")
+    resume_p.add_argument("state_file", type=Path)
+    for p in (run_p, resume_p):
+        p.add_argument("--base-url", default=API_URL, help="Batch API base URL")
+        p.add_argument("--local", action="store_true",
+                       help="Use an in-process stand-in batch server (not resumable; see serve)")
+        p.add_argument("--max-wait", type=float, help="Exit (resumable) after this many seconds")
+
+    serve_p = sub.add_parser("serve", help="Run the stand-in batch server")
+    serve_p.add_argument("--port", type=int, default=8765)
+    serve_p.add_argument("--latency", type=float, default=5.0)
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    if args.command == "serve":
+        server = LocalBatchServer(port=args.port, latency=args.latency)
+        print(f"Stand-in batch server listening on {server.url}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    if args.command == "resume" and args.local:
+        # A new in-process server has none of the batches the checkpoint is waiting on
+        parser.error("--local batches end with their process; start `batch.py serve`, then run and resume "
+                     "with --base-url http://127.0.0.1:PORT")
+    server = LocalBatchServer(latency=0.2).start() if args.local else None
+    client = BatchClient(server.url if server else args.base_url)
+    try:
+        if args.command == "resume":
+            sweep = BatchSweep.resume(args.state_file, client)
+        else:
+            configs = {}
+            for num in args.experiments:
+                if num not in EXPERIMENTS:
+                    print(f"Unknown experiment number: {num}")
+                    continue
+                for label, config in experiment_configs(num, verbose=False).items():
+                    configs[f"experiment_{num}/{label}"] = config
+            sweep = BatchSweep.from_configs(configs, client)
+
+        results = sweep.run(max_wait=args.max_wait, initial_delay=0.2 if server else 5.0)
+    finally:
+        if server:
+            server.stop()
+
+    if results is None and server:
+        # The in-process server's batches went with it
+        print("A --local sweep can't be resumed. To test resuming, run against "
+              "`python batch.py serve` with --base-url.")
+    if results is not None:
+        print(f"\nBatch sweep completed: {len(results)} debates, {len(sweep.state['batch_ids'])} batches")
+
+
+if __name__ == "__main__":
+    main()
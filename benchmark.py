@@ -0,0 +1,293 @@
+"""Benchmark orchestration overhead, scaling and analysis throughput.
+
+All debates run against MockBackend, so the numbers measure this codebase
+(prompt construction, CrewAI object setup, result handling) rather than the
+model. Results are written as JSON under benchmarks/ and can be compared
+across commits with --compare.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from config import DebateConfig
+from debate import DebateOrchestrator
+from mock_llm import MockBackend, MOCK_VERDICT
+from analyze_results import analyze_debate_file
+from results_store import list_results, write_results
+import generate_report
+
+
+OUTPUT_DIR = Path("benchmarks")
+
+
+def run_mock_debate(config: DebateConfig, backend: MockBackend) -> dict:
+    """Run one debate on the mock backend with console output discarded."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return DebateOrchestrator(config, backend=backend).run_debate()
+
+
+def mock_config(**overrides) -> DebateConfig:
+    return DebateConfig(**{"save_results": False, "verbose": False, **overrides})
+
+
+def bench_overhead(repeats: int) -> dict:
+    """Per-debate orchestration overhead on a zero-latency backend."""
+    results = {}
+    for label, overrides in {
+        "2_agents": dict(num_agents=2),
+        "4_agents": dict(num_agents=4),
+        "4_agents_devil_advocate": dict(num_agents=4, include_devil_advocate=True),
+    }.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run_mock_debate(mock_config(num_rounds=2, **overrides), MockBackend())
+            times.append(time.perf_counter() - start)
+        results[label] = {
+            "median_s": round(statistics.median(times), 5),
+            "min_s": round(min(times), 5),
+        }
+    return results
+
+
+def bench_rounds(max_rounds: int) -> dict:
+    """Debate time and peak memory as num_rounds grows, per agent count."""
+    results = {}
+    rounds = sorted({1, 2, 3, 5, 10, 15, max_rounds} & set(range(1, max_rounds + 1)))
+    for num_agents in (2, 4):
+        series = []
+        for num_rounds in rounds:
+            tracemalloc.start()
+            start = time.perf_counter()
+            run_mock_debate(mock_config(num_agents=num_agents, num_rounds=num_rounds), MockBackend())
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            series.append({
+                "num_rounds": num_rounds,
+                "duration_s": round(elapsed, 5),
+                "peak_memory_kb": round(peak / 1024, 1),
+            })
+        results[f"{num_agents}_agents"] = series
+    return results
+
+
+def bench_protocols(latency: float) -> dict:
+    """Round wall-clock per round protocol on a fixed-latency backend (should track graph depth)."""
+    results = {}
+    for label, overrides in {
+        "solo_2_agents": dict(num_agents=2),
+        "chain_4_agents": dict(num_agents=4),
+        "panel_5_agents": dict(num_agents=5),
+        "parallel_critique_5_agents": dict(num_agents=5, protocol="parallel_critique", include_devil_advocate=True),
+        "panel_7_agents": dict(num_agents=7),
+    }.items():
+        config = mock_config(num_rounds=2, **overrides)
+        orchestrator = DebateOrchestrator(config, backend=MockBackend(latency))
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            debate = orchestrator.run_debate()
+        results[label] = {
+            "steps_per_round": len(orchestrator.graph.steps),
+            "depth": orchestrator.graph.depth,
+            "round_s": round(statistics.mean(r["duration"] for r in debate["rounds"]), 3),
+        }
+    return results
+
+
+def bench_throughput(concurrency_levels: list[int], debates: int, latency: float) -> dict:
+    """Sweep throughput on a fixed-latency backend at several concurrency levels.
+
+    Orchestrators (mostly crewai agent setup) are built before the clock
+    starts and timed separately, so throughput measures only running debates.
+    """
+    results = {}
+    for workers in concurrency_levels:
+        start = time.perf_counter()
+        orchestrators = [
+            DebateOrchestrator(mock_config(num_agents=4, num_rounds=2), backend=MockBackend(latency))
+            for _ in range(debates)
+        ]
+        construction = time.perf_counter() - start
+        start = time.perf_counter()
+        # redirect_stdout is process-wide, so silence the whole pool at once
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(orchestrator.run_debate) for orchestrator in orchestrators]:
+                    future.result()
+        elapsed = time.perf_counter() - start
+        results[str(workers)] = {
+            "debates": debates,
+            "construction_s": round(construction, 3),
+            "duration_s": round(elapsed, 3),
+            "debates_per_s": round(debates / elapsed, 2),
+        }
+    return results
+
+
+def synthetic_result(rng: random.Random) -> dict:
+    """A results dict with the same shape and rough size as a real 4-agent debate."""
+    num_rounds = rng.choice([1, 2, 3])
+    body = "Evidence and counterpoints on automation of strategy work. " * 30
+    return {
+        "config": {
+            "topic": "Will agentic AI displace the need for MBA talent?",
+            "num_agents": 4,
+            "num_rounds": num_rounds,
+            "temperature": rng.choice([0.3, 0.7, 0.9]),
+            "model": "claude-3-haiku-20240307",
+            "agents": ["Researcher", "Critic", "Synthesizer", "Judge"],
+            "include_devil_advocate": False,
+        },
+        "rounds": [
+            {
+                "round": r,
+                "output": f"RESEARCHER:\n{body}\n\nCRITIC:\n{body}\n\nSYNTHESIZER:\n{body}",
+                "duration": rng.uniform(20, 60),
+            }
+            for r in range(1, num_rounds + 1)
+        ],
+        "final_verdict": MOCK_VERDICT,
+        "total_duration": rng.uniform(60, 200),
+        "timestamp": datetime(2026, 1, 1).isoformat(),
+    }
+
+
+def bench_analysis(sizes: list[int]) -> dict:
+    """Time analysis and report generation over synthetic archives in both results formats."""
+    results = {}
+    for results_format in ("json", "debate"):
+        for size in sizes:
+            results[f"{results_format}_{size}"] = _bench_archive(results_format, size)
+    return results
+
+
+def _bench_archive(results_format: str, size: int) -> dict:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        results_dir = Path(tmp) / "results"
+        results_dir.mkdir()
+        for i in range(size):
+            data = synthetic_result(rng)
+            if results_format == "json":
+                with open(results_dir / f"debate_4agents_{i:06d}.json", "w") as f:
+                    json.dump(data, f, indent=2)
+            else:
+                write_results(data, results_dir / f"debate_4agents_{i:06d}.debate")
+        disk_kb = sum(p.stat().st_size for p in results_dir.iterdir()) / 1024
+
+        start = time.perf_counter()
+        for filepath in list_results(results_dir):
+            analyze_debate_file(filepath)
+        analysis_s = time.perf_counter() - start
+
+        files = sorted(list_results(results_dir), reverse=True)
+        output_dir = Path(tmp) / "deliverables"
+        start = time.perf_counter()
+        generate_report.generate_deliverables(files, output_dir)
+        report_s = time.perf_counter() - start
+        # Second run over the unchanged archive should skip everything
+        start = time.perf_counter()
+        generate_report.generate_deliverables(files, output_dir)
+        report_warm_s = time.perf_counter() - start
+
+    return {
+        "disk_kb": round(disk_kb, 1),
+        "analysis_s": round(analysis_s, 4),
+        "report_s": round(report_s, 4),
+        "report_warm_s": round(report_warm_s, 4),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: Path) -> None:
+    """Print relative changes of every timing against a baseline benchmark file."""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+
+    def walk(new, old, path):
+        if isinstance(new, dict) and isinstance(old, dict):
+            for key in new:
+                if key in old:
+                    walk(new[key], old[key], f"{path}.{key}" if path else key)
+        elif isinstance(new, list) and isinstance(old, list):
+            for i, (n, o) in enumerate(zip(new, old)):
+                walk(n, o, f"{path}[{i}]")
+        elif isinstance(new, (int, float)) and isinstance(old, (int, float)) and old:
+            if path.endswith(("_s", "_kb")):
+                change = (new - old) / old * 100
+                # Rates (per_s) regress when they fall, timings and sizes when they grow
+                regressed = change < -10 if path.endswith("per_s") else change > 10
+                flag = "  <-- regression" if regressed else ""
+                print(f"  {path:<55} {old:>10} -> {new:>10} ({change:+.1f}%){flag}")
+
+    print(f"\nComparison against {baseline_path} ({baseline['commit']}):")
+    walk(current["benchmarks"], baseline["benchmarks"], "")
+
+
+def main():
+    """Run the benchmark suite and save results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Per-call latency (s) of the mock backend in throughput runs")
+    parser.add_argument("--compare", type=Path, help="Baseline benchmark JSON to compare against")
+    args = parser.parse_args()
+
+    if args.quick:
+        repeats, max_rounds, levels, debates, sizes = 3, 5, [1, 4], 8, [10, 100]
+    else:
+        repeats, max_rounds, levels, debates, sizes = 10, 20, [1, 4, 16, 64], 64, [10, 100, 1000, 10000]
+
+    benchmarks = {}
+    print("Benchmarking orchestration overhead...")
+    benchmarks["overhead"] = bench_overhead(repeats)
+    print("Benchmarking round/agent scaling and peak memory...")
+    benchmarks["rounds"] = bench_rounds(max_rounds)
+    print("Benchmarking round protocols...")
+    benchmarks["protocols"] = bench_protocols(args.latency)
+    print("Benchmarking sweep throughput...")
+    benchmarks["throughput"] = bench_throughput(levels, debates, args.latency)
+    print("Benchmarking analysis and report generation...")
+    benchmarks["analysis"] = bench_analysis(sizes)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "quick": args.quick,
+        "mock_latency": args.latency,
+        "benchmarks": benchmarks,
+    }
+
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    filepath = OUTPUT_DIR / f"bench_{report['commit']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filepath, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(benchmarks, indent=2))
+    print(f"\n✓ Benchmark results saved to: {filepath}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Per-debate wall-clock, token and cost budgets.
+
+A DebateBudget tracks a debate's running usage against the limits in its
+DebateConfig and always holds back a reserve for the final judgment (the
+judge's prompt is the whole debate history, plus room for the verdict). To
+stay inside the limits the orchestrator asks it to:
+
+- cap ``max_tokens`` for each agent call to what the budget can still afford
+- shorten the previous round's context, or the judge's history, when it no
+  longer fits
+- skip the remaining rounds when another round plus the reserve would not fit
+
+The first round always runs. Every decision is recorded and reported in the
+results under "budget".
+"""
+
+import time
+from typing import Optional
+
+from config import DebateConfig, estimate_cost
+from transcript import Message
+
+
+CHARS_PER_TOKEN = 4  # rough estimate for English prose
+DEFAULT_COMPLETION_TOKENS = 4096
+MIN_COMPLETION_TOKENS = 256
+JUDGE_COMPLETION_TOKENS = 1024
+JUDGE_PROMPT_OVERHEAD_CHARS = 2000  # judge instructions and rubric around the history
+JUDGE_TIME_FACTOR = 1.5  # judge calls read the whole history, so run longer than a typical step
+TRUNCATION_MARK = "\n\n[... shortened to fit the debate budget ...]\n\n"
+
+
+def estimate_tokens(chars: int) -> int:
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def shorten(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of text within roughly max_tokens."""
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    half = max(0, (max_chars - len(TRUNCATION_MARK)) // 2)
+    return text[:half] + TRUNCATION_MARK + (text[-half:] if half else "")
+
+
+class DebateBudget:
+    """Running usage of one debate against its wall-clock, token and cost limits."""
+
+    def __init__(self, model_name: str, max_wall_clock: Optional[float] = None,
+                 max_tokens: Optional[int] = None, max_cost: Optional[float] = None,
+                 judge_model: Optional[str] = None):
+        self.model_name = model_name
+        self.judge_model = judge_model or model_name
+        self.max_wall_clock = max_wall_clock
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.start = time.time()
+        self.tokens = 0
+        self.cost = 0.0
+        self.completion_tokens = 0
+        self.call_time = 0.0
+        self.max_step_duration = 0.0
+        self.history_chars = 0
+        self.rounds = []  # (tokens, cost, duration, history_chars) added by each finished round
+        self._round_start = (0, 0.0, 0.0, 0)
+        self.decisions = []
+
+    @classmethod
+    def from_config(cls, config: DebateConfig) -> Optional["DebateBudget"]:
+        """A budget for the config's limits, or None if it sets none."""
+        if config.max_wall_clock is None and config.max_tokens is None and config.max_cost is None:
+            return None
+        return cls(config.model_name, config.max_wall_clock, config.max_tokens, config.max_cost,
+                   judge_model=config.model_for("Judge"))
+
+    def start_clock(self) -> None:
+        self.start = time.time()
+
+    def elapsed(self) -> float:
+        return time.time() - self.start
+
+    def record(self, message: Message, model_name: Optional[str] = None, cost: Optional[float] = None) -> None:
+        """Add one finished agent call (made on model_name, unless its cost is given) to the running usage."""
+        self.tokens += message.prompt_tokens + message.completion_tokens
+        if cost is None:
+            cost = estimate_cost(model_name or self.model_name, message.prompt_tokens, message.completion_tokens)
+        self.cost += cost
+        self.completion_tokens += message.completion_tokens
+        self.call_time += message.duration
+        self.max_step_duration = max(self.max_step_duration, message.duration)
+        if message.round is not None:
+            # Role header plus text, as rendered into the judge's history
+            self.history_chars += len(message.role) + len(message.text) + 4
+
+    def start_round(self) -> None:
+        self._round_start = (self.tokens, self.cost, self.elapsed(), self.history_chars)
+
+    def finish_round(self) -> None:
+        tokens, cost, elapsed, history = self._round_start
+        self.rounds.append((self.tokens - tokens, self.cost - cost, self.elapsed() - elapsed,
+                            self.history_chars - history))
+
+    def decide(self, action: str, reason: str, **detail) -> dict:
+        decision = {"action": action, "reason": reason, "elapsed": round(self.elapsed(), 2),
+                    "tokens": self.tokens, "cost": round(self.cost, 6), **detail}
+        self.decisions.append(decision)
+        return decision
+
+    def judgment_reserve(self, history_chars: Optional[int] = None) -> tuple[int, float, float]:
+        """(tokens, cost, seconds) held back for the final judgment."""
+        chars = self.history_chars if history_chars is None else history_chars
+        prompt = estimate_tokens(chars + JUDGE_PROMPT_OVERHEAD_CHARS)
+        return (
+            prompt + JUDGE_COMPLETION_TOKENS,
+            estimate_cost(self.judge_model, prompt, JUDGE_COMPLETION_TOKENS),
+            self.max_step_duration * JUDGE_TIME_FACTOR,
+        )
+
+    def _token_price(self, model_name: Optional[str] = None) -> float:
+        """USD per token of output that is later re-read as judge input."""
+        return estimate_cost(model_name or self.model_name, 0, 1) + estimate_cost(self.judge_model, 1, 0)
+
+    def completion_cap(self, prompt_chars: int, default: Optional[int] = None,
+                       model_name: Optional[str] = None) -> tuple[int, Optional[str]]:
+        """Largest max_tokens the next non-judge call can afford, and the binding limit.
+
+        Each output token is paid for twice: once as output, and again when the
+        judge reads it as history.
+        """
+        default = default or DEFAULT_COMPLETION_TOKENS
+        prompt = estimate_tokens(prompt_chars)
+        reserve_tokens, reserve_cost, reserve_time = self.judgment_reserve()
+        caps = {None: default}
+        if self.max_tokens is not None:
+            caps["max_tokens"] = (self.max_tokens - self.tokens - prompt - reserve_tokens) // 2
+        price = self._token_price(model_name)
+        if self.max_cost is not None and price:
+            affordable = self.max_cost - self.cost - estimate_cost(model_name or self.model_name, prompt, 0) - reserve_cost
+            caps["max_cost"] = int(affordable / price)
+        if self.max_wall_clock is not None and self.call_time > 0:
+            # Output length is what an agent call's latency scales with
+            rate = self.completion_tokens / self.call_time
+            caps["max_wall_clock"] = int((self.max_wall_clock - self.elapsed() - reserve_time) * rate)
+        limit = min(caps, key=caps.get)
+        return max(MIN_COMPLETION_TOKENS, caps[limit]), limit
+
+    def context_limit(self) -> Optional[int]:
+        """Token allowance for carried-over context, or None if the budget has no token/cost limit."""
+        limits = []
+        reserve_tokens, reserve_cost, _ = self.judgment_reserve()
+        if self.max_tokens is not None:
+            limits.append(self.max_tokens - self.tokens - reserve_tokens)
+        if self.max_cost is not None and self._token_price():
+            limits.append(int((self.max_cost - self.cost - reserve_cost) / self._token_price()))
+        if not limits:
+            return None
+        # Leave at least half of what remains for the outputs the context produces
+        return max(MIN_COMPLETION_TOKENS, min(limits) // 2)
+
+    def round_blocker(self) -> Optional[str]:
+        """Why another round would break the budget (None if it fits).
+
+        The estimate for the next round is the average of the rounds so far,
+        with the judgment reserve grown by that round's share of history.
+        """
+        if not self.rounds:
+            return None
+        n = len(self.rounds)
+        tokens, cost, duration, history = (sum(r[i] for r in self.rounds) / n for i in range(4))
+        reserve_tokens, reserve_cost, reserve_time = self.judgment_reserve(self.history_chars + int(history))
+        if self.max_tokens is not None and self.tokens + tokens + reserve_tokens > self.max_tokens:
+            return "max_tokens"
+        if self.max_cost is not None and self.cost + cost + reserve_cost > self.max_cost:
+            return "max_cost"
+        if self.max_wall_clock is not None and self.elapsed() + duration + reserve_time > self.max_wall_clock:
+            return "max_wall_clock"
+        return None
+
+    def history_limit(self) -> Optional[int]:
+        """Token allowance for the judge's history if the full history no longer fits."""
+        limits = []
+        prompt_overhead = estimate_tokens(JUDGE_PROMPT_OVERHEAD_CHARS)
+        if self.max_tokens is not None:
+            limits.append(self.max_tokens - self.tokens - JUDGE_COMPLETION_TOKENS - prompt_overhead)
+        input_price = estimate_cost(self.judge_model, 1, 0)
+        if self.max_cost is not None and input_price:
+            spare = self.max_cost - self.cost - estimate_cost(self.judge_model, prompt_overhead, JUDGE_COMPLETION_TOKENS)
+            limits.append(int(spare / input_price))
+        if not limits or min(limits) >= estimate_tokens(self.history_chars):
+            return None
+        # The verdict must still be produced, so some history is always kept
+        return max(MIN_COMPLETION_TOKENS, min(limits))
+
+    def report(self) -> dict:
+        return {
+            "limits": {
+                "max_wall_clock": self.max_wall_clock,
+                "max_tokens": self.max_tokens,
+                "max_cost": self.max_cost,
+            },
+            "used": {
+                "wall_clock": round(self.elapsed(), 2),
+                "tokens": self.tokens,
+                "cost": round(self.cost, 6),
+            },
+            "decisions": self.decisions,
+        }
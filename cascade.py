@@ -0,0 +1,196 @@
+"""Cheap-first model cascade with escalation on failed output checks.
+
+With ``DebateConfig(cascade_model=...)`` every role that is not already
+routed to the cascade model first runs on its own (cheaper) model. The
+output gets a quick check and the call is re-run on the cascade model only
+if the check fails:
+
+- ``short``: a debate output shorter than ``cascade_min_chars``
+- ``unparsable_scores``: a judge verdict missing any rubric score
+- ``low_confidence``: a self-reported confidence below
+  ``cascade_min_confidence`` (debate roles are asked to end with one; the
+  line is stripped before the output reaches the transcript)
+
+The report gives per-role escalation rates and what escalation cost in
+latency and spend, next to what running every call on the cascade model
+would have cost, so routings can be compared on price against score
+stability.
+"""
+
+import re
+import threading
+import time
+import weakref
+from collections import Counter, defaultdict
+from typing import Optional
+
+from crewai import Agent, Task
+
+from agents import escalated_agent
+from analyze_results import extract_scores
+from config import DebateConfig, RUBRIC_CRITERIA, estimate_cost
+from tasks import TaskCall
+
+
+CONFIDENCE_INSTRUCTION = (
+    "\n\n        End your response with a final line 'CONFIDENCE: N/5' rating how"
+    " confident you are in it (0 = guessing, 5 = certain)."
+)
+CONFIDENCE_PATTERN = re.compile(r"\n?[ \t*]*CONFIDENCE:\s*(\d)\s*/\s*5[ \t*.]*\s*$", re.IGNORECASE)
+
+
+def split_confidence(text: str) -> tuple[str, Optional[int]]:
+    """Remove a trailing CONFIDENCE line and return (text, confidence or None)."""
+    match = CONFIDENCE_PATTERN.search(text)
+    if match is None:
+        return text, None
+    return text[:match.start()].rstrip(), int(match.group(1))
+
+
+def call_cost(model_name: str, usage: dict) -> float:
+    """Estimated spend of one call (replayed calls are free)."""
+    if usage.get("cached"):
+        return 0.0
+    return estimate_cost(model_name, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
+
+def add_usage(first: dict, second: dict) -> dict:
+    usage = {key: first.get(key, 0) + second.get(key, 0)
+             for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+    if first.get("cached") and second.get("cached"):
+        usage["cached"] = True
+    return usage
+
+
+class CascadePolicy:
+    """Runs each role on its routed model and escalates failed outputs to a stronger one."""
+
+    def __init__(self, model_name: str, min_chars: int = 500, min_confidence: int = 3):
+        self.model_name = model_name
+        self.min_chars = min_chars
+        self.min_confidence = min_confidence
+        # agent -> escalated copy; weak, so a sweep-wide policy doesn't keep finished debates' agents alive
+        self.escalated = weakref.WeakKeyDictionary()
+        self.calls = Counter()
+        self.escalations = Counter()
+        self.reasons = defaultdict(Counter)
+        self.first_latency = defaultdict(float)
+        self.added_latency = defaultdict(float)
+        self.first_cost = defaultdict(float)
+        self.added_cost = defaultdict(float)
+        self.strong_only_cost = defaultdict(float)
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: DebateConfig) -> "CascadePolicy":
+        return cls(config.cascade_model, config.cascade_min_chars, config.cascade_min_confidence)
+
+    def applies(self, model_name: str) -> bool:
+        return model_name != self.model_name
+
+    def check(self, role: str, text: str, confidence: Optional[int]) -> Optional[str]:
+        """Why an output should be escalated (None if it passes)."""
+        if role == "Judge":
+            if len(extract_scores(text)) < len(RUBRIC_CRITERIA):
+                return "unparsable_scores"
+            return None
+        if len(text.strip()) < self.min_chars:
+            return "short"
+        if confidence is not None and confidence < self.min_confidence:
+            return "low_confidence"
+        return None
+
+    def _escalated(self, agent: Agent) -> Agent:
+        with self.lock:
+            strong = self.escalated.get(agent)
+            if strong is None:
+                strong = self.escalated[agent] = escalated_agent(agent, self.model_name)
+        # Carry over any per-call cap set on the routed agent (e.g. by a debate budget)
+        strong.llm.max_tokens = getattr(agent.llm, "max_tokens", strong.llm.max_tokens)
+        return strong
+
+    def run(self, agent: Agent, task: Task, model_name: str, call: TaskCall) -> tuple[str, dict]:
+        """Run a task call on the routed model, re-running it on the cascade model if its output fails."""
+        role = agent.role
+        if role != "Judge":
+            task = Task(description=task.description + CONFIDENCE_INSTRUCTION,
+                        expected_output=task.expected_output, agent=agent)
+        start = time.time()
+        text, usage = call(agent, task)
+        first_latency = time.time() - start
+        text, confidence = split_confidence(text)
+        reason = self.check(role, text, confidence)
+        first_cost = call_cost(model_name, usage)
+        # What this call would have cost had it run on the cascade model directly
+        strong_only_cost = call_cost(self.model_name, usage)
+
+        added_latency = added_cost = 0.0
+        if reason is not None:
+            strong = self._escalated(agent)
+            strong_task = Task(description=task.description, expected_output=task.expected_output, agent=strong)
+            start = time.time()
+            strong_text, strong_usage = call(strong, strong_task)
+            added_latency = time.time() - start
+            added_cost = strong_only_cost = call_cost(self.model_name, strong_usage)
+            text = split_confidence(strong_text)[0]
+            # The whole first attempt was thrown away
+            retry_time = usage.get("retry_time", 0.0) + first_latency + strong_usage.get("retry_time", 0.0)
+            usage = {**add_usage(usage, strong_usage), "retry_time": retry_time}
+
+        with self.lock:
+            self.calls[role] += 1
+            self.first_latency[role] += first_latency
+            self.first_cost[role] += first_cost
+            self.strong_only_cost[role] += strong_only_cost
+            if reason is not None:
+                self.escalations[role] += 1
+                self.reasons[role][reason] += 1
+                self.added_latency[role] += added_latency
+                self.added_cost[role] += added_cost
+        usage["cost"] = first_cost + added_cost
+        return text, usage
+
+    def report(self) -> dict:
+        """Per-role escalation rate, reasons, and latency and cost impact."""
+        with self.lock:
+            roles = {}
+            for role, calls in self.calls.items():
+                roles[role] = {
+                    "calls": calls,
+                    "escalations": self.escalations[role],
+                    "escalation_rate": round(self.escalations[role] / calls, 3),
+                    "reasons": dict(self.reasons[role]),
+                    "mean_latency": round(self.first_latency[role] / calls, 2),
+                    "added_latency": round(self.added_latency[role], 2),
+                    "cost": round(self.first_cost[role] + self.added_cost[role], 6),
+                    "added_cost": round(self.added_cost[role], 6),
+                    "strong_only_cost": round(self.strong_only_cost[role], 6),
+                }
+            calls = sum(self.calls.values())
+            escalations = sum(self.escalations.values())
+            return {
+                "model": self.model_name,
+                "calls": calls,
+                "escalations": escalations,
+                "escalation_rate": round(escalations / calls, 3) if calls else 0.0,
+                "added_latency": round(sum(self.added_latency.values()), 2),
+                "cost": round(sum(self.first_cost.values()) + sum(self.added_cost.values()), 6),
+                "added_cost": round(sum(self.added_cost.values()), 6),
+                "strong_only_cost": round(sum(self.strong_only_cost.values()), 6),
+                "roles": roles,
+            }
+
+
+def print_cascade_report(report: dict) -> None:
+    """Print a formatted cascade summary."""
+    print(f"\n{'='*80}")
+    print(f"CASCADE (escalating to {report['model']})")
+    print(f"{'='*80}")
+    print(f"  Calls: {report['calls']}  Escalated: {report['escalations']} ({report['escalation_rate']:.1%})"
+          f"  Added latency: {report['added_latency']}s  Cost: ${report['cost']:.4f}"
+          f" (${report['added_cost']:.4f} from escalation, ${report['strong_only_cost']:.4f} on {report['model']} only)")
+    for role, stats in report["roles"].items():
+        reasons = ", ".join(f"{k} {v}" for k, v in stats["reasons"].items()) or "none"
+        print(f"  {role:<18} {stats['escalations']}/{stats['calls']} escalated ({reasons}) |"
+              f" mean {stats['mean_latency']}s, +{stats['added_latency']}s | ${stats['cost']:.4f}")
+    print(f"{'='*80}\n")
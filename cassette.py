@@ -0,0 +1,115 @@
+"""Record/replay cassettes for deterministic debate runs.
+
+In record mode every agent call a debate makes is captured into a compact
+gzip cassette, keyed by a hash of the normalized prompt. Replay mode serves
+recorded responses instantly and only calls the model for prompts it has not
+seen (recording them); strict mode raises CassetteMiss instead, so prompt
+drift in tasks.py fails loudly.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Literal
+
+from crewai import Agent, Task
+
+from metrics import CACHE_REQUESTS
+from tasks import TaskCall
+
+
+CassetteMode = Literal["record", "replay", "strict"]
+
+
+class CassetteMiss(KeyError):
+    """Raised in strict mode when a prompt has no recorded response."""
+
+
+def normalize(text: str) -> str:
+    """Collapse whitespace so indentation changes do not alter prompt keys."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def prompt_key(agent: Agent, task: Task) -> str:
+    """Stable hash of everything that determines an agent call's response."""
+    llm = agent.llm
+    parts = [
+        getattr(llm, "model", ""),
+        str(getattr(llm, "temperature", "")),
+        agent.role,
+        normalize(agent.goal),
+        normalize(agent.backstory),
+        normalize(task.description),
+        normalize(task.expected_output),
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()[:32]
+
+
+class Cassette:
+    """A file of recorded agent responses keyed by normalized prompt hash."""
+
+    def __init__(self, path: Path, mode: CassetteMode = "replay"):
+        self.path = Path(path)
+        self.mode = mode
+        self.entries = {}
+        self.plays = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+        if mode != "record" and self.path.exists():
+            with gzip.open(self.path, "rt") as f:
+                self.entries = json.load(f)["entries"]
+
+    def _record(self, key: str, agent: Agent, task: Task, output: str, usage: dict) -> None:
+        with self.lock:
+            entry = self.entries.setdefault(key, {
+                "role": agent.role,
+                "prompt": normalize(task.description)[:200],
+                "responses": [],
+            })
+            entry["responses"].append({"output": output, "usage": usage})
+            self.plays[key] = len(entry["responses"])
+            self.dirty = True
+
+    def call(self, agent: Agent, task: Task, call: TaskCall) -> tuple[str, dict]:
+        """Serve a recorded response, or make the call (and record it)."""
+        key = prompt_key(agent, task)
+        if self.mode != "record":
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    # Identical prompts are replayed in the order they were recorded
+                    responses = entry["responses"]
+                    response = responses[min(self.plays[key], len(responses) - 1)]
+                    self.plays[key] += 1
+                    self.hits += 1
+                    CACHE_REQUESTS.inc(result="hit")
+                    return response["output"], {**response["usage"], "cached": True}
+                self.misses += 1
+            CACHE_REQUESTS.inc(result="miss")
+            if self.mode == "strict":
+                preview = normalize(task.description)[:120]
+                raise CassetteMiss(f"No recorded response for {agent.role} prompt {key}: {preview}...")
+
+        output, usage = call(agent, task)
+        self._record(key, agent, task, output, usage)
+        return output, usage
+
+    def wrap(self, call: TaskCall) -> TaskCall:
+        """Return a task call that goes through this cassette."""
+        return lambda agent, task: self.call(agent, task, call)
+
+    def save(self) -> None:
+        """Write the cassette if anything new was recorded."""
+        with self.lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "wt") as f:
+                json.dump({"version": 1, "entries": self.entries}, f, separators=(",", ":"))
+            self.dirty = False
@@ -1,7 +1,7 @@
 """Configuration for the multi-agent debate system."""
 
-from dataclasses import dataclass
-from typing import Literal
+from dataclasses import dataclass, field
+from typing import Literal, Optional
 
 
 @dataclass
@@ -10,19 +10,77 @@ class DebateConfig:
 
     # Debate setup
     topic: str = "Will agentic AI displace the need for MBA talent?"
-    num_agents: Literal[2, 4] = 4  # 2 or 4 agents
+    num_agents: int = 4  # Including the Judge: 2 (solo), 4 (chain) or any size of panel/roster
     num_rounds: int = 2  # Number of debate rounds
+    protocol: Optional[str] = None  # Round graph from protocols.PROTOCOLS (default by num_agents)
+    roster: list[dict] = field(default_factory=list)  # Custom round graph of RoleStep fields
 
     # Model configuration
     model_name: str = "claude-3-haiku-20240307"
     temperature: float = 0.7  # Low (0.3) vs High (0.9)
+    api_base_url: Optional[str] = None  # Messages API endpoint, e.g. a local mock_api.py server
+
+    # Per-role routing: role -> model / temperature (other roles use the values above)
+    role_models: dict[str, str] = field(default_factory=dict)  # e.g. {"Judge": "claude-3-5-sonnet-20241022"}
+    role_temperatures: dict[str, float] = field(default_factory=dict)
+
+    # Cascade (None disables): roles not already on cascade_model run on their routed model
+    # first and are re-run on cascade_model when a quick check of the output fails
+    cascade_model: Optional[str] = None
+    cascade_min_chars: int = 500  # Shorter outputs escalate
+    cascade_min_confidence: int = 3  # Self-reported confidence (0-5) below this escalates
 
     # Agent roles
     include_devil_advocate: bool = False  # Role swap toggle
 
+    # Hedged requests (None disables hedging)
+    hedge_percentile: Optional[float] = None  # e.g. 95.0 duplicates calls slower than the role's p95
+    hedge_max_rate: float = 0.1  # Max fraction of calls that may be hedged
+    hedge_max_wasted_tokens: Optional[int] = None  # Stop hedging once this many tokens are wasted
+
+    # Per-debate budget (None disables a limit); the final judgment is always reserved for
+    max_wall_clock: Optional[float] = None  # Seconds from the first round to the verdict
+    max_tokens: Optional[int] = None  # Prompt + completion tokens across all agent calls
+    max_cost: Optional[float] = None  # Estimated USD, from MODEL_PRICES
+
+    # Cross-debate evidence (None disables): research prompts get the top-k snippets
+    # retrieved from earlier debates' research, and this debate's research is added
+    evidence_store: Optional[str] = None  # SQLite file shared by the debates that reuse evidence
+    evidence_top_k: int = 5
+
     # Output
     save_results: bool = True
+    results_dir: str = "results"  # Where results files are saved (e.g. one directory per shard)
     verbose: bool = True
+    spill_dir: Optional[str] = None  # Spill finished rounds to this directory to bound memory
+    results_format: Literal["debate", "json"] = "debate"  # Compressed .debate or plain .json
+    log_mode: Literal["console", "structured"] = "console"  # Banners + crewai verbose, or JSON events
+    log_dir: Optional[str] = None  # Structured log directory (default results/logs)
+
+    def model_for(self, role: str) -> str:
+        return self.role_models.get(role, self.model_name)
+
+    def temperature_for(self, role: str) -> float:
+        return self.role_temperatures.get(role, self.temperature)
+
+    @classmethod
+    def from_results(cls, config: dict, **overrides) -> "DebateConfig":
+        """Rebuild a config from the "config" block of a saved results file."""
+        values = {
+            "topic": config.get("topic", cls.topic),
+            "num_agents": config.get("num_agents", cls.num_agents),
+            "num_rounds": config.get("num_rounds", cls.num_rounds),
+            "protocol": config.get("protocol"),
+            "roster": config.get("roster", []),
+            "model_name": config.get("model", cls.model_name),
+            "temperature": config.get("temperature", cls.temperature),
+            "include_devil_advocate": config.get("include_devil_advocate", cls.include_devil_advocate),
+            "role_models": config.get("role_models", {}),
+            "role_temperatures": config.get("role_temperatures", {}),
+            "cascade_model": config.get("cascade_model"),
+        }
+        values.update(overrides)
+        return cls(**values)
 
 
 # Quality rubric criteria (0-5 scale)
@@ -32,3 +90,19 @@ RUBRIC_CRITERIA = {
     "risks": "Identification and assessment of potential risks",
     "clarity": "Clarity and coherence of communication"
 }
+
+
+# Approximate list prices, USD per million (input, output) tokens
+MODEL_PRICES = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-5-sonnet-20240620": (3.00, 15.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-opus-20240229": (15.00, 75.00),
+}
+
+
+def estimate_cost(model_name: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of one call (0 for models without a known price)."""
+    input_price, output_price = MODEL_PRICES.get(model_name.removeprefix("anthropic/"), (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
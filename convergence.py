@@ -0,0 +1,187 @@
+"""Quantitative convergence of stored debates from hashed n-gram TF-IDF vectors.
+
+Every agent output is turned into a TF-IDF vector over hashed unigrams and
+bigrams, and similarities are computed with NumPy in batches of debates that
+share a (rounds, agents) shape, so thousands of transcripts take seconds and
+no model calls. Per debate this gives:
+
+- ``inter_agent``: for each round, the agent-by-agent cosine similarity matrix
+- ``round_over_round``: for each round after the first, how similar each
+  agent's output is to its own output in the previous round
+- ``curve``: mean pairwise inter-agent similarity per round; a rising curve
+  means the agents' positions are moving together
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from results_store import list_results, load_results
+from transcript import Transcript
+
+
+TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+N_FEATURES = 2 ** 12
+CHUNK_SIZE = 64  # debates per dense block; bounds peak memory
+
+# Multiplicative hashing of vocabulary ids into the feature space
+UNIGRAM_MIX = 2654435761
+BIGRAM_MIX = 40503
+
+
+class Convergence(NamedTuple):
+    """Similarity structure of one debate (roles are the matrix axes)."""
+
+    file: str
+    roles: list[str]
+    inter_agent: np.ndarray       # (rounds, agents, agents)
+    round_over_round: np.ndarray  # (rounds - 1, agents)
+    curve: np.ndarray             # (rounds,); NaN for single-agent debates
+
+    @property
+    def trend(self) -> float:
+        """Change in inter-agent similarity from the first to the last round."""
+        return float(self.curve[-1] - self.curve[0])
+
+    @property
+    def stability(self) -> np.ndarray:
+        """Mean round-over-round self-similarity, per round after the first."""
+        return self.round_over_round.mean(axis=1)
+
+
+class Corpus:
+    """Hashed n-gram features for every agent output across many debates."""
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.n_features = n_features
+        self.vocab = {}
+        self.docs = []
+        self.df = np.zeros(n_features, dtype=np.int64)
+
+    def add(self, text: str) -> int:
+        """Tokenize one output and return its document index."""
+        tokens = TOKEN.findall(text.lower())
+        # New words get ids in first-seen order, so features are deterministic across runs
+        new = [t for t in dict.fromkeys(tokens) if t not in self.vocab]
+        self.vocab.update(zip(new, range(len(self.vocab), len(self.vocab) + len(new))))
+        ids = np.array(list(map(self.vocab.__getitem__, tokens)), dtype=np.int64)
+
+        unigrams = ids * UNIGRAM_MIX
+        bigrams = ids[:-1] * UNIGRAM_MIX + ids[1:] * BIGRAM_MIX + 1
+        cols = np.concatenate([unigrams, bigrams]) % self.n_features
+        present = np.zeros(self.n_features, dtype=bool)
+        present[cols] = True
+        self.df += present
+        self.docs.append(cols)
+        return len(self.docs) - 1
+
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequency of every feature."""
+        return (np.log((1 + len(self.docs)) / (1 + self.df)) + 1).astype(np.float32)
+
+    def vectors(self, doc_ids: np.ndarray, idf: np.ndarray) -> np.ndarray:
+        """L2-normalized sublinear TF-IDF rows for the given documents."""
+        cols = [self.docs[i] for i in doc_ids]
+        rows = np.repeat(np.arange(len(cols)), [len(c) for c in cols])
+        flat = rows * self.n_features + np.concatenate(cols) if cols else rows
+        counts = np.bincount(flat, minlength=len(cols) * self.n_features)
+        matrix = np.log1p(counts.reshape(len(cols), self.n_features).astype(np.float32)) * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+def debate_grid(corpus: Corpus, transcript: Transcript) -> tuple[list[str], np.ndarray]:
+    """Add a debate's outputs to the corpus as a (rounds, agents) grid of document ids.
+
+    The judge's verdict is not part of the debate's positions and is left out.
+    Roles missing from any round are dropped so every round has the same axes.
+    """
+    rounds = [transcript.round_messages(r) for r in transcript.rounds()]
+    roles = [m.role for m in rounds[0]] if rounds else []
+    for messages in rounds[1:]:
+        present = {m.role for m in messages}
+        roles = [role for role in roles if role in present]
+
+    grid = np.empty((len(rounds), len(roles)), dtype=np.int64)
+    for r, messages in enumerate(rounds):
+        by_role = {m.role: m for m in messages}
+        for a, role in enumerate(roles):
+            grid[r, a] = corpus.add(by_role[role].text)
+    return roles, grid
+
+
+def batch_similarities(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Similarity matrices for a block of same-shaped debates, vectors (D, R, A, F)."""
+    agents = vectors.shape[2]
+    inter_agent = np.einsum("draf,drbf->drab", vectors, vectors)
+    round_over_round = np.einsum("draf,draf->dra", vectors[:, 1:], vectors[:, :-1])
+    if agents > 1:
+        off_diagonal = inter_agent.sum(axis=(2, 3)) - np.trace(inter_agent, axis1=2, axis2=3)
+        curve = off_diagonal / (agents * (agents - 1))
+    else:
+        curve = np.full(inter_agent.shape[:2], np.nan, dtype=np.float32)
+    return inter_agent, round_over_round, curve
+
+
+def analyze_convergence(files: list[Path], n_features: int = N_FEATURES) -> dict[str, Convergence]:
+    """Convergence of every results file, keyed by file name."""
+    corpus = Corpus(n_features)
+    debates = []
+    for filepath in files:
+        roles, grid = debate_grid(corpus, Transcript.from_results(load_results(filepath)))
+        if grid.size:
+            debates.append((filepath.name, roles, grid))
+
+    idf = corpus.idf()
+    shapes = {}
+    for debate in debates:
+        shapes.setdefault(debate[2].shape, []).append(debate)
+
+    results = {}
+    for (num_rounds, num_agents), group in shapes.items():
+        for start in range(0, len(group), CHUNK_SIZE):
+            chunk = group[start:start + CHUNK_SIZE]
+            doc_ids = np.stack([grid for _, _, grid in chunk]).ravel()
+            vectors = corpus.vectors(doc_ids, idf).reshape(len(chunk), num_rounds, num_agents, n_features)
+            inter_agent, round_over_round, curve = batch_similarities(vectors)
+            for i, (name, roles, _) in enumerate(chunk):
+                results[name] = Convergence(name, roles, inter_agent[i], round_over_round[i], curve[i])
+    return results
+
+
+def format_curve(curve: Optional[np.ndarray]) -> str:
+    if curve is None or np.isnan(curve).all():
+        return "n/a"
+    return " -> ".join(f"{v:.2f}" for v in curve)
+
+
+def main():
+    """Print the convergence curve of every stored debate."""
+    parser = argparse.ArgumentParser(description="Vectorized convergence analysis of stored debates")
+    parser.add_argument("results_dir", nargs="?", type=Path, default=Path("results"))
+    parser.add_argument("--features", type=int, default=N_FEATURES, help="Hashed feature dimensions")
+    args = parser.parse_args()
+
+    files = sorted(list_results(args.results_dir))
+    if not files:
+        print(f"No result files found in {args.results_dir}/")
+        return
+
+    start = time.perf_counter()
+    results = analyze_convergence(files, args.features)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'File':<50} | {'Agents':>6} | {'Trend':>6} | Inter-agent similarity per round")
+    print(f"{'-'*50}-|-{'-'*6}-|-{'-'*6}-|-{'-'*33}")
+    for name, result in sorted(results.items()):
+        trend = "n/a" if np.isnan(result.trend) else f"{result.trend:+.2f}"
+        print(f"{name:<50} | {len(result.roles):>6} | {trend:>6} | {format_curve(result.curve)}")
+    print(f"\n✓ Analyzed {len(results)} debates in {elapsed:.2f}s\n")
+
+
+if __name__ == "__main__":
+    main()
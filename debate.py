@@ -1,76 +1,374 @@
 """Main debate orchestration logic."""
 
+import asyncio
+import inspect
 import os
 import time
 import json
+import logging
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Generator, NamedTuple, Optional, Union
 
-from crewai import Crew, Process
+from crewai import Agent, Crew, Process, Task
 from dotenv import load_dotenv
 
 from config import DebateConfig
 from agents import get_debate_agents
-from tasks import (
-    create_research_task,
-    create_critique_task,
-    create_synthesis_task,
-    create_devil_advocate_task,
-    create_judge_task,
-)
+from analyze_results import extract_scores, extract_team_scores, extract_winner
+from budget import CHARS_PER_TOKEN, JUDGE_COMPLETION_TOKENS, DebateBudget, shorten
+from cascade import CascadePolicy
+from cassette import Cassette
+from evidence import EvidenceReuse
+from hedging import HedgePolicy
+from logs import DebateLog, configure_logging, debate_log_path
+from metrics import record_call, record_error, track_debate
+from protocols import RoundGraph, round_graph
+from results_store import SUFFIX, write_results
+from transcript import Message, Transcript
+from tasks import create_judge_task, create_step_task, create_team_judge_task, TaskCall
+
+
+def run_task_with_usage(agent: Agent, task: Task, verbose: bool = False) -> tuple[str, dict]:
+    """Run one task with a single-agent sequential crew and return its output and token usage."""
+    crew = Crew(
+        agents=[agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=verbose,
+    )
+    result = crew.kickoff()
+    return str(result), crew_usage(result)
+
+
+async def run_task_with_usage_async(agent: Agent, task: Task, verbose: bool = False) -> tuple[str, dict]:
+    """Async run_task_with_usage on crewai's native async path, so cancelling it aborts the API call.
+
+    crewai releases without Crew.akickoff run the call in a worker thread
+    instead; cancelling then abandons the call rather than aborting it.
+    """
+    if not hasattr(Crew, "akickoff"):
+        return await asyncio.to_thread(run_task_with_usage, agent, task, verbose)
+    crew = Crew(
+        agents=[agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=verbose,
+    )
+    result = await crew.akickoff()
+    return str(result), crew_usage(result)
+
+
+def crew_usage(result: Any) -> dict:
+    token_usage = getattr(result, "token_usage", None)
+    return {
+        "prompt_tokens": getattr(token_usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(token_usage, "completion_tokens", 0),
+        "total_tokens": getattr(token_usage, "total_tokens", 0),
+    }
+
+
+def run_task(agent: Agent, task: Task, verbose: bool = False) -> str:
+    """Run one task with a single-agent sequential crew and return its output."""
+    return run_task_with_usage(agent, task, verbose)[0]
+
+
+class DebateStep(NamedTuple):
+    """One agent call in the debate protocol (round is None for the final judgment)."""
+    round: Optional[int]
+    agent: Agent
+    task: Task
+
+
+# A protocol generator yields either one step, whose Message is sent back, or a list
+# of steps to start together. After a list, each send delivers the next Message to
+# finish (in completion order) and the generator yields any steps that became
+# ready, possibly none, until everything it started has been delivered.
+StepGenerator = Generator[Union[DebateStep, list[DebateStep]], Message, Any]
+
+MAX_PARALLEL_STEPS = 8
+
+# An awaitable TaskCall, for the async API
+AsyncTaskCall = Callable[[Agent, Task], Awaitable[tuple[str, dict]]]
+
+
+class StepTimeout(TimeoutError):
+    """An agent step ran past the per-step deadline of an async debate."""
+
+    def __init__(self, round_num: Optional[int], role: str, timeout: float):
+        where = f"round {round_num}" if round_num is not None else "final judgment"
+        super().__init__(f"{role} ({where}) exceeded the {timeout}s step deadline")
+        self.round = round_num
+        self.role = role
+        self.timeout = timeout
+
+
+class DebateTimeout(TimeoutError):
+    """An async debate ran past its overall deadline."""
+
+
+def is_async_call(call: Any) -> bool:
+    """Whether a task call (function or callable object) is a coroutine function."""
+    return inspect.iscoroutinefunction(call) or inspect.iscoroutinefunction(getattr(call, "__call__", None))
+
+
+def step_message(step: DebateStep, start: float, text: str, usage: dict) -> Message:
+    """Wrap a finished step's output in a transcript message."""
+    return Message(
+        step.round, step.agent.role, text, start, time.time() - start,
+        usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), usage.get("retry_time", 0.0),
+    )
+
+
+def run_step(step: DebateStep, run: TaskCall) -> Message:
+    """Run one step and wrap its output in a transcript message."""
+    start = time.time()
+    text, usage = run(step.agent, step.task)
+    return step_message(step, start, text, usage)
+
+
+async def arun_step(step: DebateStep, run: AsyncTaskCall, timeout: Optional[float] = None) -> Message:
+    """Await one step under an optional deadline and wrap its output in a transcript message."""
+    start = time.time()
+    try:
+        text, usage = await asyncio.wait_for(run(step.agent, step.task), timeout)
+    except asyncio.TimeoutError:
+        raise StepTimeout(step.round, step.agent.role, timeout) from None
+    return step_message(step, start, text, usage)
+
+
+def drive_steps(steps: StepGenerator, run: TaskCall) -> Any:
+    """Run every step yielded by a protocol generator and return its final value.
+
+    Single steps run in the calling thread; steps started together run
+    concurrently, so each one starts as soon as its inputs are ready.
+    """
+    message = None
+    running = set()
+    pool = None
+    try:
+        while True:
+            try:
+                started = steps.send(message)
+            except StopIteration as stop:
+                return stop.value
+            if isinstance(started, DebateStep):
+                if not running:
+                    message = run_step(started, run)
+                    continue
+                started = [started]
+            if pool is None and (running or len(started) > 1):
+                pool = ThreadPoolExecutor(max_workers=MAX_PARALLEL_STEPS, thread_name_prefix="step")
+            if pool is None:
+                message = run_step(started[0], run)
+                continue
+            running.update(pool.submit(run_step, step, run) for step in started)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            finished = next(iter(done))
+            running.discard(finished)
+            message = finished.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def adrive_steps(steps: StepGenerator, run: AsyncTaskCall, step_timeout: Optional[float] = None) -> Any:
+    """Async drive_steps: every step is a task on the running event loop.
+
+    If the caller is cancelled or a step fails or times out, the other running
+    steps are cancelled, which aborts their in-flight calls. The generator is
+    then closed, so agents get their settings back.
+    """
+    message = None
+    running = set()
+    try:
+        while True:
+            try:
+                started = steps.send(message)
+            except StopIteration as stop:
+                return stop.value
+            if isinstance(started, DebateStep):
+                started = [started]
+            running.update(asyncio.ensure_future(arun_step(step, run, step_timeout)) for step in started)
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            finished = next(iter(done))
+            running.discard(finished)
+            message = finished.result()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        steps.close()
+
+
+def published_rounds(transcript: Transcript, graph: RoundGraph) -> list[str]:
+    """Each round's published team outputs, side by side, for a head-to-head judgment."""
+    return [
+        "\n\n".join(f"{team.upper()} TEAM:\n{transcript.get(r, graph.published(team)).text}"
+                   for team in graph.teams)
+        for r in transcript.rounds()
+    ]
 
 
 class DebateOrchestrator:
     """Orchestrates the multi-agent debate."""
 
-    def __init__(self, config: DebateConfig):
+    def __init__(self, config: DebateConfig, hedger: Optional[HedgePolicy] = None,
+                 cassette: Optional[Cassette] = None, backend: Optional[TaskCall] = None,
+                 agents: Optional[list[Agent]] = None, cascade: Optional[CascadePolicy] = None,
+                 debate_id: Optional[str] = None):
+        # Callers that resume a debate pass its original id
+        self.debate_id = debate_id or uuid.uuid4().hex[:8]
+        self.log = None
+        if config.log_mode == "structured":
+            # Structured events replace crewai's verbose agent dumps
+            config = replace(config, verbose=False)
+            configure_logging(config.log_dir)
+            self.log = DebateLog(self.debate_id)
         self.config = config
-        self.agents = get_debate_agents(config)
-        self.round_outputs = []
+        self.graph = round_graph(config)
+        # Long-running callers pass agents built earlier to skip LLM client setup
+        self.agents = agents if agents is not None else get_debate_agents(config)
+        self.agents_by_role = {a.role: a for a in self.agents}
+        if hedger is None and config.hedge_percentile is not None:
+            hedger = HedgePolicy.from_config(config)
+        self.hedger = hedger
+        if cascade is None and config.cascade_model is not None:
+            cascade = CascadePolicy.from_config(config)
+        self.cascade = cascade
+        self.evidence = EvidenceReuse.from_config(config, self.debate_id) if config.evidence_store else None
+        self.cassette = cassette
+        self.backend = backend
+        self.budget = DebateBudget.from_config(config)
+        self.call_costs = {}  # role -> precomputed cost of its latest call, if it spanned models
+        self.max_tokens = {}  # role -> the agent's own max_tokens while a budget cap is applied
+        spill_path = None
+        if config.spill_dir is not None:
+            Path(config.spill_dir).mkdir(parents=True, exist_ok=True)
+            spill_path = Path(config.spill_dir) / f"transcript_{uuid.uuid4().hex}.jsonl"
+        self.transcript = Transcript(spill_path)
+        self.round_durations = []
         self.start_time = None
         self.end_time = None
+        self.on_event = None  # Optional callback(event, fields) for progress events
 
     def run_debate(self) -> dict:
         """Run the complete debate and return results."""
-        print(f"\n{'='*80}")
-        print(f"MULTI-AGENT DEBATE")
-        print(f"{'='*80}")
-        print(f"Topic: {self.config.topic}")
-        print(f"Agents: {self.config.num_agents} ({', '.join([a.role for a in self.agents])})")
-        print(f"Rounds: {self.config.num_rounds}")
-        print(f"Temperature: {self.config.temperature}")
-        print(f"Model: {self.config.model_name}")
-        print(f"{'='*80}\n")
+        with track_debate():
+            try:
+                return drive_steps(self.debate_steps(), self._run_task)
+            except Exception as e:
+                if self.log is not None:
+                    self.log.event("debate_finished", f"failed: {type(e).__name__}: {e}",
+                                   level=logging.ERROR, status="failed")
+                raise
+
+    async def run_debate_async(self, step_timeout: Optional[float] = None,
+                               deadline: Optional[float] = None) -> dict:
+        """Run the debate on the running event loop and return the same results as run_debate.
+
+        step_timeout bounds each agent call (StepTimeout) and deadline the whole
+        debate (DebateTimeout). Cancelling the awaiting task cancels the
+        in-flight calls.
+        """
+        with track_debate():
+            try:
+                return await asyncio.wait_for(
+                    adrive_steps(self.debate_steps(), self._run_task_async, step_timeout), deadline
+                )
+            except StepTimeout as e:
+                self._fail("timed_out", e)
+                raise
+            except asyncio.TimeoutError:
+                error = DebateTimeout(f"Debate exceeded its {deadline}s deadline")
+                self._fail("timed_out", error)
+                raise error from None
+            except asyncio.CancelledError as e:
+                self._fail("cancelled", e)
+                raise
+            except Exception as e:
+                self._fail("failed", e)
+                raise
+
+    def _fail(self, status: str, error: BaseException) -> None:
+        self._emit("debate_finished", status=status, error=f"{type(error).__name__}: {error}")
+        if self.log is not None:
+            self.log.event("debate_finished", f"{status}: {type(error).__name__}: {error}",
+                           level=logging.ERROR, status=status)
+
+    def _emit(self, event: str, **fields) -> None:
+        if self.on_event is not None:
+            self.on_event(event, {"debate_id": self.debate_id, "time": time.time(), **fields})
+
+    def _announce(self, event: str, banner: str, msg: str, **fields) -> None:
+        """Print a console banner, or log a structured event in structured mode."""
+        self._emit(event, **fields)
+        if self.log is None:
+            print(banner)
+        else:
+            self.log.event(event, msg, **fields)
+
+    def debate_steps(self) -> StepGenerator:
+        """Yield each agent step of the debate, receiving its output, and return the results."""
+        roles = [a.role for a in self.agents]
+        self._announce(
+            "debate_started",
+            f"\n{'='*80}\n"
+            f"MULTI-AGENT DEBATE\n"
+            f"{'='*80}\n"
+            f"Topic: {self.config.topic}\n"
+            f"Agents: {self.config.num_agents} ({', '.join(roles)})\n"
+            f"Rounds: {self.config.num_rounds}\n"
+            f"Temperature: {self.config.temperature}\n"
+            f"Model: {self.config.model_name}\n"
+            f"{'='*80}\n",
+            f"debate started: {self.config.num_agents} agents, {self.config.num_rounds} rounds, "
+            f"temp {self.config.temperature}, {self.config.model_name}",
+            topic=self.config.topic, agents=roles, num_rounds=self.config.num_rounds,
+            temperature=self.config.temperature, model=self.config.model_name,
+        )
 
         self.start_time = time.time()
+        if self.budget is not None:
+            self.budget.start_clock()
 
         # Run debate rounds
-        previous_output = ""
         for round_num in range(1, self.config.num_rounds + 1):
-            print(f"\n{'='*80}")
-            print(f"ROUND {round_num}/{self.config.num_rounds}")
-            print(f"{'='*80}\n")
+            blocker = self.budget.round_blocker() if self.budget is not None else None
+            if blocker is not None:
+                skipped = list(range(round_num, self.config.num_rounds + 1))
+                self._budget_decision("skip_rounds", blocker, rounds=skipped)
+                break
+            self._announce(
+                "round_started", f"\n{'='*80}\nROUND {round_num}/{self.config.num_rounds}\n{'='*80}\n",
+                f"round {round_num}/{self.config.num_rounds}", round=round_num,
+            )
 
             round_start = time.time()
-            round_output = self._run_round(round_num, previous_output)
+            if self.budget is not None:
+                self.budget.start_round()
+            yield from self._run_round(round_num)
+            if self.budget is not None:
+                self.budget.finish_round()
             round_end = time.time()
 
-            self.round_outputs.append({
-                "round": round_num,
-                "output": round_output,
-                "duration": round_end - round_start
-            })
-
-            previous_output = round_output
-            print(f"\nRound {round_num} completed in {round_end - round_start:.2f}s")
+            self.round_durations.append(round_end - round_start)
+            # Only the latest round feeds the next prompt; older ones can leave memory
+            self.transcript.spill(keep_from=round_num)
+            self._announce(
+                "round_finished", f"\nRound {round_num} completed in {round_end - round_start:.2f}s",
+                f"round {round_num} completed in {round_end - round_start:.2f}s",
+                round=round_num, duration=round_end - round_start,
+            )
 
         # Final judgment
-        print(f"\n{'='*80}")
-        print(f"FINAL JUDGMENT")
-        print(f"{'='*80}\n")
+        self._announce("judgment_started", f"\n{'='*80}\nFINAL JUDGMENT\n{'='*80}\n", "final judgment")
 
-        final_verdict = self._run_final_judgment()
+        judgment = yield from self._run_final_judgment()
         self.end_time = time.time()
 
         # Compile results
@@ -83,138 +381,389 @@ class DebateOrchestrator:
                 "model": self.config.model_name,
                 "agents": [a.role for a in self.agents],
                 "include_devil_advocate": self.config.include_devil_advocate,
+                "protocol": self.graph.name,
+                **{name: getattr(self.config, name)
+                   for name in ("roster", "role_models", "role_temperatures", "cascade_model", "evidence_store")
+                   if getattr(self.config, name)},
             },
-            "rounds": self.round_outputs,
-            "final_verdict": final_verdict,
+            "rounds": [
+                self.transcript.round_dict(round_num, duration)
+                for round_num, duration in zip(self.transcript.rounds(), self.round_durations)
+            ],
+            "final_verdict": judgment.text,
+            "scores": extract_scores(judgment.text),
+            "judgment": {k: v for k, v in judgment.to_dict().items() if k not in ("role", "text")},
             "total_duration": self.end_time - self.start_time,
             "timestamp": datetime.now().isoformat(),
         }
+        if self.graph.teams:
+            results.update(self._team_results(judgment.text))
+        if self.hedger is not None:
+            results["hedging"] = self.hedger.report()
+        if self.cascade is not None:
+            results["cascade"] = self.cascade.report()
+        if self.budget is not None:
+            results["budget"] = self.budget.report()
+        if self.evidence is not None:
+            results["evidence"] = self.evidence.report()
+
+        self.transcript.close()
 
         # Save results if configured
         if self.config.save_results:
-            self._save_results(results)
-
-        return results
-
-    def _run_round(self, round_num: int, previous_output: str) -> str:
-        """Run a single debate round."""
-        if self.config.num_agents == 2:
-            # Simple 2-agent debate: Researcher only
-            researcher = self.agents[0]
-            task = create_research_task(researcher, self.config, round_num, previous_output)
-
-            crew = Crew(
-                agents=[researcher],
-                tasks=[task],
-                process=Process.sequential,
-                verbose=self.config.verbose,
+            results["results_file"] = str(self._save_results(results))
+
+        self._emit("debate_finished", status="completed", scores=results["scores"],
+                   total_duration=results["total_duration"], results_file=results.get("results_file"))
+        if self.log is not None:
+            results["log_file"] = str(debate_log_path(self.debate_id))
+            self.log.event(
+                "debate_finished",
+                f"finished in {results['total_duration']:.1f}s, scores {results['scores']}",
+                status="completed", scores=results["scores"], total_duration=results["total_duration"],
+                results_file=results.get("results_file"),
             )
 
-            result = crew.kickoff()
-            return str(result)
-
-        elif self.config.num_agents == 4:
-            # Full 4-agent debate: Researcher → Critic → Synthesizer/Devil's Advocate
-            researcher, critic, third_agent, _ = self.agents
+        return results
 
-            # Research task
-            research_task = create_research_task(researcher, self.config, round_num, previous_output)
-            research_crew = Crew(
-                agents=[researcher],
-                tasks=[research_task],
-                process=Process.sequential,
-                verbose=self.config.verbose,
-            )
-            research_output = str(research_crew.kickoff())
-
-            # Critique task
-            critique_task = create_critique_task(critic, self.config, round_num, research_output)
-            critique_crew = Crew(
-                agents=[critic],
-                tasks=[critique_task],
-                process=Process.sequential,
-                verbose=self.config.verbose,
-            )
-            critique_output = str(critique_crew.kickoff())
+    def _team_results(self, verdict: str) -> dict:
+        """Winner, per-team scores and per-team timings of a team-vs-team debate.
+
+        A team's round duration is the wall-clock of its own branch (first start
+        to last finish), so the two can be compared with the round's duration.
+        """
+        team_scores = extract_team_scores(verdict, self.graph.teams)
+        winner = extract_winner(verdict, self.graph.teams)
+        teams = {}
+        for step_team in self.graph.teams:
+            roles = self.graph.team_roles(step_team)
+            durations, tokens = [], 0
+            for r in self.transcript.rounds():
+                messages = [m for m in self.transcript.round_messages(r) if m.role in roles]
+                durations.append(max(m.start + m.duration for m in messages) - min(m.start for m in messages))
+                tokens += sum(m.prompt_tokens + m.completion_tokens for m in messages)
+            teams[step_team] = {
+                "roles": roles,
+                "stance": next(s.stance for s in self.graph.steps if s.team == step_team),
+                "scores": team_scores.get(step_team, {}),
+                "round_durations": durations,
+                "total_duration": sum(durations),
+                "tokens": tokens,
+            }
+        # The debate's headline scores are the winner's (the first team's on a tie)
+        headline = winner if winner in teams else self.graph.teams[0]
+        team_results = {"winner": winner, "teams": teams, "scores": teams[headline]["scores"]}
+        unparsable = [t for t in self.graph.teams if not teams[t]["scores"]]
+        if unparsable:
+            team_results["scores_unparsable"] = unparsable
+        return team_results
+
+    def _budget_decision(self, action: str, reason: str, **detail) -> None:
+        decision = self.budget.decide(action, reason, **detail)
+        details = ", ".join(f"{k}={v}" for k, v in detail.items())
+        self._announce(
+            "budget_decision", f"\n[budget] {action} ({reason}): {details}",
+            f"budget: {action} ({reason}) {details}", **decision,
+        )
 
-            # Synthesis or Devil's Advocate task
-            if self.config.include_devil_advocate:
-                synthesis_task = create_devil_advocate_task(
-                    third_agent, self.config, round_num, research_output, critique_output
-                )
+    def _step(self, round_num: Optional[int], agent: Agent, task: Task) -> StepGenerator:
+        """Yield one agent step and record its output in the transcript."""
+        step = self._prepare(round_num, agent, task)
+        try:
+            message = yield step
+        finally:
+            self._release(agent)
+        return self.transcript.add(self._finish(round_num, message))
+
+    def _prepare(self, round_num: Optional[int], agent: Agent, task: Task) -> DebateStep:
+        """Build a step; under a budget the agent's max_tokens is capped until it is released."""
+        if self.budget is not None:
+            llm = agent.llm
+            max_tokens = self.max_tokens[agent.role] = getattr(llm, "max_tokens", None)
+            if round_num is None:
+                # The judgment reserve only covers a verdict of this size
+                cap, limit = min(max_tokens or JUDGE_COMPLETION_TOKENS, JUDGE_COMPLETION_TOKENS), None
             else:
-                synthesis_task = create_synthesis_task(
-                    third_agent, self.config, round_num, research_output, critique_output
-                )
-
-            synthesis_crew = Crew(
-                agents=[third_agent],
-                tasks=[synthesis_task],
-                process=Process.sequential,
-                verbose=self.config.verbose,
+                cap, limit = self.budget.completion_cap(len(task.description), max_tokens,
+                                                        self.config.model_for(agent.role))
+                if limit is not None:
+                    self._budget_decision("cap_tokens", limit, round=round_num, role=agent.role, max_tokens=cap)
+            llm.max_tokens = cap
+        self._emit("step_started", round=round_num, role=agent.role)
+        return DebateStep(round_num, agent, task)
+
+    def _release(self, agent: Agent) -> None:
+        if agent.role in self.max_tokens:
+            agent.llm.max_tokens = self.max_tokens.pop(agent.role)
+
+    def _finish(self, round_num: Optional[int], message: Message) -> Message:
+        """Account for and log a finished step (the caller adds it to the transcript)."""
+        if self.budget is not None:
+            self.budget.record(message, self.config.model_for(message.role), self.call_costs.get(message.role))
+        if self.evidence is not None and round_num is not None:
+            self.evidence.record(message.role, message.text, message.completion_tokens)
+        self._emit("step_finished", round=round_num, role=message.role, duration=message.duration,
+                   prompt_tokens=message.prompt_tokens, completion_tokens=message.completion_tokens,
+                   text=message.text)
+        if self.log is not None:
+            tokens = message.prompt_tokens + message.completion_tokens
+            self.log.event(
+                "step_finished", f"{message.role} {message.duration:.1f}s ({tokens} tokens)",
+                round=round_num, role=message.role, duration=message.duration,
+                prompt_tokens=message.prompt_tokens, completion_tokens=message.completion_tokens,
             )
-            synthesis_output = str(synthesis_crew.kickoff())
-
-            # Combine outputs for this round
-            return f"""RESEARCHER:
-{research_output}
-
-CRITIC:
-{critique_output}
+            self.log.output(round_num, message.role, message.text)
+        return message
+
+    def _fit_context(self, round_num: int, context: str, **detail) -> str:
+        """Shorten carried-over context that no longer fits the budget."""
+        limit = self.budget.context_limit() if self.budget is not None and context else None
+        if limit is not None and len(context) > limit * CHARS_PER_TOKEN:
+            self._budget_decision("shorten_context", "context", round=round_num,
+                                  chars=len(context), max_tokens=limit, **detail)
+            context = shorten(context, limit)
+        return context
+
+    def _team_context(self, round_num: int) -> dict[str, str]:
+        """Per team, the other side's published output from the previous round."""
+        if round_num == 1:
+            return {team: "" for team in self.graph.teams}
+        published = {team: self.transcript.get(round_num - 1, self.graph.published(team))
+                     for team in self.graph.teams}
+        return {
+            team: self._fit_context(round_num, f"{other.upper()} TEAM:\n{published[other].text}", team=team)
+            for team in self.graph.teams for other in self.graph.teams if other != team
+        }
 
-{third_agent.role.upper()}:
-{synthesis_output}"""
+    def _published_rounds(self) -> list[str]:
+        return published_rounds(self.transcript, self.graph)
 
-    def _run_final_judgment(self) -> str:
+    def _run_round(self, round_num: int) -> StepGenerator:
+        """Run a single debate round."""
+        if self.graph.teams:
+            # Teams never see each other's drafts, only what the other side published
+            contexts = self._team_context(round_num)
+        else:
+            previous_output = self.transcript.render_round(round_num - 1) if round_num > 1 else ""
+            previous_output = self._fit_context(round_num, previous_output)
+
+        kinds = {step.role: step.kind for step in self.graph.steps}
+        outputs = {}
+        started = set()
+        try:
+            while len(outputs) < len(self.graph.steps):
+                # Start every step whose inputs are ready
+                ready = [step for step in self.graph.steps
+                         if step.role not in started and all(r in outputs for r in step.inputs)]
+                new_steps = []
+                for step in ready:
+                    agent = self.agents_by_role[step.role]
+                    context = contexts[step.team] if self.graph.teams else previous_output
+                    evidence = None
+                    if self.evidence is not None and step.kind == "research":
+                        evidence = self.evidence.retrieve(step.role, step.stance)
+                    task = create_step_task(agent, self.config, round_num, step, context,
+                                            {r: outputs[r].text for r in step.inputs}, kinds, evidence)
+                    new_steps.append(self._prepare(round_num, agent, task))
+                    started.add(step.role)
+                message = yield new_steps
+                self._release(self.agents_by_role[message.role])
+                outputs[message.role] = self._finish(round_num, message)
+        finally:
+            for role in started:
+                self._release(self.agents_by_role[role])
+
+        # Transcript order follows the protocol, not completion order
+        for role in self.graph.roles:
+            self.transcript.add(outputs[role])
+
+    def _run_final_judgment(self) -> StepGenerator:
         """Run the final judgment phase."""
         judge = self.agents[-1]  # Judge is always last
 
-        all_outputs = [r["output"] for r in self.round_outputs]
-        judge_task = create_judge_task(judge, self.config, all_outputs)
-
-        judge_crew = Crew(
-            agents=[judge],
-            tasks=[judge_task],
-            process=Process.sequential,
-            verbose=self.config.verbose,
-        )
-
-        result = str(judge_crew.kickoff())
-        return result
-
-    def _save_results(self, results: dict) -> None:
-        """Save results to a JSON file."""
-        output_dir = Path("results")
-        output_dir.mkdir(exist_ok=True)
+        outputs = self._published_rounds() if self.graph.teams else self.transcript.round_outputs()
+        limit = self.budget.history_limit() if self.budget is not None else None
+        if limit is not None and outputs:
+            # Keep every round visible to the judge, each shortened to an equal share
+            self._budget_decision("shorten_history", "judgment_reserve", max_tokens=limit)
+            outputs = [shorten(output, limit // len(outputs)) for output in outputs]
+        if self.graph.teams:
+            judge_task = create_team_judge_task(judge, self.config, outputs, self.graph.teams)
+        else:
+            judge_task = create_judge_task(judge, self.config, outputs)
+
+        return (yield from self._step(None, judge, judge_task))
+
+    def _run_task(self, agent: Agent, task: Task) -> tuple[str, dict]:
+        """Run a single agent task and return its output text and token usage."""
+        call = self._call
+        if self.cassette is not None:
+            call = self.cassette.wrap(call)
+        if self.hedger is not None:
+            call = lambda agent, task, inner=call: self.hedger.run(agent, task, inner)
+        model_name = self.config.model_for(agent.role)
+        if self.cascade is not None and self.cascade.applies(model_name):
+            call = lambda agent, task, inner=call: self.cascade.run(agent, task, model_name, inner)
+
+        start = time.time()
+        try:
+            text, usage = call(agent, task)
+        except Exception as e:
+            record_error(agent.role, e)
+            raise
+        self._record_call(agent.role, model_name, start, usage)
+        return text, usage
+
+    async def _run_task_async(self, agent: Agent, task: Task) -> tuple[str, dict]:
+        """Async _run_task: awaits the call on the event loop when nothing in the chain blocks."""
+        model_name = self.config.model_for(agent.role)
+        blocking = (self.cassette is not None or self.hedger is not None
+                    or (self.cascade is not None and self.cascade.applies(model_name))
+                    or (self.backend is not None and not is_async_call(self.backend)))
+        if blocking:
+            # Cassettes, hedging, cascades and sync backends run in a worker thread;
+            # cancelling abandons such a call rather than aborting it
+            return await asyncio.to_thread(self._run_task, agent, task)
+
+        start = time.time()
+        try:
+            if self.backend is not None:
+                text, usage = await self.backend(agent, task)
+            else:
+                text, usage = await run_task_with_usage_async(agent, task, verbose=self.config.verbose)
+        except Exception as e:
+            record_error(agent.role, e)
+            raise
+        self._record_call(agent.role, model_name, start, usage)
+        return text, usage
+
+    def _record_call(self, role: str, model_name: str, start: float, usage: dict) -> None:
+        record_call(role, model_name, time.time() - start, usage)
+        self.call_costs[role] = usage.get("cost")
+
+    def _call(self, agent: Agent, task: Task) -> tuple[str, dict]:
+        if self.backend is not None:
+            if is_async_call(self.backend):
+                # An async backend behind a cassette, hedger or cascade, off the event loop
+                return asyncio.run(self.backend(agent, task))
+            return self.backend(agent, task)
+        return run_task_with_usage(agent, task, verbose=self.config.verbose)
+
+    def _save_results(self, results: dict) -> Path:
+        """Save results to a JSON file and return its path."""
+        output_dir = Path(self.config.results_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"debate_{self.config.num_agents}agents_{self.config.num_rounds}rounds_{timestamp}.json"
-        filepath = output_dir / filename
-
-        with open(filepath, "w") as f:
-            json.dump(results, f, indent=2)
+        stem = f"debate_{self.config.num_agents}agents_{self.config.num_rounds}rounds_{timestamp}"
+        suffix = ".json" if self.config.results_format == "json" else SUFFIX
+        filepath = output_dir / f"{stem}{suffix}"
+        # Fast sweeps can finish several identical configs within one second; creating
+        # the file exclusively reserves the name even against concurrent debates
+        counter = 1
+        while True:
+            try:
+                filepath.touch(exist_ok=False)
+                break
+            except FileExistsError:
+                filepath = output_dir / f"{stem}_{counter}{suffix}"
+                counter += 1
+
+        if self.config.results_format == "json":
+            with open(filepath, "w") as f:
+                json.dump(results, f, indent=2)
+        else:
+            write_results(results, filepath)
+
+        self._announce(
+            "results_saved", f"\n{'='*80}\nResults saved to: {filepath}\n{'='*80}\n",
+            f"results saved to {filepath}", results_file=str(filepath),
+        )
 
-        print(f"\n{'='*80}")
-        print(f"Results saved to: {filepath}")
-        print(f"{'='*80}\n")
+        return filepath
 
 
-def run_debate(config: Optional[DebateConfig] = None) -> dict:
-    """Convenience function to run a debate with the given configuration."""
+def require_api_key(cassette: Optional[Cassette] = None) -> None:
+    """Load .env and fail early without an API key (strict replay never reaches the API)."""
     load_dotenv()
-
-    # Verify API key
-    if not os.getenv("ANTHROPIC_API_KEY"):
+    strict_replay = cassette is not None and cassette.mode == "strict"
+    if not strict_replay and not os.getenv("ANTHROPIC_API_KEY"):
         raise ValueError(
             "ANTHROPIC_API_KEY not found in environment. "
             "Please create a .env file with your API key."
         )
 
+
+def run_debate(config: Optional[DebateConfig] = None, hedger: Optional[HedgePolicy] = None,
+               cassette: Optional[Cassette] = None, cascade: Optional[CascadePolicy] = None) -> dict:
+    """Convenience function to run a debate with the given configuration."""
+    require_api_key(cassette)
+
     if config is None:
         config = DebateConfig()
 
-    orchestrator = DebateOrchestrator(config)
-    return orchestrator.run_debate()
+    orchestrator = DebateOrchestrator(config, hedger=hedger, cassette=cassette, cascade=cascade)
+    results = orchestrator.run_debate()
+    if cassette is not None:
+        cassette.save()
+    return results
+
+
+async def run_debate_async(config: Optional[DebateConfig] = None, step_timeout: Optional[float] = None,
+                           deadline: Optional[float] = None,
+                           on_event: Optional[Callable[[str, dict], None]] = None, **orchestrator_args) -> dict:
+    """Run a debate on the running event loop and return the same results as run_debate.
+
+    on_event receives every progress event (see stream_debate). Other keyword
+    arguments go to DebateOrchestrator (backend, agents, hedger, cassette, cascade).
+    Agent setup runs in a worker thread so it does not stall other debates on the loop.
+    """
+    if orchestrator_args.get("backend") is None:
+        require_api_key(orchestrator_args.get("cassette"))
+    orchestrator = await asyncio.to_thread(DebateOrchestrator, config or DebateConfig(), **orchestrator_args)
+    orchestrator.on_event = on_event
+    results = await orchestrator.run_debate_async(step_timeout, deadline)
+    if orchestrator.cassette is not None:
+        orchestrator.cassette.save()
+    return results
+
+
+async def stream_debate(config: Optional[DebateConfig] = None, step_timeout: Optional[float] = None,
+                        deadline: Optional[float] = None, **orchestrator_args) -> AsyncIterator[dict]:
+    """Run a debate on the running event loop, yielding its progress events as they happen.
+
+    Events are dicts with "event" (debate_started, round_started, step_started,
+    step_finished, round_finished, budget_decision, judgment_started,
+    debate_finished...), "debate_id", "time" and the event's fields. The last
+    event is {"event": "results", "results": <the run_debate results>}. If the
+    debate fails, the error is raised once the events before it have been
+    yielded. Stopping iteration early (e.g. the client went away) cancels the
+    debate and its in-flight calls.
+    """
+    events = asyncio.Queue()
+    run = asyncio.ensure_future(run_debate_async(
+        config, step_timeout, deadline, lambda event, fields: events.put_nowait({"event": event, **fields}),
+        **orchestrator_args,
+    ))
+    next_event = None
+    try:
+        while True:
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, run}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event.done():
+                yield next_event.result()
+                continue
+            next_event.cancel()
+            while not events.empty():
+                yield events.get_nowait()
+            yield {"event": "results", "results": run.result()}
+            return
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+        if not run.done():
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,291 @@
+"""Cross-debate evidence store with a local BM25 index.
+
+Research outputs are split into evidence snippets: sentences and bullets
+that carry figures, sources or concrete examples. The snippets are kept in a
+SQLite file that every debate pointing at it shares
+(``DebateConfig(evidence_store=...)``). Before each research step the
+orchestrator retrieves the top-k snippets for the topic and the step's
+stance with BM25. It injects them into the prompt so the Researcher can build
+on known facts instead of regenerating them. A debate never retrieves its own
+snippets, because its previous round is already in the prompt.
+
+Per debate, results["evidence"] records:
+
+- how many snippets were injected, and the share the Researcher reused
+  (most of a snippet's terms appear in its output)
+- research completion tokens, compared with the store's baseline for
+  research calls on the same topic made without evidence
+"""
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from budget import CHARS_PER_TOKEN
+from config import DebateConfig
+from convergence import TOKEN
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippets (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    debate_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS research_calls (
+    topic TEXT NOT NULL,
+    with_evidence INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL
+);
+"""
+
+# Bullets, numbered items, paragraphs and sentences
+SNIPPET_SPLIT = re.compile(r"\n\s*(?:[-*•]|\d+[.)])\s+|\n\s*\n|(?<=[.!?])\s+(?=[A-Z])")
+EVIDENCE_CUE = re.compile(
+    r"\d|\b(?:stud(?:y|ies)|survey|report|according|research|data|estimate[sd]?|found|"
+    r"percent|case|example|analysis|evidence)\b",
+    re.IGNORECASE,
+)
+MIN_SNIPPET_CHARS = 40
+MAX_SNIPPET_CHARS = 400
+STOPWORDS = frozenset(
+    "the and for that with this from have will their they which more than into about such "
+    "these those also been were would could should there what when where while".split()
+)
+REUSE_OVERLAP = 0.6  # Share of a snippet's terms that must appear in an output to count as reused
+
+
+def extract_snippets(text: str) -> list[str]:
+    """Self-contained evidence sentences and bullets from a research output."""
+    snippets = []
+    for part in SNIPPET_SPLIT.split(text):
+        part = " ".join(part.split()).strip("-*•# ")
+        if MIN_SNIPPET_CHARS <= len(part) <= MAX_SNIPPET_CHARS and EVIDENCE_CUE.search(part):
+            snippets.append(part)
+    return list(dict.fromkeys(snippets))
+
+
+def terms(text: str) -> list[str]:
+    return [t for t in TOKEN.findall(text.lower()) if len(t) > 2 and t not in STOPWORDS]
+
+
+def reused(snippet: str, output: str) -> bool:
+    """Whether an output restates or builds on a snippet (most of its terms appear in it)."""
+    snippet_terms = set(terms(snippet))
+    if not snippet_terms:
+        return False
+    return len(snippet_terms & set(terms(output))) / len(snippet_terms) >= REUSE_OVERLAP
+
+
+class BM25Index:
+    """In-memory Okapi BM25 over short documents."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)  # term -> {doc id: term frequency}
+        self.lengths = {}
+        self.total_length = 0
+
+    def add(self, doc_id: int, text: str) -> None:
+        doc_terms = terms(text)
+        for term, tf in Counter(doc_terms).items():
+            self.postings[term][doc_id] = tf
+        self.lengths[doc_id] = len(doc_terms)
+        self.total_length += len(doc_terms)
+
+    def search(self, query: str, k: int, exclude: frozenset = frozenset()) -> list[tuple[int, float]]:
+        """Top-k (doc id, score) pairs for a query, best first."""
+        n = len(self.lengths)
+        if not n:
+            return []
+        avg_length = self.total_length / n
+        scores = defaultdict(float)
+        for term in set(terms(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if doc_id in exclude:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class EvidenceStore:
+    """SQLite-backed evidence snippets with a BM25 index kept in step with the file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self.index = BM25Index()
+        self.texts = {}
+        self.debates = defaultdict(set)  # debate id -> its snippet ids
+        self.loaded = 0  # Highest snippet id in the index
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        """Index snippets added since the last refresh, by this or any other process."""
+        rows = conn.execute("SELECT id, text, debate_id FROM snippets WHERE id > ? ORDER BY id",
+                            (self.loaded,)).fetchall()
+        for snippet_id, text, debate_id in rows:
+            self.index.add(snippet_id, text)
+            self.texts[snippet_id] = text
+            self.debates[debate_id].add(snippet_id)
+            self.loaded = snippet_id
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def search(self, query: str, k: int, exclude_debate: Optional[str] = None) -> list[tuple[int, str]]:
+        """Top-k (id, text) snippets for a query, skipping one debate's own snippets."""
+        with self.lock, self._connect() as conn:
+            self._refresh(conn)
+            exclude = frozenset(self.debates.get(exclude_debate, ()))
+            return [(snippet_id, self.texts[snippet_id]) for snippet_id, _ in self.index.search(query, k, exclude)]
+
+    def add(self, text: str, topic: str, debate_id: str, known: Iterable[str] = ()) -> int:
+        """Extract and store the evidence snippets of one output; returns how many were new.
+
+        Snippets that restate one of known (the evidence the output was given)
+        are echoes rather than new evidence, and are skipped.
+        """
+        known = list(known)
+        rows = [(hashlib.sha256(s.lower().encode()).hexdigest(), s, topic, debate_id, time.time())
+                for s in extract_snippets(text) if not any(reused(k, s) or reused(s, k) for k in known)]
+        with self.lock, self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO snippets (hash, text, topic, debate_id, created) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            added = conn.total_changes - before
+            self._refresh(conn)
+        return added
+
+    def mark_used(self, snippet_ids: list[int]) -> None:
+        if snippet_ids:
+            with self._connect() as conn:
+                conn.executemany("UPDATE snippets SET uses = uses + 1 WHERE id = ?", [(i,) for i in snippet_ids])
+
+    def record_research(self, topic: str, with_evidence: bool, completion_tokens: int) -> None:
+        with self._connect() as conn:
+            conn.execute("INSERT INTO research_calls VALUES (?, ?, ?)", (topic, int(with_evidence), completion_tokens))
+
+    def baseline(self, topic: str) -> Optional[float]:
+        """Mean completion tokens of research calls on a topic made without evidence."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT AVG(completion_tokens) FROM research_calls WHERE topic = ? AND with_evidence = 0",
+                               (topic,)).fetchone()
+        return row[0]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path: str) -> EvidenceStore:
+    """The process-wide store for a path, so concurrent debates share one index."""
+    key = str(Path(path).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = EvidenceStore(Path(path))
+        return _stores[key]
+
+
+class EvidenceReuse:
+    """Per-debate retrieval of earlier evidence and accounting of how much was reused."""
+
+    def __init__(self, store: EvidenceStore, topic: str, debate_id: str, top_k: int = 5):
+        self.store = store
+        self.topic = topic
+        self.debate_id = debate_id
+        self.top_k = top_k
+        # Taken before this debate records anything, so it only reflects earlier debates
+        self.baseline = store.baseline(topic)
+        self.injected = {}  # role -> (id, text) snippets given to its running research step
+        self.replaying = False  # Set while a resumed debate replays recorded outputs: count, don't store
+        self.research_calls = 0
+        self.calls_with_evidence = 0
+        self.completion_tokens = 0
+        self.completion_tokens_with_evidence = 0
+        self.snippets_injected = 0
+        self.snippets_reused = 0
+        self.snippets_added = 0
+        self.prompt_tokens_added = 0
+
+    @classmethod
+    def from_config(cls, config: DebateConfig, debate_id: str) -> "EvidenceReuse":
+        return cls(open_store(config.evidence_store), config.topic, debate_id, config.evidence_top_k)
+
+    def retrieve(self, role: str, stance: Optional[str] = None) -> list[str]:
+        """Snippets for a research step, remembered until its output is recorded."""
+        query = f"{self.topic} {stance or ''}"
+        snippets = self.store.search(query, self.top_k, exclude_debate=self.debate_id) if self.top_k > 0 else []
+        self.injected[role] = snippets
+        return [text for _, text in snippets]
+
+    def record(self, role: str, text: str, completion_tokens: int) -> None:
+        """Score reuse for a finished research step and add its own evidence to the store."""
+        if role not in self.injected:
+            return
+        snippets = self.injected.pop(role)
+        used = [snippet_id for snippet_id, snippet in snippets if reused(snippet, text)]
+        if not self.replaying:
+            self.store.mark_used(used)
+            self.store.record_research(self.topic, bool(snippets), completion_tokens)
+        self.research_calls += 1
+        self.completion_tokens += completion_tokens
+        if snippets:
+            self.calls_with_evidence += 1
+            self.completion_tokens_with_evidence += completion_tokens
+            self.snippets_injected += len(snippets)
+            self.snippets_reused += len(used)
+            self.prompt_tokens_added += sum(len(snippet) for _, snippet in snippets) // CHARS_PER_TOKEN
+        if not self.replaying:
+            self.snippets_added += self.store.add(text, self.topic, self.debate_id, [s for _, s in snippets])
+
+    def report(self) -> dict:
+        """Reuse rate and token savings of this debate, for its results file."""
+        saved = None
+        if self.baseline is not None and self.calls_with_evidence:
+            mean_with = self.completion_tokens_with_evidence / self.calls_with_evidence
+            saved = round((self.baseline - mean_with) * self.calls_with_evidence)
+        return {
+            "store": str(self.store.path),
+            "top_k": self.top_k,
+            "research_calls": self.research_calls,
+            "calls_with_evidence": self.calls_with_evidence,
+            "snippets_injected": self.snippets_injected,
+            "snippets_reused": self.snippets_reused,
+            "reuse_rate": round(self.snippets_reused / self.snippets_injected, 3) if self.snippets_injected else None,
+            "research_completion_tokens": self.completion_tokens,
+            "baseline_completion_tokens": round(self.baseline, 1) if self.baseline is not None else None,
+            "completion_tokens_saved": saved,  # Against the baseline, for the calls that had evidence
+            "prompt_tokens_added": self.prompt_tokens_added,
+            "snippets_added": self.snippets_added,
+            "store_size": len(self.store),
+        }
@@ -0,0 +1,232 @@
+"""Columnar export of debate metrics to a partitioned Parquet dataset.
+
+Two hive-partitioned (model=/date=) datasets are written under the output
+directory: ``debates`` with one row per debate (config, per-criterion scores,
+convergence, durations, token totals) and ``steps`` with one row per agent
+call (round, role, model, duration, token counts). Exports are incremental:
+files already exported are listed in ``_exported.json`` and skipped. The
+manifest also lists the part files each export committed, so parts left by
+an export that crashed before updating it are deleted and re-exported rather
+than duplicated.
+
+Requires pyarrow (``pip install pyarrow``).
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from analyze_results import analyze_debate_file
+from config import DebateConfig, RUBRIC_CRITERIA
+from results_store import list_results, load_results
+
+
+DATASET_DIR = Path("results") / "parquet"
+MANIFEST = "_exported.json"
+PARTITION_COLS = ["model", "date"]
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+
+
+def debate_schema() -> "pa.Schema":
+    """Explicit schema so incremental parts always agree, even when a batch has only nulls."""
+    return pa.schema([
+        ("file", pa.string()),
+        ("timestamp", pa.string()),
+        ("topic", pa.string()),
+        ("num_agents", pa.int64()),
+        ("num_rounds", pa.int64()),
+        ("temperature", pa.float64()),
+        ("include_devil_advocate", pa.bool_()),
+        ("agents", pa.string()),
+        *[(f"score_{c}", pa.int64()) for c in RUBRIC_CRITERIA],
+        ("average_score", pa.float64()),
+        ("convergence", pa.string()),
+        ("total_duration", pa.float64()),
+        ("round_durations", pa.list_(pa.float64())),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("model", pa.string()),
+        ("date", pa.string()),
+    ])
+
+
+def step_schema() -> "pa.Schema":
+    return pa.schema([
+        ("file", pa.string()),
+        ("round", pa.int64()),
+        ("role", pa.string()),
+        ("duration", pa.float64()),
+        ("prompt_tokens", pa.int64()),
+        ("completion_tokens", pa.int64()),
+        ("cascade_model", pa.string()),
+        ("model", pa.string()),
+        ("date", pa.string()),
+    ])
+
+
+def debate_rows(filepath: Path) -> tuple[Dict[str, Any], list[Dict[str, Any]]]:
+    """Flatten one results file into a debate row and its per-step rows."""
+    analysis = analyze_debate_file(filepath)
+    data = load_results(filepath)
+    config = data["config"]
+    date = data.get("timestamp", "")[:10]
+    # Each role's routed model; a cascade may re-run its failed outputs on cascade_model
+    routing = DebateConfig.from_results(config)
+
+    def models(role: str) -> dict:
+        model = routing.model_for(role)
+        cascade = routing.cascade_model if routing.cascade_model not in (None, model) else None
+        return {"cascade_model": cascade, "model": model}
+
+    steps = []
+    for round_data in data["rounds"]:
+        # Legacy files have no per-message timing or token counts
+        for message in round_data.get("messages", []):
+            steps.append({
+                "file": filepath.name,
+                "round": round_data["round"],
+                "role": message["role"],
+                "duration": message["duration"],
+                "prompt_tokens": message["prompt_tokens"],
+                "completion_tokens": message["completion_tokens"],
+                **models(message["role"]),
+                "date": date,
+            })
+    judgment = data.get("judgment")
+    if judgment:
+        steps.append({
+            "file": filepath.name,
+            "round": None,
+            "role": "Judge",
+            "duration": judgment["duration"],
+            "prompt_tokens": judgment["prompt_tokens"],
+            "completion_tokens": judgment["completion_tokens"],
+            **models("Judge"),
+            "date": date,
+        })
+
+    row = {
+        "file": filepath.name,
+        "timestamp": data.get("timestamp"),
+        "topic": config["topic"],
+        "num_agents": config["num_agents"],
+        "num_rounds": config["num_rounds"],
+        "temperature": config["temperature"],
+        "include_devil_advocate": config.get("include_devil_advocate", False),
+        "agents": ", ".join(config.get("agents", [])),
+        **{f"score_{c}": analysis["scores"].get(c) for c in RUBRIC_CRITERIA},
+        "average_score": analysis["average_score"],
+        "convergence": analysis["convergence"],
+        "total_duration": data["total_duration"],
+        "round_durations": [r["duration"] for r in data["rounds"]],
+        "prompt_tokens": sum(s["prompt_tokens"] for s in steps),
+        "completion_tokens": sum(s["completion_tokens"] for s in steps),
+        "model": config["model"],
+        "date": date,
+    }
+    return row, steps
+
+
+def part_files(out_dir: Path) -> list[Path]:
+    return [p for name in ("debates", "steps") if (out_dir / name).exists()
+            for p in (out_dir / name).rglob("part-*.parquet")]
+
+
+def part_prefix(path: Path) -> str:
+    """The export a part file belongs to (its basename without the per-file counter)."""
+    return path.name.rsplit("-", 1)[0]
+
+
+def load_manifest(out_dir: Path) -> dict:
+    """Exported results files and the part file prefixes of the exports that committed them."""
+    path = out_dir / MANIFEST
+    if not path.exists():
+        return {"files": [], "parts": []}
+    manifest = json.loads(path.read_text())
+    if isinstance(manifest, list):
+        # Older manifests list only files; every part already on disk was committed
+        return {"files": manifest, "parts": sorted({part_prefix(p) for p in part_files(out_dir)})}
+    return manifest
+
+
+def export(results_dir: Path, out_dir: Path = DATASET_DIR) -> int:
+    """Append every not-yet-exported results file to the Parquet datasets."""
+    require_pyarrow()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    # Parts of an export that never reached the manifest: their files are exported again below
+    committed = set(manifest["parts"])
+    for path in part_files(out_dir):
+        if part_prefix(path) not in committed:
+            path.unlink()
+
+    exported = set(manifest["files"])
+    new_files = [p for p in sorted(list_results(results_dir)) if p.name not in exported]
+    if not new_files:
+        return 0
+
+    debates, steps = [], []
+    for filepath in new_files:
+        row, step_rows = debate_rows(filepath)
+        debates.append(row)
+        steps.extend(step_rows)
+
+    # Each export appends new part files; existing partitions are left untouched
+    prefix = f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    for name, rows, schema in (("debates", debates, debate_schema()), ("steps", steps, step_schema())):
+        if rows:
+            pq.write_to_dataset(
+                pa.Table.from_pylist(rows, schema=schema), out_dir / name, partition_cols=PARTITION_COLS,
+                basename_template=f"{prefix}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore",
+            )
+
+    # The export commits when the manifest is replaced
+    tmp = out_dir / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps({"files": sorted(exported | {p.name for p in new_files}),
+                               "parts": sorted(committed | {prefix})}))
+    os.replace(tmp, out_dir / MANIFEST)
+    return len(new_files)
+
+
+def read_dataset(out_dir: Path = DATASET_DIR, name: str = "debates") -> "pa.Table":
+    """Read one dataset (debates or steps) with memory-mapped Parquet reads."""
+    require_pyarrow()
+    schema = debate_schema() if name == "debates" else step_schema()
+    return pq.read_table(out_dir / name, memory_map=True, partitioning="hive", schema=schema)
+
+
+def summarize(table: "pa.Table") -> "pa.Table":
+    """Mean scores and durations per configuration."""
+    keys = ["model", "num_agents", "num_rounds", "temperature", "include_devil_advocate"]
+    aggregations = [("file", "count"), ("average_score", "mean"), ("total_duration", "mean")]
+    aggregations += [(f"score_{c}", "mean") for c in RUBRIC_CRITERIA]
+    summary = table.group_by(keys).aggregate(aggregations)
+    return summary.sort_by([(k, "ascending") for k in keys])
+
+
+def main():
+    """Export results to Parquet incrementally."""
+    parser = argparse.ArgumentParser(description="Export debate metrics to partitioned Parquet")
+    parser.add_argument("results_dir", nargs="?", type=Path, default=Path("results"))
+    parser.add_argument("--out", type=Path, default=DATASET_DIR)
+    args = parser.parse_args()
+
+    count = export(args.results_dir, args.out)
+    print(f"✓ Exported {count} new results files to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,384 @@
-"""Generate a simple text-based diagram of the debate flow."""
+"""Debate diagrams: timing-driven timelines from results files, and static flow diagrams.
+
+A timeline is a Gantt chart (ASCII and SVG) of one debate's agent calls,
+read from the start/duration recorded for every message. It highlights:
+
+- the critical path: the chain of calls that set the debate's wall-clock,
+  found by walking back from the last call to finish through whichever of
+  its dependencies (same-round inputs, the previous round, or the last round
+  for the Judge) finished last
+- idle gaps: time where no agent call was running (orchestration overhead)
+- retry time: the part of a call spent on a discarded attempt (an escalated
+  cascade call, or a hedged call before its duplicate won)
+
+Over several results files, a utilisation chart shows concurrent agent
+calls and debates in flight across the sweep. Results without per-message
+timings (legacy files) fall back to the static flow diagrams.
+"""
+
+import argparse
+from html import escape
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from config import DebateConfig
+from protocols import round_graph
+from results_store import list_results, load_results
+from transcript import Transcript
+
+
+OUTPUT_DIR = Path("deliverables")
+WIDTH = 60  # ASCII time-axis columns
+CRITICAL, OTHER, RETRY, IDLE = "█", "░", "▒", "·"
+SVG_WIDTH, SVG_LABEL, SVG_ROW = 900, 190, 22
+
+
+class Call(NamedTuple):
+    """One agent call, in seconds from the debate's first call (round is None for the Judge)."""
+    round: Optional[int]
+    role: str
+    start: float
+    end: float
+    retry: float
+
+
+class Timeline(NamedTuple):
+    name: str
+    origin: float  # Epoch time of the first call
+    calls: list[Call]
+    critical: list[int]  # Indices into calls, in time order
+    gaps: list[tuple[float, float]]
+
+    @property
+    def span(self) -> float:
+        return max((c.end for c in self.calls), default=0.0)
+
+
+def debate_calls(data: dict) -> tuple[float, list[Call]]:
+    """Epoch start of the debate and its timed calls (none for files without timings)."""
+    messages = [m for m in Transcript.from_results(data) if m.start]
+    if not messages:
+        return 0.0, []
+    origin = min(m.start for m in messages)
+    calls = [Call(m.round, m.role, m.start - origin, m.start - origin + m.duration, min(m.retry, m.duration))
+             for m in messages]
+    return origin, sorted(calls, key=lambda c: (c.start, c.end))
+
+
+def dependencies(calls: list[Call], config: Optional[dict]) -> list[list[int]]:
+    """For each call, the calls it had to wait for.
+
+    The round graph is rebuilt from the saved config; calls it cannot place
+    depend on every call that had finished by the time they started.
+    """
+    try:
+        steps = {step.role: step for step in round_graph(DebateConfig.from_results(config or {})).steps}
+    except (KeyError, TypeError, ValueError):
+        steps = {}
+    by_round = {}
+    for i, call in enumerate(calls):
+        by_round.setdefault(call.round, []).append(i)
+    rounds = sorted(r for r in by_round if r is not None)
+
+    deps = []
+    for call in calls:
+        step = steps.get(call.role)
+        if call.round is None and rounds:
+            deps.append(by_round[rounds[-1]])
+        elif step is not None and step.inputs:
+            deps.append([i for i in by_round[call.round] if calls[i].role in step.inputs])
+        elif step is not None:
+            # A round's first steps wait for the whole previous round
+            deps.append(by_round.get(call.round - 1, []))
+        else:
+            deps.append([i for i, other in enumerate(calls) if other.end <= call.start + 1e-6])
+    return deps
+
+
+def critical_path(calls: list[Call], deps: list[list[int]]) -> list[int]:
+    """Walk back from the last call to finish through the latest-finishing dependency."""
+    if not calls:
+        return []
+    current = max(range(len(calls)), key=lambda i: calls[i].end)
+    path = [current]
+    while deps[current]:
+        current = max(deps[current], key=lambda i: calls[i].end)
+        path.append(current)
+    return path[::-1]
+
+
+def idle_gaps(calls: list[Call], min_gap: float) -> list[tuple[float, float]]:
+    """Stretches of at least min_gap seconds where no call was running."""
+    gaps, busy_until = [], 0.0
+    for call in sorted(calls, key=lambda c: c.start):
+        if call.start - busy_until >= min_gap:
+            gaps.append((busy_until, call.start))
+        busy_until = max(busy_until, call.end)
+    return gaps
+
+
+def build_timeline(filepath: Path, min_gap_fraction: float = 0.01) -> Optional[Timeline]:
+    """The timeline of one results file, or None if it has no per-message timings."""
+    data = load_results(filepath)
+    origin, calls = debate_calls(data)
+    if not calls:
+        return None
+    span = max(c.end for c in calls)
+    critical = critical_path(calls, dependencies(calls, data.get("config")))
+    return Timeline(filepath.name, origin, calls, critical, idle_gaps(calls, span * min_gap_fraction))
+
+
+def call_label(call: Call) -> str:
+    return f"{'R' + str(call.round) if call.round is not None else 'Final'} {call.role}"
+
+
+def timeline_summary(timeline: Timeline) -> dict:
+    """Where the wall-clock went: critical path time per role, idle and retry time."""
+    per_role = {}
+    for i in timeline.critical:
+        call = timeline.calls[i]
+        per_role[call.role] = per_role.get(call.role, 0.0) + call.end - call.start
+    return {
+        "span": timeline.span,
+        "critical_path": sum(per_role.values()),
+        "critical_roles": per_role,
+        "idle": sum(end - start for start, end in timeline.gaps),
+        "retry": sum(c.retry for c in timeline.calls),
+        "calls": len(timeline.calls),
+    }
+
+
+def axis_labels(span: float, width: int) -> str:
+    """Tick labels every 10 columns."""
+    line = ""
+    for col in range(0, width + 1, 10):
+        label = f"{span * col / width:.1f}s"
+        line = line.ljust(col) + label
+    return line
+
+
+def render_timeline_ascii(timeline: Timeline, width: int = WIDTH) -> str:
+    span = timeline.span or 1.0
+    col = lambda t: min(width - 1, int(t / span * width))
+    critical = set(timeline.critical)
+    summary = timeline_summary(timeline)
+    label_width = max(len(call_label(c)) for c in timeline.calls) + 2
+
+    lines = [
+        f"TIMELINE: {timeline.name}",
+        "=" * (label_width + width + 2),
+        f"Wall-clock {summary['span']:.2f}s | critical path {summary['critical_path']:.2f}s | "
+        f"idle {summary['idle']:.2f}s | retry {summary['retry']:.2f}s | {summary['calls']} calls",
+        "",
+        " " * (label_width + 1) + axis_labels(span, width),
+    ]
+    for i, call in enumerate(timeline.calls):
+        row = [" "] * width
+        start, end = col(call.start), max(col(call.start) + 1, col(call.end))
+        retry_end = col(call.start + call.retry) if call.retry else start
+        for c in range(start, min(end, width)):
+            row[c] = RETRY if c < retry_end else CRITICAL if i in critical else OTHER
+        lines.append(f"{call_label(call):<{label_width}}|{''.join(row)}| {call.start:.1f}-{call.end:.1f}s")
+    if timeline.gaps:
+        row = [" "] * width
+        for start, end in timeline.gaps:
+            for c in range(col(start), max(col(start) + 1, col(end))):
+                row[c] = IDLE
+        lines.append(f"{'idle':<{label_width}}|{''.join(row)}|")
+
+    lines += ["", f"Legend: {CRITICAL} critical path  {OTHER} other call  {RETRY} retry  {IDLE} idle gap", ""]
+    lines.append("Critical path by role:")
+    for role, seconds in sorted(summary["critical_roles"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {role:<24} {seconds:>7.2f}s ({seconds / span:.0%} of wall-clock)")
+    return "\n".join(lines) + "\n"
+
+
+def svg_axis(span: float, plot_width: int, top: int, bottom: int) -> list[str]:
+    parts = []
+    for tick in range(11):
+        x = SVG_LABEL + plot_width * tick / 10
+        parts.append(f'<line x1="{x:.1f}" y1="{top}" x2="{x:.1f}" y2="{bottom}" stroke="#e0e0e0"/>')
+        parts.append(f'<text x="{x:.1f}" y="{top - 4}" font-size="10" text-anchor="middle">{span * tick / 10:.1f}s</text>')
+    return parts
+
+
+def render_timeline_svg(timeline: Timeline) -> str:
+    span = timeline.span or 1.0
+    plot_width = SVG_WIDTH - SVG_LABEL - 20
+    x = lambda t: SVG_LABEL + t / span * plot_width
+    top = 50
+    height = top + SVG_ROW * len(timeline.calls) + 40
+    critical = set(timeline.critical)
+    summary = timeline_summary(timeline)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}" height="{height}" font-family="sans-serif">',
+        f'<rect width="{SVG_WIDTH}" height="{height}" fill="white"/>',
+        f'<text x="10" y="18" font-size="14" font-weight="bold">{escape(timeline.name)}</text>',
+        f'<text x="10" y="34" font-size="11">Wall-clock {summary["span"]:.2f}s, critical path '
+        f'{summary["critical_path"]:.2f}s, idle {summary["idle"]:.2f}s, retry {summary["retry"]:.2f}s</text>',
+    ]
+    bottom = top + SVG_ROW * len(timeline.calls)
+    for start, end in timeline.gaps:
+        parts.append(f'<rect x="{x(start):.1f}" y="{top}" width="{max(1.0, x(end) - x(start)):.1f}" '
+                     f'height="{bottom - top}" fill="#fff3b0"><title>idle {end - start:.2f}s</title></rect>')
+    parts += svg_axis(span, plot_width, top, bottom)
+    for i, call in enumerate(timeline.calls):
+        y = top + SVG_ROW * i + 4
+        fill = "#d62728" if i in critical else "#8c8c8c"
+        width = max(1.0, x(call.end) - x(call.start))
+        parts.append(f'<text x="{SVG_LABEL - 6}" y="{y + 12}" font-size="11" text-anchor="end">'
+                     f'{escape(call_label(call))}</text>')
+        parts.append(f'<rect x="{x(call.start):.1f}" y="{y}" width="{width:.1f}" height="{SVG_ROW - 8}" fill="{fill}">'
+                     f'<title>{escape(call_label(call))}: {call.end - call.start:.2f}s</title></rect>')
+        if call.retry:
+            parts.append(f'<rect x="{x(call.start):.1f}" y="{y}" width="{max(1.0, x(call.start + call.retry) - x(call.start)):.1f}" '
+                         f'height="{SVG_ROW - 8}" fill="#ff7f0e"><title>retry {call.retry:.2f}s</title></rect>')
+    legend_y = bottom + 24
+    for j, (fill, name) in enumerate([("#d62728", "critical path"), ("#8c8c8c", "other call"),
+                                      ("#ff7f0e", "retry"), ("#fff3b0", "idle gap")]):
+        lx = SVG_LABEL + j * 130
+        parts.append(f'<rect x="{lx}" y="{legend_y - 10}" width="12" height="12" fill="{fill}" stroke="#999"/>')
+        parts.append(f'<text x="{lx + 18}" y="{legend_y}" font-size="11">{name}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
+class Utilisation(NamedTuple):
+    """Concurrency across a sweep, in seconds from its first call."""
+    span: float
+    calls: list[tuple[float, int]]  # (time, agent calls in flight) at each change
+    debates: list[tuple[float, int]]  # (time, debates in flight) at each change
+
+    @staticmethod
+    def steps(intervals: list[tuple[float, float]]) -> list[tuple[float, int]]:
+        events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+        level, steps = 0, [(0.0, 0)]
+        for t, delta in events:
+            level += delta
+            steps.append((t, level))
+        return steps
+
+    @staticmethod
+    def mean(steps: list[tuple[float, int]], span: float) -> float:
+        area = sum((t2 - t1) * level for (t1, level), (t2, _) in zip(steps, steps[1:]))
+        return area / span if span else 0.0
+
+    def bucket_means(self, buckets: int) -> list[float]:
+        """Mean calls in flight per time bucket."""
+        width = (self.span or 1.0) / buckets
+        means = [0.0] * buckets
+        for (t1, level), (t2, _) in zip(self.calls, self.calls[1:]):
+            b = int(t1 / width)
+            while level and t1 < t2 and b < buckets:
+                edge = min(t2, (b + 1) * width)
+                means[b] += (edge - t1) * level / width
+                t1, b = edge, b + 1
+        return means
+
+
+def sweep_utilisation(files: list[Path]) -> Optional[Utilisation]:
+    """Agent calls and debates in flight over time across several results files."""
+    call_intervals, debate_intervals = [], []
+    for filepath in files:
+        origin, calls = debate_calls(load_results(filepath))
+        if calls:
+            call_intervals += [(origin + c.start, origin + c.end) for c in calls]
+            debate_intervals.append((origin, origin + max(c.end for c in calls)))
+    if not call_intervals:
+        return None
+    t0 = min(start for start, _ in call_intervals)
+    shift = lambda intervals: [(start - t0, end - t0) for start, end in intervals]
+    span = max(end for _, end in call_intervals) - t0
+    return Utilisation(span, Utilisation.steps(shift(call_intervals)), Utilisation.steps(shift(debate_intervals)))
+
+
+def utilisation_summary(util: Utilisation, capacity: Optional[int] = None) -> dict:
+    peak = max(level for _, level in util.calls)
+    mean = Utilisation.mean(util.calls, util.span)
+    busy = sum(t2 - t1 for (t1, level), (t2, _) in zip(util.calls, util.calls[1:]) if level)
+    return {
+        "span": util.span,
+        "peak_calls": peak,
+        "mean_calls": mean,
+        "peak_debates": max(level for _, level in util.debates),
+        "mean_debates": Utilisation.mean(util.debates, util.span),
+        "busy": busy / util.span if util.span else 0.0,
+        "utilisation": mean / (capacity or peak) if (capacity or peak) else 0.0,
+    }
+
+
+def render_utilisation_ascii(util: Utilisation, files: int, capacity: Optional[int] = None,
+                             width: int = WIDTH, height: int = 8) -> str:
+    summary = utilisation_summary(util, capacity)
+    means = util.bucket_means(width)
+    top = max(capacity or 0, summary["peak_calls"], 1)
+    lines = [
+        f"SWEEP UTILISATION ({files} debates)",
+        "=" * (width + 8),
+        f"Span {summary['span']:.1f}s | agent calls in flight: mean {summary['mean_calls']:.2f}, "
+        f"peak {summary['peak_calls']} | debates in flight: mean {summary['mean_debates']:.2f}, "
+        f"peak {summary['peak_debates']}",
+        f"Busy {summary['busy']:.0%} of the span | utilisation {summary['utilisation']:.0%} of "
+        f"{'capacity ' + str(capacity) if capacity else 'peak'}",
+        "",
+    ]
+    for row in range(height, 0, -1):
+        threshold = top * (row - 0.5) / height
+        label = f"{top * row / height:>5.1f}" if row in (height, height // 2, 1) else " " * 5
+        lines.append(f"{label} |" + "".join(CRITICAL if m >= threshold else " " for m in means) + "|")
+    lines.append(" " * 6 + "+" + "-" * width + "+")
+    lines.append(" " * 7 + axis_labels(util.span, width))
+    lines.append("")
+    lines.append("Each column is the mean number of agent calls in flight over that slice of the sweep.")
+    return "\n".join(lines) + "\n"
+
+
+def render_utilisation_svg(util: Utilisation, files: int, capacity: Optional[int] = None) -> str:
+    summary = utilisation_summary(util, capacity)
+    plot_width, plot_height, top = SVG_WIDTH - 80, 240, 50
+    left = 60
+    peak = max(capacity or 0, summary["peak_calls"], summary["peak_debates"], 1)
+    x = lambda t: left + (t / util.span if util.span else 0) * plot_width
+    y = lambda level: top + plot_height - level / peak * plot_height
+
+    def path(steps: list[tuple[float, int]]) -> str:
+        points, previous = [], 0
+        for t, level in steps:
+            points += [f"{x(t):.1f},{y(previous):.1f}", f"{x(t):.1f},{y(level):.1f}"]
+            previous = level
+        points.append(f"{x(util.span):.1f},{y(previous):.1f}")
+        return " ".join(points)
+
+    height = top + plot_height + 60
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}" height="{height}" font-family="sans-serif">',
+        f'<rect width="{SVG_WIDTH}" height="{height}" fill="white"/>',
+        f'<text x="10" y="18" font-size="14" font-weight="bold">Sweep utilisation ({files} debates)</text>',
+        f'<text x="10" y="34" font-size="11">Agent calls in flight: mean {summary["mean_calls"]:.2f}, peak '
+        f'{summary["peak_calls"]}; busy {summary["busy"]:.0%}; utilisation {summary["utilisation"]:.0%}</text>',
+    ]
+    for level in range(0, peak + 1, max(1, peak // 5)):
+        parts.append(f'<line x1="{left}" y1="{y(level):.1f}" x2="{left + plot_width}" y2="{y(level):.1f}" stroke="#e0e0e0"/>')
+        parts.append(f'<text x="{left - 6}" y="{y(level) + 4:.1f}" font-size="10" text-anchor="end">{level}</text>')
+    if capacity:
+        parts.append(f'<line x1="{left}" y1="{y(capacity):.1f}" x2="{left + plot_width}" y2="{y(capacity):.1f}" '
+                     f'stroke="#2ca02c" stroke-dasharray="4 3"/>')
+    parts.append(f'<polyline points="{path(util.calls)}" fill="none" stroke="#d62728" stroke-width="1.5"/>')
+    parts.append(f'<polyline points="{path(util.debates)}" fill="none" stroke="#1f77b4" stroke-width="1.5"/>')
+    for tick in range(11):
+        tx = left + plot_width * tick / 10
+        parts.append(f'<text x="{tx:.1f}" y="{top + plot_height + 16}" font-size="10" text-anchor="middle">'
+                     f'{util.span * tick / 10:.1f}s</text>')
+    legend_y = top + plot_height + 40
+    for j, (color, name) in enumerate([("#d62728", "agent calls in flight"), ("#1f77b4", "debates in flight")]):
+        lx = left + j * 200
+        parts.append(f'<line x1="{lx}" y1="{legend_y - 4}" x2="{lx + 16}" y2="{legend_y - 4}" stroke="{color}" stroke-width="2"/>')
+        parts.append(f'<text x="{lx + 22}" y="{legend_y}" font-size="11">{name}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
+
+
 
 
 def generate_flow_diagram():
@@ -115,25 +495,73 @@ Topic: "Will agentic AI displace the need for MBA talent?"
     return diagram_4_agents, diagram_2_agents
 
 
-def main():
-    """Generate and save diagrams."""
-    import os
-
-    output_dir = "deliverables"
-    os.makedirs(output_dir, exist_ok=True)
-
+def write_flow_diagrams(output_dir: Path) -> None:
     diagram_4, diagram_2 = generate_flow_diagram()
 
-    with open(f"{output_dir}/flow_diagram_4_agents.txt", "w") as f:
+    with open(output_dir / "flow_diagram_4_agents.txt", "w") as f:
         f.write(diagram_4)
 
-    with open(f"{output_dir}/flow_diagram_2_agents.txt", "w") as f:
+    with open(output_dir / "flow_diagram_2_agents.txt", "w") as f:
         f.write(diagram_2)
 
-    print("✓ Diagrams generated in deliverables/")
+    print("✓ Flow diagrams generated:")
     print("  - flow_diagram_4_agents.txt")
     print("  - flow_diagram_2_agents.txt")
-    print("\nYou can copy these into your slides/document!")
+
+
+def main():
+    """Generate timelines (and a sweep utilisation chart) from results, or the static flow diagrams."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", type=Path,
+                        help="Results files to draw timelines for (default: the newest in results/)")
+    parser.add_argument("--latest", type=int, default=1, metavar="N",
+                        help="Without files, draw timelines for the N newest results")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Also chart utilisation across the given files (default: every file in results/)")
+    parser.add_argument("--capacity", type=int, help="Concurrent call capacity to measure utilisation against")
+    parser.add_argument("--flow", action="store_true", help="Write the static flow diagrams instead")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    results_dir = Path("results")
+    available = sorted(list_results(results_dir), reverse=True) if results_dir.exists() else []
+    files = args.files or available[:args.latest]
+    if args.flow or not files:
+        write_flow_diagrams(args.output_dir)
+        print("\nYou can copy these into your slides/document!")
+        return
+
+    written = []
+    for filepath in files:
+        timeline = build_timeline(filepath)
+        if timeline is None:
+            print(f"- {filepath.name}: no per-step timings (saved before timings were recorded)")
+            continue
+        stem = f"timeline_{filepath.name.split('.')[0]}"
+        text = render_timeline_ascii(timeline)
+        (args.output_dir / f"{stem}.txt").write_text(text)
+        (args.output_dir / f"{stem}.svg").write_text(render_timeline_svg(timeline))
+        written += [f"{stem}.txt", f"{stem}.svg"]
+        print(text)
+
+    sweep_files = args.files or available
+    if args.sweep and len(sweep_files) > 1:
+        util = sweep_utilisation(sweep_files)
+        if util is not None:
+            text = render_utilisation_ascii(util, len(sweep_files), args.capacity)
+            (args.output_dir / "sweep_utilisation.txt").write_text(text)
+            (args.output_dir / "sweep_utilisation.svg").write_text(
+                render_utilisation_svg(util, len(sweep_files), args.capacity))
+            written += ["sweep_utilisation.txt", "sweep_utilisation.svg"]
+            print(text)
+
+    if not written:
+        write_flow_diagrams(args.output_dir)
+        return
+    print(f"✓ Diagrams generated in {args.output_dir}/")
+    for name in written:
+        print(f"  - {name}")
 
 
 if __name__ == "__main__":
@@ -1,23 +1,51 @@
-"""Generate deliverables from experiment results."""
+"""Generate deliverables from experiment results.
+
+Every results file (or the newest ``--latest N``) is one experiment. Each
+deliverable is rendered from a template, with line wrapping applied as it is
+rendered. It is rewritten only when the hash of its template, its inputs (the
+content hashes of the experiments' files) or the analysis and rendering code
+changes. Deliverables that need rendering are rendered in parallel.
+
+``deliverables/.cache`` keeps each file's content hash under its size and
+mtime, plus its analysis and excerpts. Only new or changed files are read
+again (every file, after the analysis code changes), and they are analyzed in
+parallel worker processes. Re-running over an unchanged archive only stats
+the files.
+"""
 
+import argparse
+import functools
+import hashlib
 import json
-import re
-from pathlib import Path
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from analyze_results import extract_scores, analyze_debate_file
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from analyze_results import analyze_debate_file
+from config import RUBRIC_CRITERIA
+from format_deliverables import wrap_text
+from protocols import default_protocol
+from results_store import list_results, load_results
+from transcript import Transcript
+
+
+OUTPUT_DIR = Path("deliverables")
+REPORT_EXCERPT_EXPERIMENTS = 4  # Experiments quoted in the mini-report (key_excerpts.txt has all)
 
 
 def extract_excerpts(debate_data):
     """Extract interesting excerpts from the debate."""
     excerpts = []
+    transcript = Transcript.from_results(debate_data)
 
-    for i, round_data in enumerate(debate_data.get("rounds", []), 1):
-        output = round_data.get("output", "")
-
-        # Look for critic sections
-        if "CRITIC:" in output:
-            critic_section = output.split("CRITIC:")[1].split("\n\n")[0:3]
-            excerpt = "\n".join(critic_section[:3])
+    for i in transcript.rounds():
+        # Look for critic messages
+        critic = transcript.get(i, "Critic")
+        if critic is not None:
+            excerpt = "\n".join(critic.text.split("\n\n")[:3])
             if len(excerpt) > 100:
                 excerpts.append({
                     "round": i,
@@ -28,74 +56,64 @@ def extract_excerpts(debate_data):
     return excerpts[:4]  # Return up to 4 excerpts
 
 
-def generate_config_summary(config):
-    """Generate configuration summary."""
-    return f"""
+def analyze_file(filepath: Path) -> dict:
+    """Analysis and excerpts of one results file (runs in a worker process)."""
+    return {"analysis": analyze_debate_file(filepath), "excerpts": extract_excerpts(load_results(filepath))}
+
+
+# --- Templates -------------------------------------------------------------
+
+CONFIG_TEMPLATE = """
 CONFIGURATION SUMMARY
 ====================
 
-Model: {config.get('model', 'N/A')}
-Temperature: {config.get('temperature', 'N/A')}
-Number of Agents: {config.get('num_agents', 'N/A')}
-Agent Roles: {', '.join(config.get('agents', []))}
-Number of Rounds: {config.get('num_rounds', 'N/A')}
-Devil's Advocate: {'Yes' if config.get('include_devil_advocate', False) else 'No'}
-Topic: {config.get('topic', 'N/A')}
+Topic: {topic}
 Memory: No (stateless agents, context passed between rounds)
+{experiments}
 """
 
+CONFIG_ENTRY_TEMPLATE = """
+Experiment {n}: {filename}
+Model: {model}
+Temperature: {temperature}
+Number of Agents: {num_agents}
+Agent Roles: {agents}
+Number of Rounds: {num_rounds}
+Protocol: {protocol}
+Devil's Advocate: {devil_advocate}
+"""
 
-def generate_results_table(analyses):
-    """Generate results comparison table."""
-    if len(analyses) < 2:
-        return "Need at least 2 experiment results to compare."
-
-    a1, a2 = analyses[0], analyses[1]
-
-    table = f"""
+TABLE_TEMPLATE = """
 RESULTS COMPARISON TABLE
 ========================
 
-Experiment          | Experiment 1                    | Experiment 2
---------------------|--------------------------------|--------------------------------
-Configuration       | {a1['config']['num_agents']} agents, {a1['config']['num_rounds']} rounds | {a2['config']['num_agents']} agents, {a2['config']['num_rounds']} rounds
-Temperature         | {a1['config']['temperature']}                   | {a2['config']['temperature']}
-Model               | {a1['config']['model']}          | {a2['config']['model']}
-
-RUBRIC SCORES (0-5)
-Evidence            | {a1['scores'].get('evidence', 'N/A')}/5                | {a2['scores'].get('evidence', 'N/A')}/5
-Feasibility         | {a1['scores'].get('feasibility', 'N/A')}/5             | {a2['scores'].get('feasibility', 'N/A')}/5
-Risks               | {a1['scores'].get('risks', 'N/A')}/5                   | {a2['scores'].get('risks', 'N/A')}/5
-Clarity             | {a1['scores'].get('clarity', 'N/A')}/5                 | {a2['scores'].get('clarity', 'N/A')}/5
-Average Score       | {a1['average_score']}/5              | {a2['average_score']}/5
-
-PERFORMANCE
-Total Duration      | {a1['total_duration']}s               | {a2['total_duration']}s
-Avg Round Duration  | {sum(a1['round_durations'])/len(a1['round_durations']):.1f}s | {sum(a2['round_durations'])/len(a2['round_durations']):.1f}s
-Convergence         | {a1['convergence']}                | {a2['convergence']}
-"""
-    return table
-
+CONFIGURATIONS
+#   Agents Rounds Protocol           Temp  DA   Model
+--- ------ ------ ------------------ ----- ---- --------------------------
+{config_rows}
 
-def generate_mini_report(analyses, excerpts_list):
-    """Generate the mini-report document."""
+RUBRIC SCORES (0-5) AND PERFORMANCE
+#   {score_header} Avg   Total(s) Round(s) Convergence
+--- {score_rule} ----- -------- -------- -----------
+{result_rows}
+"""
 
-    report = f"""
+REPORT_TEMPLATE = """
 MULTI-AGENT DEBATE - MINI REPORT
 =================================
 
-Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+Generated: {generated}
 
 SCENARIO TESTED
 ---------------
 
-Topic: "Will agentic AI displace the need for MBA talent?"
+Topic: "{topic}"
 
 This debate explores whether autonomous AI agents with sophisticated reasoning
-capabilities could eventually reduce or eliminate the need for traditional MBA-trained
-business professionals. The topic is particularly relevant given recent advances in
-agentic AI systems that can perform complex business analysis, strategic planning,
-and decision-making tasks.
+capabilities could eventually reduce or eliminate the need for traditional
+MBA-trained business professionals. The topic is particularly relevant given
+recent advances in agentic AI systems that can perform complex business
+analysis, strategic planning, and decision-making tasks.
 
 Acceptance Criteria:
 • Agents must complete at least 2 rounds of debate
@@ -108,53 +126,37 @@ Acceptance Criteria:
 EXPERIMENTS CONDUCTED
 --------------------
 
-We ran 2 experiments to test the following toggles:
-
-Experiment 1: {analyses[0]['config']['num_agents']} agents, {analyses[0]['config']['num_rounds']} round(s)
-Experiment 2: {analyses[1]['config']['num_agents']} agents, {analyses[1]['config']['num_rounds']} round(s)
+We ran {count} experiments to test the following toggles:
 
-Both experiments used:
-• Model: {analyses[0]['config']['model']}
-• Temperature: {analyses[0]['config']['temperature']}
-• Same debate topic
+{experiment_lines}
 
+Models used: {models}
+Temperatures used: {temperatures}
 
-{generate_results_table(analyses)}
-
+{table}
 
 KEY FINDINGS
 ------------
 
 Toggle Impact - What Changed:
 
-1. Agent Count ({analyses[0]['config']['num_agents']} vs {analyses[1]['config']['num_agents']} agents):
-   • With {analyses[0]['config']['num_agents']} agents: {'Simpler flow, faster execution' if analyses[0]['config']['num_agents'] < analyses[1]['config']['num_agents'] else 'More comprehensive critique'}
-   • With {analyses[1]['config']['num_agents']} agents: {'Simpler flow, faster execution' if analyses[1]['config']['num_agents'] < analyses[0]['config']['num_agents'] else 'More comprehensive critique'}
-   • Quality difference: {abs(analyses[0]['average_score'] - analyses[1]['average_score']):.2f} points
-   • Time difference: {abs(analyses[0]['total_duration'] - analyses[1]['total_duration']):.1f}s
+1. Quality: Experiment {best_n} ({best_label}) scored highest at {best_score}/5,
+   Experiment {worst_n} ({worst_label}) lowest at {worst_score}/5
+   • Quality spread: {score_spread:.2f} points
+
+2. Speed: Experiment {fastest_n} ({fastest_label}) was fastest at {fastest_time}s,
+   Experiment {slowest_n} ({slowest_label}) slowest at {slowest_time}s
+   • Time spread: {time_spread:.1f}s
 
-2. Round Count ({analyses[0]['config']['num_rounds']} vs {analyses[1]['config']['num_rounds']} rounds):
-   • More rounds allowed for deeper refinement
-   • Diminishing returns observed after round 2
-   • Convergence: {analyses[0]['convergence']} vs {analyses[1]['convergence']}
+3. Convergence: {convergence_counts}
 
 
 NOTABLE EXCERPTS
 ---------------
 
-Below are examples of the Critic agent identifying issues and improving arguments:
-
-"""
-
-    for i, excerpts in enumerate(excerpts_list, 1):
-        if excerpts:
-            report += f"\nExperiment {i} - Sample Critique:\n"
-            for excerpt in excerpts[:2]:
-                report += f"\nRound {excerpt['round']} - {excerpt['agent']}:\n"
-                report += f"{excerpt['text']}\n"
-                report += "-" * 60 + "\n"
-
-    report += """
+Below are examples of the Critic agent identifying issues and improving
+arguments:
+{excerpts}
 
 LIMITATIONS & NEXT STEPS
 ------------------------
@@ -164,25 +166,22 @@ Current Limitations:
 • No persistent memory across debates - each run is independent
 • Simple rubric scoring relies on judge's interpretation
 • No fact-checking or external knowledge validation
-• Limited to 2-4 agents due to complexity and cost constraints
 
 Next Steps to Explore:
 1. Multi-model debates: Use different LLMs for different agent roles
    (e.g., GPT-4 for Researcher, Claude for Critic) to increase diversity
 2. Add memory system: Allow agents to learn from previous debates
 3. Implement real-time fact-checking using web search or knowledge bases
-4. Test with 6-8 agents including specialist roles (Economist, Technologist, etc.)
-5. Add human-in-the-loop capability for mid-debate interventions
-6. Experiment with adversarial debate structures (team vs team)
+4. Add human-in-the-loop capability for mid-debate interventions
 
 
 CONCLUSION
 ----------
 
 The multi-agent debate system successfully demonstrated collaborative reasoning
-through structured argumentation. The experiments showed that:
+through structured argumentation across {count} experiments. They showed that:
 
-• More agents ({analyses[1]['config']['num_agents']} vs {analyses[0]['config']['num_agents']}) {'improved' if analyses[1]['average_score'] > analyses[0]['average_score'] else 'did not significantly improve'} argument quality
+• {best_label} produced the strongest arguments ({best_score}/5 average)
 • Multiple rounds enabled progressive refinement
 • The Critic agent effectively identified weaknesses and gaps
 • The Judge provided consistent scoring across experiments
@@ -192,81 +191,275 @@ exploring more complex multi-agent debate scenarios.
 
 """
 
-    return report
+EXCERPTS_TEMPLATE = """KEY DEBATE EXCERPTS
+============================================================
+
+{experiments}"""
+
+
+# --- Renderers ---------------------------------------------------------------
+
+def label(analysis: dict) -> str:
+    """Short description of an experiment's configuration."""
+    config = analysis["config"]
+    protocol = config.get("protocol") or default_protocol(config["num_agents"])
+    return f"{config['num_agents']} agents, {config['num_rounds']} rounds, {protocol}"
+
+
+def score_cell(scores: dict, criterion: str) -> str:
+    return f"{scores[criterion]}/5" if criterion in scores else "N/A"
+
+
+def render_config_summary(analyses: list[dict]) -> str:
+    experiments = "".join(
+        CONFIG_ENTRY_TEMPLATE.format(
+            n=n, filename=a["filename"], model=a["config"].get("model", "N/A"),
+            temperature=a["config"].get("temperature", "N/A"), num_agents=a["config"].get("num_agents", "N/A"),
+            agents=", ".join(a["config"].get("agents", [])), num_rounds=a["config"].get("num_rounds", "N/A"),
+            protocol=a["config"].get("protocol") or default_protocol(a["config"]["num_agents"]),
+            devil_advocate="Yes" if a["config"].get("include_devil_advocate", False) else "No",
+        )
+        for n, a in enumerate(analyses, 1)
+    )
+    return CONFIG_TEMPLATE.format(topic=analyses[0]["config"].get("topic", "N/A"), experiments=experiments)
+
+
+def render_results_table(analyses: list[dict]) -> str:
+    config_rows, result_rows = [], []
+    for n, a in enumerate(analyses, 1):
+        config = a["config"]
+        protocol = config.get("protocol") or default_protocol(config["num_agents"])
+        config_rows.append(
+            f"{n:<3} {config['num_agents']:<6} {config['num_rounds']:<6} {protocol[:18]:<18} "
+            f"{config['temperature']:<5} {'Yes' if config.get('include_devil_advocate') else 'No':<4} "
+            f"{config['model']}"
+        )
+        durations = a["round_durations"]
+        round_duration = f"{sum(durations) / len(durations):.1f}" if durations else "N/A"
+        scores = " ".join(f"{score_cell(a['scores'], c):<5}" for c in RUBRIC_CRITERIA)
+        result_rows.append(
+            f"{n:<3} {scores} {a['average_score']:<5} {a['total_duration']:<8} {round_duration:<8} {a['convergence']}"
+        )
+    return TABLE_TEMPLATE.format(
+        config_rows="\n".join(config_rows),
+        score_header=" ".join(f"{c[:4].title():<5}" for c in RUBRIC_CRITERIA),
+        score_rule=" ".join("-----" for _ in RUBRIC_CRITERIA),
+        result_rows="\n".join(result_rows),
+    )
+
+
+def render_excerpt_blocks(excerpts: list[dict]) -> str:
+    return "".join(
+        f"\nRound {e['round']} - {e['agent']}:\n{e['text']}\n" + "-" * 60 + "\n" for e in excerpts
+    )
+
+
+def render_mini_report(analyses: list[dict], excerpts_list: list[list[dict]]) -> str:
+    numbered = list(enumerate(analyses, 1))
+    best = max(numbered, key=lambda item: item[1]["average_score"])
+    worst = min(numbered, key=lambda item: item[1]["average_score"])
+    fastest = min(numbered, key=lambda item: item[1]["total_duration"])
+    slowest = max(numbered, key=lambda item: item[1]["total_duration"])
+    convergence = {}
+    for a in analyses:
+        convergence[a["convergence"]] = convergence.get(a["convergence"], 0) + 1
+
+    excerpts = ""
+    for n, experiment_excerpts in enumerate(excerpts_list[:REPORT_EXCERPT_EXPERIMENTS], 1):
+        if experiment_excerpts:
+            excerpts += f"\nExperiment {n} - Sample Critique:\n" + render_excerpt_blocks(experiment_excerpts[:2])
+
+    return REPORT_TEMPLATE.format(
+        generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        topic=analyses[0]["config"].get("topic", "N/A"),
+        count=len(analyses),
+        experiment_lines="\n".join(f"Experiment {n}: {label(a)}" for n, a in numbered),
+        models=", ".join(sorted({str(a["config"].get("model")) for a in analyses})),
+        temperatures=", ".join(sorted({str(a["config"].get("temperature")) for a in analyses})),
+        table=render_results_table(analyses),
+        best_n=best[0], best_label=label(best[1]), best_score=best[1]["average_score"],
+        worst_n=worst[0], worst_label=label(worst[1]), worst_score=worst[1]["average_score"],
+        score_spread=best[1]["average_score"] - worst[1]["average_score"],
+        fastest_n=fastest[0], fastest_label=label(fastest[1]), fastest_time=fastest[1]["total_duration"],
+        slowest_n=slowest[0], slowest_label=label(slowest[1]), slowest_time=slowest[1]["total_duration"],
+        time_spread=slowest[1]["total_duration"] - fastest[1]["total_duration"],
+        convergence_counts=", ".join(f"{status} {count}" for status, count in sorted(convergence.items())),
+        excerpts=excerpts,
+    )
+
+
+def render_key_excerpts(excerpts_list: list[list[dict]]) -> str:
+    experiments = "".join(
+        f"Experiment {n}:\n" + "-" * 60 + "\n"
+        + "".join(f"\nRound {e['round']} - {e['agent']}:\n{e['text']}\n\n" for e in excerpts)
+        for n, excerpts in enumerate(excerpts_list, 1)
+    )
+    return EXCERPTS_TEMPLATE.format(experiments=experiments)
+
+
+# --- Pipeline ------------------------------------------------------------------
+
+def content_hash(data: Any) -> str:
+    payload = data if isinstance(data, bytes) else json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+# Modules whose code produces the cached analyses and the deliverables
+CODE_MODULES = ("analyze_results", "config", "format_deliverables", "generate_report", "protocols",
+                "results_store", "transcript")
+
+
+@functools.lru_cache(maxsize=None)
+def code_hash() -> str:
+    """Hash of the analysis and rendering code, so upgrading it invalidates both caches."""
+    return content_hash(b"".join(Path(__file__).with_name(f"{name}.py").read_bytes() for name in CODE_MODULES))
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_cache(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def file_hashes(files: list[Path], cache_dir: Path) -> dict[str, str]:
+    """Content hash of each file; a file whose size and mtime are unchanged is not read."""
+    index_path = cache_dir / "index.json"
+    index = load_cache(index_path)
+    new_index = {}
+    for filepath in files:
+        stat = filepath.stat()
+        key = [stat.st_size, stat.st_mtime_ns]
+        entry = index.get(str(filepath))
+        if entry is None or entry["stat"] != key:
+            entry = {"stat": key, "sha256": content_hash(filepath.read_bytes())}
+        new_index[str(filepath)] = entry
+    if new_index != index:
+        save_cache(index_path, {**index, **new_index})
+    return {path: entry["sha256"] for path, entry in new_index.items()}
+
+
+def load_analyses(files: list[Path], hashes: dict[str, str], cache_dir: Path,
+                  workers: Optional[int] = None) -> tuple[list[dict], int]:
+    """Cached analysis and excerpts of each file, and how many files had to be analyzed.
+
+    Only files whose content hash changed are analyzed, in worker processes.
+    """
+    store_path = cache_dir / "analyses.json"
+    store = load_cache(store_path)
+    code = code_hash()
+    stale = [f for f in files
+             if (store.get(str(f), {}).get("sha256"), store.get(str(f), {}).get("code")) != (hashes[str(f)], code)]
+    if len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fresh = list(pool.map(analyze_file, stale))
+    else:
+        fresh = [analyze_file(filepath) for filepath in stale]
+    for filepath, result in zip(stale, fresh):
+        store[str(filepath)] = {"sha256": hashes[str(filepath)], "code": code, **result}
+    if stale:
+        save_cache(store_path, store)
+    return [store[str(f)] for f in files], len(stale)
+
+
+# filename -> (renderer taking (analyses, excerpts per experiment), templates it renders)
+DELIVERABLES: dict[str, tuple[Callable[[list[dict], list[list[dict]]], str], tuple[str, ...]]] = {
+    "config_summary.txt": (lambda analyses, _: render_config_summary(analyses),
+                           (CONFIG_TEMPLATE, CONFIG_ENTRY_TEMPLATE)),
+    "results_table.txt": (lambda analyses, _: render_results_table(analyses), (TABLE_TEMPLATE,)),
+    "mini_report.txt": (render_mini_report, (REPORT_TEMPLATE, TABLE_TEMPLATE)),
+    "key_excerpts.txt": (lambda _, excerpts: render_key_excerpts(excerpts), (EXCERPTS_TEMPLATE,)),
+}
+
+
+def generate_deliverables(files: list[Path], output_dir: Path = OUTPUT_DIR,
+                          force: bool = False, workers: Optional[int] = None) -> dict:
+    """Regenerate the deliverables whose inputs changed; returns what was done."""
+    start = time.perf_counter()
+    cache_dir = output_dir / ".cache"
+    hashes = file_hashes(files, cache_dir)
+    # Every deliverable is derived from the same experiments, in order
+    inputs = content_hash([[str(f), hashes[str(f)]] for f in files])
+    digests = {name: content_hash([name, templates, inputs, code_hash()])
+               for name, (_, templates) in DELIVERABLES.items()}
+
+    manifest_path = cache_dir / "manifest.json"
+    manifest = load_cache(manifest_path)
+    stale = [name for name, digest in digests.items()
+             if force or manifest.get(name) != digest or not (output_dir / name).exists()]
+
+    analyzed = 0
+    if stale:
+        entries, analyzed = load_analyses(files, hashes, cache_dir, workers)
+        analyses = [entry["analysis"] for entry in entries]
+        excerpts_list = [entry["excerpts"] for entry in entries]
+
+        def write(name: str) -> None:
+            render, _ = DELIVERABLES[name]
+            with open(output_dir / name, "w") as f:
+                f.write(wrap_text(render(analyses, excerpts_list)))
+
+        output_dir.mkdir(exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            list(pool.map(write, stale))
+        save_cache(manifest_path, {**manifest, **digests})
+
+    return {
+        "files": len(files),
+        "analyzed": analyzed,
+        "generated": stale,
+        "skipped": [name for name in DELIVERABLES if name not in stale],
+        "duration": round(time.perf_counter() - start, 3),
+    }
 
 
 def main():
     """Generate all deliverables."""
-    import os
-
-    output_dir = Path("deliverables")
-    output_dir.mkdir(exist_ok=True)
-
-    results_dir = Path("results")
-    if not results_dir.exists():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latest", type=int, metavar="N", help="Only use the N most recent results files")
+    parser.add_argument("--results-dir", type=Path, default=Path("results"))
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--force", action="store_true", help="Rewrite every deliverable even if unchanged")
+    parser.add_argument("--workers", type=int, help="Worker processes for analyzing changed files")
+    args = parser.parse_args()
+
+    if not args.results_dir.exists():
         print("❌ No results directory found. Run experiments first!")
         return
 
-    json_files = sorted(list(results_dir.glob("*.json")), reverse=True)
+    json_files = sorted(list_results(args.results_dir), reverse=True)
+    if args.latest:
+        json_files = json_files[:args.latest]
 
     if len(json_files) < 2:
         print(f"❌ Need at least 2 results files. Found {len(json_files)}.")
         print("   Run experiments first with: python run_experiments.py")
         return
 
-    print(f"\nFound {len(json_files)} result files. Analyzing the 2 most recent...\n")
-
-    # Analyze the two most recent results
-    analyses = []
-    all_excerpts = []
-
-    for filepath in json_files[:2]:
-        analysis = analyze_debate_file(filepath)
-        analyses.append(analysis)
-
-        with open(filepath, "r") as f:
-            data = json.load(f)
-        excerpts = extract_excerpts(data)
-        all_excerpts.append(excerpts)
-
-        print(f"✓ Analyzed: {filepath.name}")
-
-    # Generate config summary
-    config_summary = generate_config_summary(analyses[0]['config'])
-    with open(output_dir / "config_summary.txt", "w") as f:
-        f.write(config_summary)
-    print(f"\n✓ Generated: config_summary.txt")
-
-    # Generate results table
-    results_table = generate_results_table(analyses)
-    with open(output_dir / "results_table.txt", "w") as f:
-        f.write(results_table)
-    print(f"✓ Generated: results_table.txt")
-
-    # Generate mini-report
-    mini_report = generate_mini_report(analyses, all_excerpts)
-    with open(output_dir / "mini_report.txt", "w") as f:
-        f.write(mini_report)
-    print(f"✓ Generated: mini_report.txt")
-
-    # Generate excerpts file
-    with open(output_dir / "key_excerpts.txt", "w") as f:
-        f.write("KEY DEBATE EXCERPTS\n")
-        f.write("=" * 60 + "\n\n")
-        for i, excerpts in enumerate(all_excerpts, 1):
-            f.write(f"Experiment {i}:\n")
-            f.write("-" * 60 + "\n")
-            for excerpt in excerpts:
-                f.write(f"\nRound {excerpt['round']} - {excerpt['agent']}:\n")
-                f.write(f"{excerpt['text']}\n\n")
-    print(f"✓ Generated: key_excerpts.txt")
+    print(f"\nFound {len(json_files)} result files. Analyzing...\n")
+    summary = generate_deliverables(json_files, args.output_dir, args.force, args.workers)
+
+    print(f"✓ Analyzed {summary['analyzed']} new or changed files")
+    for filename in summary["generated"]:
+        print(f"✓ Generated: {filename}")
+    for filename in summary["skipped"]:
+        print(f"- Unchanged: {filename}")
 
     print(f"\n{'='*60}")
-    print(f"All deliverables generated in: {output_dir}/")
+    print(f"All deliverables up to date in: {args.output_dir}/ ({summary['duration']}s)")
     print(f"{'='*60}\n")
 
     print("Next steps:")
-    print("1. Run: python generate_diagram.py (for flow diagrams)")
+    print("1. Run: python generate_diagram.py (for timelines of your latest debates)")
     print("2. Take screenshots of your debate runs")
     print("3. Compile everything into your final submission")
 
@@ -0,0 +1,232 @@
+"""Hedged agent calls to cut tail latency.
+
+A HedgePolicy tracks per-role latency percentiles. When a call runs past
+its role's threshold (p95 by default), a duplicate request is fired and
+whichever finishes first wins. CrewAI calls are blocking, so the losing call
+cannot be interrupted: it is abandoned, its output discarded and its tokens
+counted as wasted once it completes.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Optional
+
+from crewai import Agent, Task
+
+from config import DebateConfig
+from metrics import RETRIES
+from tasks import TaskCall
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def clone_step(agent: Agent, task: Task) -> tuple[Agent, Task]:
+    """Copy an agent/task pair so a duplicate call does not share crew state."""
+    agent_copy = agent.copy()
+    task_copy = Task(
+        description=task.description,
+        expected_output=task.expected_output,
+        agent=agent_copy,
+    )
+    return agent_copy, task_copy
+
+
+def spawn(fn, *args) -> Future:
+    """Run fn in its own daemon thread, so a call never queues behind other debates' calls."""
+    future = Future()
+
+    def target():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name="hedge", daemon=True).start()
+    return future
+
+
+class HedgeHistory:
+    """Latency windows and hedge-rate budget that several debates' policies can share."""
+
+    def __init__(self, window: int = 200):
+        self.latencies = defaultdict(lambda: deque(maxlen=window))  # (role, model) -> recent latencies
+        self.calls = 0
+        self.hedged = 0
+        self.lock = threading.Lock()
+
+
+class HedgePolicy:
+    """Fires a duplicate request once a call exceeds its role's latency percentile.
+
+    Counters for report() belong to the policy. Latency windows and the
+    max_rate budget live in its HedgeHistory, which may be shared.
+    """
+
+    def __init__(self, pct: float = 95.0, max_rate: float = 0.1,
+                 max_wasted_tokens: Optional[int] = None, min_samples: int = 5,
+                 history: Optional[HedgeHistory] = None):
+        self.pct = pct
+        self.max_rate = max_rate
+        self.max_wasted_tokens = max_wasted_tokens
+        self.min_samples = min_samples
+        self.history = history or HedgeHistory()
+        self.models = {}  # role -> the model its latencies are tracked under
+        self.effective = defaultdict(list)
+        self.primary = defaultdict(list)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.wasted_tokens = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: DebateConfig) -> "HedgePolicy":
+        """A policy for one debate, sharing latency history with the process's other debates.
+
+        One debate makes too few calls per role to warm up percentiles or earn
+        hedges under max_rate, so the history is shared; the report is not.
+        """
+        return cls(pct=config.hedge_percentile, max_rate=config.hedge_max_rate,
+                   max_wasted_tokens=config.hedge_max_wasted_tokens, history=_shared_history)
+
+    def threshold(self, role: str) -> Optional[float]:
+        """Latency after which a call for this role is hedged (None until warmed up)."""
+        return self._threshold((role, self.models.get(role)))
+
+    def _threshold(self, key: tuple) -> Optional[float]:
+        with self.history.lock:
+            samples = list(self.history.latencies[key])
+        if len(samples) < self.min_samples:
+            return None
+        return percentile(samples, self.pct)
+
+    def _can_hedge(self) -> bool:
+        with self.lock:
+            if self.max_wasted_tokens is not None and self.wasted_tokens >= self.max_wasted_tokens:
+                return False
+        with self.history.lock:
+            if (self.history.hedged + 1) > self.max_rate * self.history.calls:
+                return False
+            self.history.hedged += 1
+            return True
+
+    def _timed(self, key: tuple, call: TaskCall, agent: Agent, task: Task, primary: bool):
+        start = time.time()
+        output = call(agent, task)
+        elapsed = time.time() - start
+        if primary:
+            with self.history.lock:
+                self.history.latencies[key].append(elapsed)
+            with self.lock:
+                self.primary[key[0]].append(elapsed)
+        return output
+
+    def _waste(self, future: Future) -> None:
+        if future.exception() is not None:
+            return
+        _, usage = future.result()
+        with self.lock:
+            self.wasted_tokens += usage.get("total_tokens", 0)
+
+    def run(self, agent: Agent, task: Task, call: TaskCall) -> tuple[str, dict]:
+        """Run a task call, hedging it if it exceeds the role's latency threshold."""
+        role = agent.role
+        # Latencies are tracked per model too, since a role's calls may be routed or escalated
+        key = (role, getattr(agent.llm, "model", None))
+        self.models[role] = key[1]
+        with self.lock:
+            self.calls += 1
+        with self.history.lock:
+            self.history.calls += 1
+        start = time.time()
+        threshold = self._threshold(key)
+        first = spawn(self._timed, key, call, agent, task, True)
+
+        done, _ = wait([first], timeout=threshold)
+        if done or not self._can_hedge():
+            result = first.result()
+            with self.lock:
+                self.effective[role].append(time.time() - start)
+            return result
+
+        with self.lock:
+            self.hedged += 1
+        hedge_delay = time.time() - start
+        RETRIES.inc(reason="hedge")
+        agent_copy, task_copy = clone_step(agent, task)
+        second = spawn(self._timed, key, call, agent_copy, task_copy, False)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if f.exception() is None), None)
+            if winner is not None:
+                break
+        else:
+            # Both calls failed: surface the original error
+            return first.result()
+
+        for loser in {first, second} - {winner}:
+            loser.cancel()
+            loser.add_done_callback(self._waste)
+        with self.lock:
+            self.effective[role].append(time.time() - start)
+            if winner is second:
+                self.hedge_wins += 1
+        text, usage = winner.result()
+        if winner is second:
+            # Time spent on the first call before its duplicate was fired
+            usage = {**usage, "retry_time": usage.get("retry_time", 0.0) + hedge_delay}
+        return text, usage
+
+    def report(self) -> dict:
+        """Hedge rate, wasted tokens and per-role tail latency with and without hedging."""
+        with self.lock:
+            roles = {}
+            for role in self.effective:
+                primary_p99 = percentile(self.primary[role], 99)
+                effective_p99 = percentile(self.effective[role], 99)
+                threshold = self.threshold(role)
+                roles[role] = {
+                    # None: too few samples yet, so no call of this role could be hedged
+                    "threshold": round(threshold, 2) if threshold is not None else None,
+                    "p99_unhedged": round(primary_p99, 2),
+                    "p99_hedged": round(effective_p99, 2),
+                    "p99_improvement": round(primary_p99 - effective_p99, 2),
+                }
+            return {
+                "percentile": self.pct,
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "wasted_tokens": self.wasted_tokens,
+                "roles": roles,
+            }
+
+
+_shared_history = HedgeHistory()
+
+
+def print_hedge_report(report: dict) -> None:
+    """Print a formatted hedging summary."""
+    print(f"\n{'='*80}")
+    print(f"HEDGING (p{report['percentile']:g} threshold)")
+    print(f"{'='*80}")
+    print(f"  Calls: {report['calls']}  Hedged: {report['hedged']} ({report['hedge_rate']:.1%})"
+          f"  Hedge wins: {report['hedge_wins']}  Wasted tokens: {report['wasted_tokens']}")
+    for role, stats in report["roles"].items():
+        threshold = f"{stats['threshold']}s" if stats["threshold"] is not None else "none (warming up)"
+        print(f"  {role:<18} threshold {threshold} | p99 {stats['p99_unhedged']}s"
+              f" -> {stats['p99_hedged']}s ({stats['p99_improvement']}s faster)")
+    print(f"{'='*80}\n")
@@ -0,0 +1,190 @@
+"""Load tests: concurrent debate sweeps against the mock Messages API.
+
+Starts a ``mock_api.py`` server in-process, unless ``--url`` points at a
+running one, and runs real debates through it: CrewAI agents with the
+Anthropic client and its retries. The debates run at each concurrency level
+in turn. The server's latency model and fault rates are set with the same
+flags as ``mock_api.py``.
+
+Per level, the report gives:
+
+- throughput (debates/s and calls/s)
+- p50/p95/p99 latency of agent calls and of whole debates
+- failed debates by error type
+- the faults the server injected (429s, 529s, dropped connections), and the
+  share the client's retries recovered from
+
+The ceiling is the level with the highest throughput and no failed debates;
+past it, adding concurrency only adds queueing. Reports are saved to
+``results/load_tests/``.
+
+    python load_test.py --concurrency 50 100 200 500 --latency 1.0 --rate-limit-rate 0.02 --drop-rate 0.01
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from config import DebateConfig
+from debate import DebateOrchestrator
+from hedging import percentile
+from mock_api import MockAnthropicServer, MockAPISettings, add_settings_arguments, settings_from_args
+
+
+LOAD_TEST_DIR = Path("results") / "load_tests"
+FAULTS = ("injected_429", "injected_529", "rate_limited", "overloaded", "dropped")
+
+
+def server_stats(url: str) -> dict:
+    with urllib.request.urlopen(f"{url}/stats", timeout=10) as response:
+        return json.load(response)
+
+
+def run_one(config: DebateConfig) -> dict:
+    """Run one debate and return its outcome and per-call durations."""
+    start = time.perf_counter()
+    try:
+        results = DebateOrchestrator(config).run_debate()
+    except Exception as e:
+        return {"ok": False, "error": type(e).__name__, "duration": time.perf_counter() - start, "calls": []}
+    calls = [m["duration"] for r in results["rounds"] for m in r["messages"]]
+    calls.append(results["judgment"]["duration"])
+    return {"ok": True, "duration": time.perf_counter() - start, "calls": calls}
+
+
+def latency_summary(values: list[float]) -> dict:
+    return {f"p{pct}": round(percentile(values, pct), 3) for pct in (50, 95, 99)}
+
+
+def run_level(url: str, concurrency: int, debates: int, config: DebateConfig) -> dict:
+    """Run a batch of debates at one concurrency level and summarize it."""
+    before = server_stats(url)
+    start = time.perf_counter()
+    # redirect_stdout is process-wide, so silence the whole pool at once
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(run_one, [config] * debates))
+    elapsed = time.perf_counter() - start
+    after = server_stats(url)
+    server = {key: after.get(key, 0) - before.get(key, 0) for key in ("requests", "ok", *FAULTS)}
+
+    completed = [o for o in outcomes if o["ok"]]
+    calls = [d for o in completed for d in o["calls"]]
+    failed = len(outcomes) - len(completed)
+    faults = sum(server[key] for key in FAULTS)
+    return {
+        "concurrency": concurrency,
+        "debates": debates,
+        "completed": len(completed),
+        "failed": failed,
+        "errors": dict(Counter(o["error"] for o in outcomes if not o["ok"])),
+        "duration_s": round(elapsed, 3),
+        "debates_per_s": round(len(completed) / elapsed, 3),
+        "calls_per_s": round(len(calls) / elapsed, 2),
+        "call_latency": latency_summary(calls),
+        "debate_latency": latency_summary([o["duration"] for o in completed]),
+        "server": {**server, "peak_in_flight": after["peak_in_flight"]},
+        "faults": faults,
+        # A failed debate gave up on at least one fault; every other fault was retried through
+        "fault_recovery": round((faults - min(failed, faults)) / faults, 3) if faults else None,
+    }
+
+
+def ceiling(levels: list[dict]) -> Optional[int]:
+    """The concurrency with the highest throughput among levels where no debate failed."""
+    clean = [level for level in levels if not level["failed"]]
+    return max(clean, key=lambda level: level["debates_per_s"])["concurrency"] if clean else None
+
+
+def run_load_test(concurrency_levels: list[int], debates: Optional[int] = None,
+                  settings: Optional[MockAPISettings] = None, url: Optional[str] = None,
+                  save: bool = True, **config_overrides) -> dict:
+    """Run every concurrency level (debates per level defaults to the level) and return the report."""
+    server = None
+    if url is None:
+        server = MockAnthropicServer(settings)
+        url = server.start()
+    config = DebateConfig(**{"save_results": False, "verbose": False, "api_base_url": url, **config_overrides})
+    try:
+        levels = [run_level(url, c, debates or c, config) for c in concurrency_levels]
+        stats = server_stats(url)
+    finally:
+        if server is not None:
+            server.stop()
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "url": url,
+        "settings": stats["settings"],
+        "debate": {"num_agents": config.num_agents, "num_rounds": config.num_rounds,
+                   "protocol": config.protocol, "model": config.model_name},
+        "levels": levels,
+        "ceiling": ceiling(levels),
+    }
+    if save:
+        LOAD_TEST_DIR.mkdir(parents=True, exist_ok=True)
+        path = LOAD_TEST_DIR / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        report["report_file"] = str(path)
+    return report
+
+
+def print_load_report(report: dict) -> None:
+    """Print one row per concurrency level."""
+    settings = report["settings"]
+    print(f"\n{'='*100}")
+    print(f"LOAD TEST ({report['url']}, latency {settings['latency']}s {settings['latency_dist']}, "
+          f"429 {settings['rate_limit_rate']:.0%}, 529 {settings['overload_rate']:.0%}, "
+          f"drops {settings['drop_rate']:.0%})")
+    print(f"{'='*100}")
+    print(f"  {'Conc':>5} {'Done':>9} {'Debates/s':>10} {'Calls/s':>8} {'Call p50/p95/p99 (s)':>22} "
+          f"{'Debate p50/p95 (s)':>19} {'Faults':>7} {'Recov':>6}")
+    for level in report["levels"]:
+        call, debate = level["call_latency"], level["debate_latency"]
+        recovery = f"{level['fault_recovery']:.0%}" if level["fault_recovery"] is not None else "-"
+        print(f"  {level['concurrency']:>5} {level['completed']:>4}/{level['debates']:<4} "
+              f"{level['debates_per_s']:>10} {level['calls_per_s']:>8} "
+              f"{call['p50']:>6}/{call['p95']:>6}/{call['p99']:>6}   "
+              f"{debate['p50']:>8}/{debate['p95']:>8} {level['faults']:>7} {recovery:>6}")
+        if level["errors"]:
+            print(f"        failures: {', '.join(f'{k} {v}' for k, v in level['errors'].items())}")
+    ceiling_level = report["ceiling"]
+    print(f"\n  Ceiling: {ceiling_level if ceiling_level is not None else 'none (every level had failures)'}"
+          f" concurrent debates")
+    print(f"{'='*100}\n")
+
+
+def main():
+    """Run a load test against an in-process or external mock server."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100],
+                        help="Concurrent debates per level")
+    parser.add_argument("--debates", type=int, help="Debates per level (default: the level's concurrency)")
+    parser.add_argument("--url", help="Use a running mock_api.py server instead of starting one")
+    parser.add_argument("--num-agents", type=int, default=4)
+    parser.add_argument("--num-rounds", type=int, default=2)
+    parser.add_argument("--protocol", help="Round protocol (default by --num-agents)")
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    load_dotenv()
+    # The Anthropic client needs a key even though the mock ignores it
+    os.environ.setdefault("ANTHROPIC_API_KEY", "mock")
+    report = run_load_test(args.concurrency, args.debates, settings_from_args(args), args.url,
+                           num_agents=args.num_agents, num_rounds=args.num_rounds, protocol=args.protocol)
+    print_load_report(report)
+    print(f"Report: {report['report_file']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Structured, non-blocking logging for debates.
+
+With ``DebateConfig(log_mode="structured")`` the orchestrator emits JSON
+events instead of printing banners, and crewai's verbose agent dumps are
+turned off. A log call only puts the record on a queue; a QueueListener
+thread does all formatting and I/O, writing:
+
+- a compact one-line-per-event progress view to the console
+- every event to ``<log_dir>/run.jsonl``
+- each debate's events to ``<log_dir>/debate_<id>.jsonl``
+
+Components log under ``debate.*`` (orchestrator, agent, service) and their
+levels are set independently, e.g. ``{"debate.agent": "DEBUG"}`` adds full
+agent outputs to the log files without putting them on the console.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+
+LOG_DIR = Path("results") / "logs"
+ROOT_LOGGER = "debate"
+DEFAULT_LEVELS = {"debate": "INFO", "debate.agent": "INFO"}
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_log_dir: Optional[Path] = None
+
+
+def record_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in STANDARD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **record_fields(record),
+        }
+        return json.dumps(event, default=str)
+
+
+class ProgressFormatter(logging.Formatter):
+    """Short console lines: time, debate id and message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        debate_id = getattr(record, "debate_id", None)
+        prefix = f"{stamp} [{debate_id}]" if debate_id else stamp
+        return f"{prefix} {record.getMessage()}"
+
+
+class DebateFileHandler(logging.Handler):
+    """Routes records carrying a debate_id to that debate's own JSON-lines file."""
+
+    def __init__(self, log_dir: Path):
+        super().__init__()
+        self.log_dir = log_dir
+        self.files = {}
+        self.setFormatter(JsonFormatter())
+
+    def emit(self, record: logging.LogRecord) -> None:
+        debate_id = getattr(record, "debate_id", None)
+        if debate_id is None:
+            return
+        f = self.files.get(debate_id)
+        if f is None:
+            f = self.files[debate_id] = open(debate_log_path(debate_id, self.log_dir), "a")
+        f.write(self.format(record) + "\n")
+        if getattr(record, "event", None) == "debate_finished":
+            f.close()
+            del self.files[debate_id]
+
+    def close(self) -> None:
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+        super().close()
+
+
+def debate_log_path(debate_id: str, log_dir: Optional[Path] = None) -> Path:
+    return Path(log_dir or _log_dir or LOG_DIR) / f"debate_{debate_id}.jsonl"
+
+
+def parse_levels(specs: list[str]) -> dict[str, str]:
+    """Parse COMPONENT=LEVEL pairs (component names may omit the "debate." prefix)."""
+    levels = {}
+    for spec in specs:
+        name, _, level = spec.partition("=")
+        if not level:
+            raise ValueError(f"Expected COMPONENT=LEVEL, got {spec!r}")
+        if name != ROOT_LOGGER and not name.startswith(f"{ROOT_LOGGER}."):
+            name = f"{ROOT_LOGGER}.{name}"
+        levels[name] = level.upper()
+    return levels
+
+
+def configure_logging(log_dir: Optional[Path] = None, levels: Optional[dict[str, str]] = None,
+                      console: bool = True) -> Path:
+    """Route all debate.* logging through a background queue listener (once per process).
+
+    Returns the log directory in use; later calls only adjust levels.
+    """
+    global _listener, _log_dir
+    if _listener is not None:
+        for name, level in (levels or {}).items():
+            logging.getLogger(name).setLevel(level)
+        return _log_dir
+    for name, level in {**DEFAULT_LEVELS, **(levels or {})}.items():
+        logging.getLogger(name).setLevel(level)
+
+    _log_dir = Path(log_dir or LOG_DIR)
+    _log_dir.mkdir(parents=True, exist_ok=True)
+
+    run_handler = logging.FileHandler(_log_dir / "run.jsonl")
+    run_handler.setFormatter(JsonFormatter())
+    handlers = [run_handler, DebateFileHandler(_log_dir)]
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(ProgressFormatter())
+        handlers.append(console_handler)
+
+    records = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.propagate = False
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _log_dir
+
+
+def shutdown_logging() -> None:
+    """Flush the queue and close every log file."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger(ROOT_LOGGER).handlers = []
+    _listener = None
+
+
+class DebateLog:
+    """Event logging bound to one debate."""
+
+    def __init__(self, debate_id: str):
+        self.debate_id = debate_id
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.orchestrator")
+        self.agent_logger = logging.getLogger(f"{ROOT_LOGGER}.agent")
+
+    def event(self, event: str, msg: str, level: int = logging.INFO, **fields) -> None:
+        self.logger.log(level, msg, extra={"debate_id": self.debate_id, "event": event, **fields})
+
+    def output(self, round: Optional[int], role: str, text: str) -> None:
+        """Full agent output, only formatted when debate.agent is at DEBUG."""
+        if self.agent_logger.isEnabledFor(logging.DEBUG):
+            self.agent_logger.debug(
+                f"{role} output", extra={"debate_id": self.debate_id, "event": "agent_output",
+                                         "round": round, "role": role, "text": text},
+            )
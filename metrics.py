@@ -0,0 +1,334 @@
+"""In-process metrics for debates and sweeps, in the Prometheus text format.
+
+The orchestrator, cassette, hedging, batch and service code all record into
+the module-level REGISTRY: debates in flight, queue depth, per-role agent
+call latency histograms, tokens, cassette hit rate, retries, errors and
+estimated spend. A sweep can expose them on a local ``/metrics`` endpoint
+(MetricsServer) and/or append periodic JSON snapshots to a file
+(SnapshotWriter), so throughput collapses such as rate-limit storms show up
+while the run is still going.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from config import estimate_cost
+
+
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """A named family of samples keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.lock = lock
+        self.values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for key, value in self.values.items():
+            yield self.name, _format_labels(self.labels, key), value
+
+    def snapshot(self) -> dict:
+        return {",".join(key) or "total": value for key, value in self.values.items()}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def total(self) -> float:
+        with self.lock:
+            return sum(self.values.values())
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], lock: threading.Lock,
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels, lock)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for key, (counts, total) in self.values.items():
+            for bound, count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labels, key, le), count
+            yield f"{self.name}_sum", _format_labels(self.labels, key), total
+            yield f"{self.name}_count", _format_labels(self.labels, key), counts[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            ",".join(key) or "total": {"count": counts[-1], "mean": round(total / counts[-1], 3) if counts[-1] else 0.0}
+            for key, (counts, total) in self.values.items()
+        }
+
+
+class MetricsRegistry:
+    """All metrics of one process, rendered together."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.started = time.time()
+
+    def _add(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels, self.lock))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels, self.lock))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, self.lock, buckets))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for metric in self.metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                for name, labels, value in metric.samples():
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self, since: Optional[tuple[float, float]] = None) -> dict:
+        """Current values plus derived rates, as a JSON-friendly dict.
+
+        since is the consumer's previous (timestamp, tokens_total). With it,
+        tokens_per_s_recent covers the time since then, so a series of
+        snapshots shows throughput collapsing as it happens.
+        """
+        now = time.time()
+        elapsed = now - self.started
+        with self.lock:
+            values = {name: metric.snapshot() for name, metric in self.metrics.items()}
+            tokens = sum(TOKENS.values.values())
+            cost = sum(ESTIMATED_COST.values.values())
+            hits = CACHE_REQUESTS.values.get(("hit",), 0.0)
+            misses = CACHE_REQUESTS.values.get(("miss",), 0.0)
+        recent = None
+        if since is not None and now > since[0]:
+            recent = round((tokens - since[1]) / (now - since[0]), 2)
+        return {
+            "timestamp": now,
+            "uptime_s": round(elapsed, 1),
+            "tokens_total": tokens,
+            "tokens_per_s": round(tokens / elapsed, 2) if elapsed else 0.0,
+            "tokens_per_s_recent": recent,
+            "cache_hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "estimated_cost_usd": round(cost, 4),
+            "metrics": values,
+        }
+
+
+REGISTRY = MetricsRegistry()
+
+DEBATES_IN_FLIGHT = REGISTRY.gauge("debate_debates_in_flight", "Debates currently running")
+DEBATES = REGISTRY.counter("debate_debates_total", "Finished debates by outcome", ["status"])
+QUEUE_DEPTH = REGISTRY.gauge("debate_queue_depth", "Debates waiting to start")
+CALL_LATENCY = REGISTRY.histogram("debate_llm_latency_seconds", "Agent call latency by role", ["role"])
+TOKENS = REGISTRY.counter("debate_tokens_total", "LLM tokens used", ["kind"])
+CACHE_REQUESTS = REGISTRY.counter("debate_cache_requests_total", "Cassette lookups by result", ["result"])
+RETRIES = REGISTRY.counter("debate_llm_retries_total", "Repeated agent calls by reason", ["reason"])
+ERRORS = REGISTRY.counter("debate_llm_errors_total", "Failed agent calls by role and error", ["role", "error"])
+ESTIMATED_COST = REGISTRY.counter("debate_estimated_cost_usd_total", "Estimated spend so far", ["model"])
+
+
+def record_call(role: str, model_name: str, duration: float, usage: dict) -> None:
+    """Record one successful agent call (replayed calls cost nothing and use no tokens).
+
+    A precomputed usage["cost"] (e.g. from a call escalated across models) is used as is.
+    """
+    CALL_LATENCY.observe(duration, role=role)
+    if usage.get("cached"):
+        return
+    prompt_tokens = usage.get("prompt_tokens", 0)
+    completion_tokens = usage.get("completion_tokens", 0)
+    TOKENS.inc(prompt_tokens, kind="prompt")
+    TOKENS.inc(completion_tokens, kind="completion")
+    cost = usage.get("cost")
+    if cost is None:
+        cost = estimate_cost(model_name, prompt_tokens, completion_tokens)
+    ESTIMATED_COST.inc(cost, model=model_name)
+
+
+def record_error(role: str, error: BaseException) -> None:
+    ERRORS.inc(role=role, error=type(error).__name__)
+
+
+@contextmanager
+def track_debate() -> Iterator[None]:
+    """Count a debate as in flight for the duration of the block."""
+    DEBATES_IN_FLIGHT.inc()
+    try:
+        yield
+    except Exception:
+        DEBATES.inc(status="failed")
+        raise
+    except BaseException:
+        # Cancelled async debates and interrupts
+        DEBATES.inc(status="cancelled")
+        raise
+    else:
+        DEBATES.inc(status="completed")
+    finally:
+        DEBATES_IN_FLIGHT.dec()
+
+
+class MetricsServer:
+    """Serves REGISTRY on a local /metrics endpoint from a background thread."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] == "/metrics":
+                    body, content_type = registry.render(), CONTENT_TYPE
+                elif self.path.split("?")[0] == "/metrics.json":
+                    body, content_type = json.dumps(registry.snapshot()), "application/json"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = body.encode()
+                self.send_response(200)
+                self.send_header("content-type", content_type)
+                self.send_header("content-length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self) -> "MetricsServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SnapshotWriter:
+    """Appends a JSON snapshot of REGISTRY to a file every `interval` seconds."""
+
+    def __init__(self, path: Path, interval: float = 30.0, registry: MetricsRegistry = REGISTRY):
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = registry
+        self.stopping = threading.Event()
+        self.thread = None
+        self.last = (registry.started, 0.0)  # (timestamp, tokens_total) of the previous snapshot
+
+    def write(self) -> None:
+        snapshot = self.registry.snapshot(self.last)
+        self.last = (snapshot["timestamp"], snapshot["tokens_total"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(snapshot) + "\n")
+
+    def _loop(self) -> None:
+        while not self.stopping.wait(self.interval):
+            self.write()
+
+    def start(self) -> "SnapshotWriter":
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread and write a final snapshot."""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.write()
+
+
+def start_exporters(port: Optional[int] = None, snapshot_path: Optional[Path] = None,
+                    interval: float = 30.0) -> list:
+    """Start whichever of the endpoint and snapshot writer are requested."""
+    exporters = []
+    if port is not None:
+        server = MetricsServer(port).start()
+        print(f"Metrics: {server.url}")
+        exporters.append(server)
+    if snapshot_path is not None:
+        exporters.append(SnapshotWriter(snapshot_path, interval).start())
+    return exporters
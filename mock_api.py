@@ -0,0 +1,354 @@
+"""Local mock of the Anthropic Messages API for load and failure tests.
+
+Serves ``POST /v1/messages`` closely enough for the ``anthropic`` client and
+CrewAI's ``LLM``, pointed at it with ``DebateConfig(api_base_url=...)`` or
+``--base-url``. It supports plain and streamed (SSE) replies, with token
+usage in the same fields as the real API. Replies come from
+``mock_llm.mock_output``, so judge prompts get parseable verdicts.
+
+Every reply waits for a first-token latency drawn from a fixed, uniform or
+lognormal distribution, plus a per-output-token time. Faults are injected at
+configurable rates:
+
+- 429 rate_limit_error, with retry-after and anthropic-ratelimit-* headers;
+  also returned for real once ``--rpm`` requests arrive within a minute
+- 529 overloaded_error; also returned once ``--max-concurrency`` requests
+  are in flight
+- dropped connections, closed before the reply or part-way through a stream
+
+``GET /stats`` returns request, status and fault counters (not part of the
+real API). ``load_test.py`` starts this server and drives sweeps through it.
+
+    python mock_api.py --port 8790 --latency 0.5 --rate-limit-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Literal, Optional
+
+from mock_llm import mock_output
+
+
+DEFAULT_PORT = 8790
+ROLE = re.compile(r"You are ([^.\n]+)\.")
+STREAM_CHUNK_CHARS = 40  # Characters per content_block_delta event
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class MockAPISettings:
+    """Latency model and fault rates of the mock server."""
+
+    latency: float = 0.2  # Median seconds to the first token
+    latency_dist: Literal["fixed", "uniform", "lognormal"] = "lognormal"
+    latency_sigma: float = 0.5  # Lognormal shape; uniform draws from [0, 2 * latency]
+    token_time: float = 0.0  # Seconds per output token after the first
+    response_chars: int = 2000
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with an injected 429
+    overload_rate: float = 0.0  # Fraction answered with an injected 529
+    drop_rate: float = 0.0  # Fraction whose connection is dropped
+    retry_after: float = 1.0  # Seconds suggested by injected 429/529 replies
+    rpm: Optional[int] = None  # Requests per rolling minute before real 429s
+    max_concurrency: Optional[int] = None  # In-flight requests before real 529s
+    seed: Optional[int] = None
+
+
+class MockAnthropicServer:
+    """asyncio HTTP/1.1 server speaking the Messages API."""
+
+    def __init__(self, settings: Optional[MockAPISettings] = None):
+        self.settings = settings or MockAPISettings()
+        self.rng = random.Random(self.settings.seed)
+        self.counts = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.window = deque()  # Arrival times in the rolling rate-limit minute
+        self.started = time.time()
+        self.url = None
+        self.loop = None
+        self.server = None
+
+    def stats(self) -> dict:
+        return {
+            "uptime": round(time.time() - self.started, 3),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "settings": asdict(self.settings),
+            **dict(self.counts),
+        }
+
+    def _latency(self) -> float:
+        s = self.settings
+        if s.latency_dist == "fixed" or s.latency <= 0:
+            return max(s.latency, 0.0)
+        if s.latency_dist == "uniform":
+            return self.rng.uniform(0, 2 * s.latency)
+        return self.rng.lognormvariate(math.log(s.latency), s.latency_sigma)
+
+    def _rate_limit_headers(self, now: float) -> dict:
+        s = self.settings
+        while self.window and now - self.window[0] >= 60:
+            self.window.popleft()
+        if s.rpm is None:
+            return {}
+        reset = self.window[0] + 60 if self.window else now + 60
+        return {
+            "anthropic-ratelimit-requests-limit": str(s.rpm),
+            "anthropic-ratelimit-requests-remaining": str(max(s.rpm - len(self.window), 0)),
+            "anthropic-ratelimit-requests-reset":
+                datetime.fromtimestamp(reset, timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+        }
+
+    def _fault(self) -> Optional[tuple[int, str, float]]:
+        """An error (status, type, retry-after) for this request, or None to serve it."""
+        s = self.settings
+        now = time.time()
+        self._rate_limit_headers(now)
+        if s.rpm is not None and len(self.window) >= s.rpm:
+            self.counts["rate_limited"] += 1
+            return 429, "rate_limit_error", max(self.window[0] + 60 - now, 0.1)
+        self.window.append(now)
+        if s.max_concurrency is not None and self.in_flight >= s.max_concurrency:
+            self.counts["overloaded"] += 1
+            return 529, "overloaded_error", s.retry_after
+        roll = self.rng.random()
+        if roll < s.rate_limit_rate:
+            self.counts["injected_429"] += 1
+            return 429, "rate_limit_error", s.retry_after
+        if roll < s.rate_limit_rate + s.overload_rate:
+            self.counts["injected_529"] += 1
+            return 529, "overloaded_error", s.retry_after
+        return None
+
+    def _reply(self, request: dict) -> tuple[str, int, int]:
+        """Reply text and (input, output) token counts for a Messages request."""
+        system = request.get("system") or ""
+        if isinstance(system, list):
+            system = " ".join(block.get("text", "") for block in system)
+        prompt = "\n".join(
+            content if isinstance(content, str) else " ".join(b.get("text", "") for b in content)
+            for content in (m.get("content", "") for m in request.get("messages", []))
+        )
+        match = ROLE.search(system) or ROLE.search(prompt)
+        self.calls += 1
+        text = mock_output(match.group(1) if match else "Agent", prompt, self.calls,
+                           self.settings.response_chars, request.get("max_tokens"), self.rng)
+        return text, (len(system) + len(prompt)) // CHARS_PER_TOKEN, max(len(text) // CHARS_PER_TOKEN, 1)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one keep-alive connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                keep_alive = await self._route(method, target.split("?", 1)[0], body, writer)
+                if not keep_alive:
+                    return
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # Malformed requests, clients hanging up, and idle connections at shutdown
+            return
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> bool:
+        """Answer one request; returns whether the connection stays open."""
+        if method == "GET" and path.rstrip("/") == "/stats":
+            return await self._send_json(writer, 200, self.stats())
+        if method != "POST" or path.rstrip("/") != "/v1/messages":
+            return await self._send_error(writer, 404, "not_found_error", f"{method} {path} not found")
+        self.counts["requests"] += 1
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            return await self._send_error(writer, 400, "invalid_request_error", str(e))
+
+        fault = self._fault()
+        if fault is not None:
+            status, error_type, retry_after = fault
+            return await self._send_error(writer, status, error_type, f"Mock {error_type}",
+                                          {"retry-after": f"{retry_after:.1f}"})
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            text, input_tokens, output_tokens = self._reply(request)
+            drop = self.rng.random() < self.settings.drop_rate
+            first_token = self._latency()
+            if request.get("stream"):
+                return await self._stream(writer, request, text, input_tokens, output_tokens, first_token, drop)
+            await asyncio.sleep(first_token + self.settings.token_time * output_tokens)
+            if drop:
+                self.counts["dropped"] += 1
+                return False
+            self.counts["ok"] += 1
+            return await self._send_json(writer, 200, {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": request.get("model"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+            })
+        finally:
+            self.in_flight -= 1
+
+    async def _stream(self, writer: asyncio.StreamWriter, request: dict, text: str,
+                      input_tokens: int, output_tokens: int, first_token: float, drop: bool) -> bool:
+        """Send a reply as server-sent events; a dropped stream stops half way."""
+        await asyncio.sleep(first_token)
+        self._write_head(writer, 200, "text/event-stream", None, {"cache-control": "no-cache"})
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        events = [
+            ("message_start", {"type": "message_start", "message": {
+                "id": message_id, "type": "message", "role": "assistant", "model": request.get("model"),
+                "content": [], "stop_reason": None, "stop_sequence": None,
+                "usage": {"input_tokens": input_tokens, "output_tokens": 1}}}),
+            ("content_block_start", {"type": "content_block_start", "index": 0,
+                                     "content_block": {"type": "text", "text": ""}}),
+            ("ping", {"type": "ping"}),
+        ]
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+        events += [("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                            "delta": {"type": "text_delta", "text": chunk}}) for chunk in chunks]
+        events += [
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                               "usage": {"output_tokens": output_tokens}}),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        chunk_delay = self.settings.token_time * STREAM_CHUNK_CHARS / CHARS_PER_TOKEN
+        cut = len(events) // 2 if drop else len(events)
+        for event, data in events[:cut]:
+            writer.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+            await writer.drain()
+            if event == "content_block_delta" and chunk_delay:
+                await asyncio.sleep(chunk_delay)
+        self.counts["dropped" if drop else "ok"] += 1
+        return False  # The stream body ends when the connection closes
+
+    def _write_head(self, writer: asyncio.StreamWriter, status: int, content_type: str,
+                    length: Optional[int], extra: Optional[dict] = None) -> None:
+        headers = {
+            "content-type": content_type,
+            "request-id": f"req_{uuid.uuid4().hex[:24]}",
+            **self._rate_limit_headers(time.time()),
+            **(extra or {}),
+        }
+        if length is not None:
+            headers["content-length"] = str(length)
+        else:
+            headers["connection"] = "close"
+        head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(f"HTTP/1.1 {status} {self._phrase(status)}\r\n{head}\r\n".encode())
+
+    @staticmethod
+    def _phrase(status: int) -> str:
+        return "Overloaded" if status == 529 else HTTPStatus(status).phrase
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: dict,
+                         extra: Optional[dict] = None) -> bool:
+        data = json.dumps(payload).encode()
+        self._write_head(writer, status, "application/json", len(data), extra)
+        writer.write(data)
+        await writer.drain()
+        return True
+
+    async def _send_error(self, writer: asyncio.StreamWriter, status: int, error_type: str, message: str,
+                          extra: Optional[dict] = None) -> bool:
+        self.counts[f"status_{status}"] += 1
+        return await self._send_json(
+            writer, status, {"type": "error", "error": {"type": error_type, "message": message}}, extra
+        )
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                    ready: Optional[threading.Event] = None) -> None:
+        # A large backlog so hundreds of clients can connect at once
+        self.server = await asyncio.start_server(self._handle, host, port, backlog=2048)
+        self.loop = asyncio.get_running_loop()
+        bound_port = self.server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{bound_port}"
+        if ready is not None:
+            ready.set()
+        async with self.server:
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve from a daemon thread (port 0 picks a free port) and return the base URL."""
+        ready = threading.Event()
+        threading.Thread(target=asyncio.run, args=(self.serve(host, port, ready),),
+                         name="mock-api", daemon=True).start()
+        ready.wait()
+        return self.url
+
+    def stop(self) -> None:
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    """Command-line flags for every MockAPISettings field."""
+    defaults = MockAPISettings()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="Median seconds to the first token")
+    parser.add_argument("--latency-dist", choices=("fixed", "uniform", "lognormal"), default=defaults.latency_dist)
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma)
+    parser.add_argument("--token-time", type=float, default=defaults.token_time,
+                        help="Seconds per output token after the first")
+    parser.add_argument("--response-chars", type=int, default=defaults.response_chars)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests given a 429")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="Fraction of requests given a 529")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of connections dropped")
+    parser.add_argument("--retry-after", type=float, default=defaults.retry_after)
+    parser.add_argument("--rpm", type=int, help="Requests per rolling minute before 429s")
+    parser.add_argument("--max-concurrency", type=int, help="In-flight requests before 529s")
+    parser.add_argument("--seed", type=int)
+
+
+def settings_from_args(args: argparse.Namespace) -> MockAPISettings:
+    return MockAPISettings(**{name: getattr(args, name) for name in MockAPISettings.__dataclass_fields__})
+
+
+def main():
+    """Run the mock Messages API server."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockAnthropicServer(settings_from_args(args))
+    print(f"Mock Messages API on http://{args.host}:{args.port} ({server.settings})")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
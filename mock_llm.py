@@ -0,0 +1,96 @@
+"""Mock LLM backend for benchmarks and offline runs."""
+
+import asyncio
+import random
+import time
+from typing import Optional
+
+from crewai import Agent, Task
+
+
+MOCK_VERDICT = """SCORES:
+- Evidence: 4/5
+- Feasibility: 3/5
+- Risks: 4/5
+- Clarity: 4/5
+
+The debate reached a clear conclusion: agentic AI will reshape rather than
+displace MBA talent. The Critic's challenge to the automation estimates
+improved the final argument."""
+
+MOCK_TEAM_VERDICT = """PRO SCORES:
+- Evidence: 4/5
+- Feasibility: 4/5
+- Risks: 3/5
+- Clarity: 4/5
+
+CON SCORES:
+- Evidence: 3/5
+- Feasibility: 3/5
+- Risks: 4/5
+- Clarity: 3/5
+
+WINNER: PRO
+
+The pro team's rebuttal of the automation estimates went unanswered, while
+the con team's strongest point on entry-level roles was conceded."""
+
+
+def mock_output(role: str, prompt: str, call: int, response_chars: int,
+                max_tokens: Optional[int], rng: random.Random) -> str:
+    """Synthetic reply to a prompt: a verdict for judge prompts, filler text otherwise."""
+    if "WINNER:" in prompt:
+        return MOCK_TEAM_VERDICT
+    if "SCORES:" in prompt:
+        return MOCK_VERDICT
+    line = f"{role} point {call}: evidence, trade-offs and open questions. "
+    output = (line * (response_chars // len(line) + 1))[:response_chars]
+    if max_tokens is not None:
+        output = output[:max_tokens * 4]
+    if "CONFIDENCE: N/5" in prompt:
+        output += f"\nCONFIDENCE: {rng.randint(1, 5)}/5"
+    return output
+
+
+class MockBackend:
+    """Task call that returns synthetic responses after a fixed or jittered delay."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 response_chars: int = 2000, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.response_chars = response_chars
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        self.calls += 1
+        return self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _respond(self, agent: Agent, task: Task) -> tuple[str, dict]:
+        # Honour a per-call max_tokens cap, as the API would
+        max_tokens = getattr(getattr(agent, "llm", None), "max_tokens", None)
+        output = mock_output(agent.role, task.description, self.calls, self.response_chars, max_tokens, self.rng)
+
+        usage = {
+            "prompt_tokens": len(task.description) // 4,
+            "completion_tokens": len(output) // 4,
+            "total_tokens": (len(task.description) + len(output)) // 4,
+        }
+        return output, usage
+
+    def __call__(self, agent: Agent, task: Task) -> tuple[str, dict]:
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._respond(agent, task)
+
+
+class AsyncMockBackend(MockBackend):
+    """MockBackend for the async debate API: waits on the event loop instead of a thread."""
+
+    async def __call__(self, agent: Agent, task: Task) -> tuple[str, dict]:
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._respond(agent, task)
@@ -0,0 +1,186 @@
+"""Concurrent model availability and latency probe.
+
+Every model in the list is probed at the same time, with a few sequential
+trials each. A trial streams one short rubric-scoring request and records
+time to first token, total latency, output tokens/sec and, on failure, the
+error type. Quality is the fraction of trials whose reply has every rubric
+score in parseable form, the same check the cascade applies to judge
+verdicts.
+
+The ranked report is written to ``results/probes/`` and names the fastest
+model that answered every trial at ``--min-quality`` as "selected".
+``run_experiments.py --probe`` runs a probe first and uses that model as the
+sweep's default ``model_name``, so a deprecated or degraded model fails here
+in seconds instead of stalling an overnight run.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from analyze_results import extract_scores
+from config import MODEL_PRICES, RUBRIC_CRITERIA
+
+
+PROBE_DIR = Path("results") / "probes"
+DEFAULT_MODELS = list(MODEL_PRICES)
+PROBE_MAX_TOKENS = 200
+PROBE_PROMPT = (
+    "Score this one-line argument on each criterion from 0 to 5.\n\n"
+    "ARGUMENT: Agentic AI will automate routine analysis, so MBA programs should teach "
+    "judgment and AI oversight instead of spreadsheet modelling.\n\n"
+    "Reply with only these lines:\nSCORES:\n"
+    + "\n".join(f"- {k.title()}: X/5" for k in RUBRIC_CRITERIA)
+)
+
+
+def probe_once(client, model: str) -> dict:
+    """Stream one probe request and time it."""
+    start = time.perf_counter()
+    first_token = None
+    try:
+        with client.messages.stream(model=model, max_tokens=PROBE_MAX_TOKENS,
+                                    messages=[{"role": "user", "content": PROBE_PROMPT}]) as stream:
+            chunks = []
+            for text in stream.text_stream:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                chunks.append(text)
+            message = stream.get_final_message()
+    except Exception as e:
+        return {
+            "ok": False,
+            "error": type(e).__name__,
+            "status": getattr(e, "status_code", None),
+            "detail": str(e)[:200],
+            "latency": round(time.perf_counter() - start, 3),
+        }
+    latency = time.perf_counter() - start
+    output_tokens = message.usage.output_tokens
+    # Streaming rate after the first token (undefined if the reply came in one chunk)
+    generation = latency - first_token if len(chunks) > 1 else 0.0
+    return {
+        "ok": True,
+        "ttft": round(first_token if first_token is not None else latency, 3),
+        "latency": round(latency, 3),
+        "output_tokens": output_tokens,
+        "tokens_per_s": round(output_tokens / generation, 1) if generation > 0 else None,
+        "quality_ok": len(extract_scores("".join(chunks))) == len(RUBRIC_CRITERIA),
+    }
+
+
+def probe_model(client, model: str, trials: int) -> dict:
+    """Run sequential trials against one model and summarize them."""
+    runs = [probe_once(client, model) for _ in range(trials)]
+    ok = [r for r in runs if r["ok"]]
+    summary = {
+        "model": model,
+        "trials": trials,
+        "successes": len(ok),
+        "availability": round(len(ok) / trials, 3),
+        "errors": {},
+        "runs": runs,
+    }
+    for r in runs:
+        if not r["ok"]:
+            summary["errors"][r["error"]] = summary["errors"].get(r["error"], 0) + 1
+    if ok:
+        rates = [r["tokens_per_s"] for r in ok if r["tokens_per_s"] is not None]
+        summary.update({
+            "ttft": round(statistics.median(r["ttft"] for r in ok), 3),
+            "latency": round(statistics.median(r["latency"] for r in ok), 3),
+            "tokens_per_s": round(statistics.median(rates), 1) if rates else None,
+            "quality": round(sum(r["quality_ok"] for r in ok) / len(ok), 3),
+        })
+    return summary
+
+
+def rank(models: list[dict]) -> list[dict]:
+    """Available models first, fastest median latency first; unavailable ones last."""
+    return sorted(models, key=lambda m: (m["successes"] == 0, -m["availability"], m.get("latency", float("inf"))))
+
+
+def select_model(ranked: list[dict], min_quality: float, min_availability: float = 1.0) -> Optional[str]:
+    """The fastest model that answered every trial (by default) and meets the quality floor."""
+    for m in ranked:
+        if m["successes"] and m["availability"] >= min_availability and m["quality"] >= min_quality:
+            return m["model"]
+    return None
+
+
+def run_probe(models: Optional[list[str]] = None, trials: int = 3, min_quality: float = 1.0,
+              base_url: Optional[str] = None, save: bool = True) -> dict:
+    """Probe every model concurrently and return the ranked report."""
+    from anthropic import Anthropic
+
+    load_dotenv()
+    models = models or DEFAULT_MODELS
+    client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), base_url=base_url, max_retries=0)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        summaries = list(pool.map(lambda m: probe_model(client, m, trials), models))
+    ranked = rank(summaries)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "trials": trials,
+        "min_quality": min_quality,
+        "duration": round(time.perf_counter() - start, 2),
+        "selected": select_model(ranked, min_quality),
+        "models": ranked,
+    }
+    if save:
+        PROBE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROBE_DIR / f"probe_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        report["report_file"] = str(path)
+    return report
+
+
+def print_probe_report(report: dict) -> None:
+    """Print the ranked probe table."""
+    print(f"\n{'='*80}")
+    print(f"MODEL PROBE ({report['trials']} trials per model, {report['duration']}s)")
+    print(f"{'='*80}")
+    print(f"  {'Model':<30} {'Avail':>6} {'TTFT':>7} {'Total':>7} {'Tok/s':>7} {'Quality':>8}  Errors")
+    for m in report["models"]:
+        errors = ", ".join(f"{k} {v}" for k, v in m["errors"].items()) or "-"
+        if m["successes"]:
+            print(f"  {m['model']:<30} {m['availability']:>6.0%} {m['ttft']:>6}s {m['latency']:>6}s "
+                  f"{m['tokens_per_s'] or '-':>7} {m['quality']:>8.0%}  {errors}")
+        else:
+            print(f"  {m['model']:<30} {m['availability']:>6.0%} {'-':>7} {'-':>7} {'-':>7} {'-':>8}  {errors}")
+    selected = report["selected"] or f"none (no available model meets quality {report['min_quality']:.0%})"
+    print(f"\n  Selected: {selected}")
+    print(f"{'='*80}\n")
+
+
+def main():
+    """Probe a model list and optionally select a default model for sweeps."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("models", nargs="*", help="Model names to probe (default: every model in MODEL_PRICES)")
+    parser.add_argument("--trials", type=int, default=3, help="Sequential trials per model")
+    parser.add_argument("--min-quality", type=float, default=1.0,
+                        help="Fraction of trials that must return parseable rubric scores to be selectable")
+    parser.add_argument("--base-url", help="API base URL (default: the Anthropic API)")
+    parser.add_argument("--select", action="store_true",
+                        help="Exit non-zero if no model is available at the quality floor")
+    args = parser.parse_args()
+
+    report = run_probe(args.models, args.trials, args.min_quality, args.base_url)
+    print_probe_report(report)
+    print(f"Report: {report['report_file']}")
+    if args.select and report["selected"] is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Debate round protocols as dependency graphs of role steps.
+
+A round is a RoundGraph: each RoleStep names the agent role that runs it,
+what kind of task it gets, and which other roles' outputs of the same round
+it consumes. The orchestrator starts every step whose inputs are ready at
+once, so a round takes as long as its deepest dependency chain rather than
+the sum of all its steps.
+
+The original protocols ship as predefined graphs ("solo" for 2 agents,
+"chain" for 4) and "panel" generalizes them to larger rosters.
+"parallel_critique" runs two critiques of the research side by side before
+the Synthesizer merges them, so the second critique adds no round latency.
+"teams" is an adversarial mode: a pro and a con team each run their own
+chain, and each team's research sees only the other side's published
+(final) output from the previous round.
+
+A custom roster can be given as ``DebateConfig.roster``, a list of RoleStep
+fields, e.g.::
+
+    [{"role": "Optimist", "kind": "research", "stance": "AI augments MBAs"},
+     {"role": "Skeptic", "kind": "research", "stance": "AI replaces MBAs"},
+     {"role": "Economist", "kind": "critique", "inputs": ["Optimist", "Skeptic"]},
+     {"role": "Technologist", "kind": "critique", "inputs": ["Optimist", "Skeptic"]},
+     {"role": "Synthesizer", "kind": "synthesis",
+      "inputs": ["Optimist", "Skeptic", "Economist", "Technologist"]}]
+"""
+
+from typing import Callable, Literal, NamedTuple, Optional
+
+from config import DebateConfig
+
+
+StepKind = Literal["research", "critique", "synthesis", "devil_advocate"]
+STEP_KINDS = ("research", "critique", "synthesis", "devil_advocate")
+
+# Critique perspectives for the extra critics of larger panels, in the order they are added
+CRITIC_LENSES = [
+    ("Economist", "economic incentives, costs and labour-market effects"),
+    ("Technologist", "technical feasibility and what current AI systems can actually do"),
+    ("Ethicist", "ethical risks, accountability and who bears the consequences"),
+    ("Practitioner", "how organizations actually hire, train and operate day to day"),
+]
+
+
+class RoleStep(NamedTuple):
+    """One agent's task in a round (inputs are roles whose outputs it consumes)."""
+    role: str
+    kind: StepKind
+    inputs: tuple[str, ...] = ()
+    stance: Optional[str] = None  # Position or critique lens given to the agent
+    team: Optional[str] = None  # Adversarial side; teams only see each other's published output
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RoleStep":
+        return cls(data["role"], data["kind"], tuple(data.get("inputs", ())), data.get("stance"), data.get("team"))
+
+
+class RoundGraph(NamedTuple):
+    """The steps of one debate round, in a valid execution order."""
+    name: str
+    steps: tuple[RoleStep, ...]
+
+    @property
+    def roles(self) -> list[str]:
+        return [step.role for step in self.steps]
+
+    def levels(self) -> list[list[RoleStep]]:
+        """Steps grouped by dependency depth; each level can run concurrently."""
+        depth = {}
+        for step in self.steps:
+            depth[step.role] = 1 + max((depth[r] for r in step.inputs), default=0)
+        levels = [[] for _ in range(max(depth.values(), default=0))]
+        for step in self.steps:
+            levels[depth[step.role] - 1].append(step)
+        return levels
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels())
+
+    @property
+    def teams(self) -> list[str]:
+        return list(dict.fromkeys(step.team for step in self.steps if step.team is not None))
+
+    def team_roles(self, team: str) -> list[str]:
+        return [step.role for step in self.steps if step.team == team]
+
+    def published(self, team: str) -> str:
+        """The role whose output is a team's published argument (its last step)."""
+        return self.team_roles(team)[-1]
+
+    def validate(self) -> "RoundGraph":
+        seen = set()
+        for step in self.steps:
+            if step.role in seen:
+                raise ValueError(f"Duplicate role {step.role!r} in protocol {self.name!r}")
+            if step.role == "Judge":
+                raise ValueError("The Judge is added to every protocol and cannot be a round step")
+            if step.kind not in STEP_KINDS:
+                raise ValueError(f"Unknown step kind {step.kind!r} for {step.role!r}")
+            missing = [r for r in step.inputs if r not in seen]
+            if missing:
+                # Steps are listed in order, so this also rules out cycles
+                raise ValueError(f"{step.role!r} depends on {missing}, which must be listed before it")
+            if step.kind == "research" and step.inputs:
+                raise ValueError(f"Research step {step.role!r} only sees the previous round, not same-round inputs")
+            if step.kind != "research" and not step.inputs:
+                raise ValueError(f"{step.kind} step {step.role!r} needs at least one input")
+            teams = {team for team, role in ((s.team, s.role) for s in self.steps) if role in step.inputs}
+            if teams - {step.team}:
+                raise ValueError(f"{step.role!r} cannot see another team's same-round output")
+            seen.add(step.role)
+        if not self.steps:
+            raise ValueError(f"Protocol {self.name!r} has no steps")
+        if self.teams and (len(self.teams) != 2 or any(step.team is None for step in self.steps)):
+            raise ValueError(f"Protocol {self.name!r} must put every step in one of exactly two teams")
+        return self
+
+
+def _closing_step(config: DebateConfig, inputs: tuple[str, ...]) -> RoleStep:
+    if config.include_devil_advocate:
+        return RoleStep("Devil's Advocate", "devil_advocate", inputs)
+    return RoleStep("Synthesizer", "synthesis", inputs)
+
+
+def solo_protocol(config: DebateConfig) -> tuple[RoleStep, ...]:
+    """Researcher only (the 2-agent debate)."""
+    return (RoleStep("Researcher", "research"),)
+
+
+def chain_protocol(config: DebateConfig) -> tuple[RoleStep, ...]:
+    """Researcher -> Critic -> Synthesizer/Devil's Advocate (the 4-agent debate)."""
+    steps = (RoleStep("Researcher", "research"), RoleStep("Critic", "critique", ("Researcher",)))
+    if config.num_agents == 3:
+        return steps
+    return steps + (_closing_step(config, ("Researcher", "Critic")),)
+
+
+def panel_protocol(config: DebateConfig) -> tuple[RoleStep, ...]:
+    """Researcher -> parallel critics with different lenses -> Synthesizer/Devil's Advocate."""
+    num_critics = config.num_agents - 3
+    if num_critics < 1:
+        raise ValueError(f"The panel protocol needs at least 4 agents, got {config.num_agents}")
+    critics = []
+    for i in range(num_critics):
+        role, lens = CRITIC_LENSES[i] if i < len(CRITIC_LENSES) else (f"Critic {i + 1}", None)
+        critics.append(RoleStep(role, "critique", ("Researcher",), lens))
+    inputs = ("Researcher", *(c.role for c in critics))
+    return (RoleStep("Researcher", "research"), *critics, _closing_step(config, inputs))
+
+
+def parallel_critique_protocol(config: DebateConfig) -> tuple[RoleStep, ...]:
+    """Researcher -> Critic || Devil's Advocate (or a second critic) -> Synthesizer.
+
+    With include_devil_advocate the Devil's Advocate is the second critic
+    instead of replacing the Synthesizer, so both critiques are merged.
+    """
+    if config.include_devil_advocate:
+        second = RoleStep("Devil's Advocate", "devil_advocate", ("Researcher",))
+    else:
+        role, lens = CRITIC_LENSES[0]
+        second = RoleStep(role, "critique", ("Researcher",), lens)
+    return (
+        RoleStep("Researcher", "research"),
+        RoleStep("Critic", "critique", ("Researcher",)),
+        second,
+        RoleStep("Synthesizer", "synthesis", ("Researcher", "Critic", second.role)),
+    )
+
+
+TEAM_STANCES = {
+    "pro": "Argue that the answer to '{topic}' is yes",
+    "con": "Argue that the answer to '{topic}' is no",
+}
+
+
+def teams_protocol(config: DebateConfig) -> tuple[RoleStep, ...]:
+    """Pro and con teams, each Researcher -> Critic -> Synthesizer, running side by side."""
+    steps = []
+    for team, stance in TEAM_STANCES.items():
+        name = team.title()
+        stance = stance.format(topic=config.topic)
+        steps += [
+            RoleStep(f"{name} Researcher", "research", (), stance, team),
+            RoleStep(f"{name} Critic", "critique", (f"{name} Researcher",),
+                     f"what the opposing team will attack in the {team} case", team),
+            RoleStep(f"{name} Synthesizer", "synthesis", (f"{name} Researcher", f"{name} Critic"), stance, team),
+        ]
+    return tuple(steps)
+
+
+PROTOCOLS: dict[str, Callable[[DebateConfig], tuple[RoleStep, ...]]] = {
+    "solo": solo_protocol,
+    "chain": chain_protocol,
+    "panel": panel_protocol,
+    "parallel_critique": parallel_critique_protocol,
+    "teams": teams_protocol,
+}
+
+
+def default_protocol(num_agents: int) -> str:
+    if num_agents == 2:
+        return "solo"
+    if num_agents in (3, 4):
+        return "chain"
+    return "panel"
+
+
+def round_graph(config: DebateConfig) -> RoundGraph:
+    """The round protocol for a config: its roster, named protocol, or the default for num_agents.
+
+    num_agents always counts the Judge, which runs once after the last round.
+    """
+    if config.roster:
+        graph = RoundGraph("custom", tuple(RoleStep.from_dict(step) for step in config.roster))
+    else:
+        name = config.protocol or default_protocol(config.num_agents)
+        if name not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {name!r}; expected one of {', '.join(PROTOCOLS)}")
+        graph = RoundGraph(name, PROTOCOLS[name](config))
+    if len(graph.steps) + 1 != config.num_agents:
+        raise ValueError(
+            f"Protocol {graph.name!r} uses {len(graph.steps) + 1} agents (including the Judge), "
+            f"but num_agents is {config.num_agents}"
+        )
+    return graph.validate()
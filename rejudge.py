@@ -0,0 +1,150 @@
+"""Re-judge stored debate transcripts without re-running the debates."""
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from config import DebateConfig, RUBRIC_CRITERIA
+from agents import create_judge
+from tasks import create_judge_task, create_team_judge_task
+from debate import published_rounds, run_task
+from analyze_results import extract_scores, extract_team_scores, extract_winner, result_scores
+from protocols import round_graph
+from results_store import list_results, load_results
+from transcript import Transcript
+
+
+def verdict_dir(filepath: Path) -> Path:
+    """Directory holding the versioned verdicts for a results file."""
+    return filepath.parent / f"{filepath.stem}.verdicts"
+
+
+def next_version(filepath: Path) -> int:
+    """Return the next free verdict version number for a results file."""
+    versions = [
+        int(p.stem[1:]) for p in verdict_dir(filepath).glob("v*.json")
+        if p.stem[1:].isdigit()
+    ]
+    return max(versions, default=0) + 1
+
+
+def rejudge_file(filepath: Path, rubric: Optional[dict[str, str]] = None,
+                 model_name: Optional[str] = None,
+                 temperature: Optional[float] = None) -> Dict[str, Any]:
+    """Re-run the Judge over one stored transcript and save a new verdict version."""
+    data = load_results(filepath)
+
+    rubric = rubric or RUBRIC_CRITERIA
+    config = DebateConfig.from_results(data["config"], verbose=False, save_results=False)
+    # Override the Judge's route, which takes precedence over the debate-wide model and temperature
+    if model_name is not None:
+        config.role_models = {**config.role_models, "Judge": model_name}
+    if temperature is not None:
+        config.role_temperatures = {**config.role_temperatures, "Judge": temperature}
+
+    judge = create_judge(config)
+    transcript = Transcript.from_results(data)
+    graph = round_graph(config)
+    teams = graph.teams if "teams" in data else []
+    if teams:
+        # Judge what the original Judge saw: the published rounds, not each team's drafts
+        all_outputs = published_rounds(transcript, graph)
+        judge_task = create_team_judge_task(judge, config, all_outputs, teams, rubric=rubric)
+    else:
+        judge_task = create_judge_task(judge, config, transcript.round_outputs(), rubric=rubric)
+    verdict = run_task(judge, judge_task)
+
+    out_dir = verdict_dir(filepath)
+    out_dir.mkdir(exist_ok=True)
+    version = next_version(filepath)
+    record = {
+        "source": filepath.name,
+        "version": version,
+        "judge_model": config.model_for("Judge"),
+        "temperature": config.temperature_for("Judge"),
+        "rubric": rubric,
+        "final_verdict": verdict,
+        "scores": extract_scores(verdict, rubric),
+        "original_scores": result_scores(data),
+        "timestamp": datetime.now().isoformat(),
+    }
+    if teams:
+        # Same shape as the original results: the winner's scores are the headline scores
+        team_scores = extract_team_scores(verdict, teams, rubric)
+        winner = extract_winner(verdict, teams)
+        record.update({
+            "winner": winner,
+            "team_scores": {team: team_scores.get(team, {}) for team in teams},
+            "scores": team_scores.get(winner if winner in teams else teams[0], {}),
+            "original_winner": data.get("winner"),
+        })
+    with open(out_dir / f"v{version:03d}.json", "w") as f:
+        json.dump(record, f, indent=2)
+
+    return record
+
+
+def rejudge_all(files: list[Path], rubric: Optional[dict[str, str]] = None,
+                model_name: Optional[str] = None, temperature: Optional[float] = None,
+                max_workers: int = 8) -> list[Dict[str, Any]]:
+    """Re-judge many results files concurrently."""
+    records = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(rejudge_file, fp, rubric, model_name, temperature): fp
+            for fp in files
+        }
+        for future in as_completed(futures):
+            filepath = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                print(f"✗ {filepath.name}: {str(e)[:100]}")
+                continue
+            records.append(record)
+            print(f"✓ {filepath.name} -> v{record['version']:03d} {record['scores']}")
+    return records
+
+
+def main():
+    """Re-judge every stored transcript in the results directory."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*", type=Path,
+                        help="Results files to re-judge (default: everything in results/)")
+    parser.add_argument("--rubric", type=Path,
+                        help="JSON file mapping criterion name to description")
+    parser.add_argument("--model", help="Judge model name (default: the debate's model)")
+    parser.add_argument("--temperature", type=float, help="Judge temperature")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent judge calls")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv("ANTHROPIC_API_KEY"):
+        raise ValueError(
+            "ANTHROPIC_API_KEY not found in environment. "
+            "Please create a .env file with your API key."
+        )
+
+    rubric = None
+    if args.rubric:
+        with open(args.rubric, "r") as f:
+            rubric = json.load(f)
+
+    files = args.files or sorted(list_results(Path("results")))
+    if not files:
+        print("No result files found in results/")
+        return
+
+    print(f"\nRe-judging {len(files)} result files with {args.workers} workers...\n")
+    records = rejudge_all(files, rubric, args.model, args.temperature, args.workers)
+    print(f"\n✓ Wrote {len(records)}/{len(files)} verdicts\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Compressed results files with a lazily decoded transcript section.
+
+A ``.debate`` file is a magic line, a one-line JSON header holding everything
+except the transcript (config, scores, verdict, timings), and a compressed
+JSON body holding the rounds. Readers that only need the header never
+decompress the body. Plain ``.json`` results files remain readable through
+the same functions.
+"""
+
+import argparse
+import gzip
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+
+MAGIC = b"DEBATE-RESULTS 1\n"
+SUFFIX = ".debate"
+RESULT_PATTERNS = ("*.json", f"*{SUFFIX}")
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("This results file is zstd-compressed; install 'zstandard' to read it.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def header_from_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything but the transcript, plus per-round durations."""
+    header = {k: v for k, v in results.items() if k != "rounds"}
+    header["round_durations"] = [r["duration"] for r in results.get("rounds", [])]
+    return header
+
+
+def write_results(results: Dict[str, Any], filepath: Path, codec: Optional[str] = None) -> Path:
+    """Write results as a header + compressed body file."""
+    codec = codec or default_codec()
+    header = {**header_from_results(results), "codec": codec}
+    body = json.dumps({"rounds": results.get("rounds", [])}, separators=(",", ":")).encode()
+    with open(filepath, "wb") as f:
+        f.write(MAGIC)
+        f.write(json.dumps(header, separators=(",", ":")).encode() + b"\n")
+        f.write(compress(body, codec))
+    return filepath
+
+
+class ResultsFile:
+    """A results file whose header is read eagerly and transcript on first access."""
+
+    def __init__(self, filepath: Path):
+        self.path = Path(filepath)
+        self._body = None
+        if self.path.suffix == SUFFIX:
+            with open(self.path, "rb") as f:
+                if f.readline() != MAGIC:
+                    raise ValueError(f"{self.path} is not a debate results file")
+                self.header = json.loads(f.readline())
+                self._offset = f.tell()
+        else:
+            # Legacy JSON: there is no separate header, so the whole file is parsed
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.header = header_from_results(data)
+            self._body = {"rounds": data.get("rounds", [])}
+
+    @property
+    def rounds(self) -> list:
+        """The transcript rounds, decompressed on first access."""
+        if self._body is None:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                self._body = json.loads(decompress(f.read(), self.header["codec"]))
+        return self._body["rounds"]
+
+    def load(self) -> Dict[str, Any]:
+        """The full results dict, in the same shape DebateOrchestrator returns."""
+        data = {k: v for k, v in self.header.items() if k not in ("codec", "round_durations")}
+        data["rounds"] = self.rounds
+        return data
+
+
+def read_header(filepath: Path) -> Dict[str, Any]:
+    """Config, verdict, scores and timings without decoding the transcript."""
+    return ResultsFile(filepath).header
+
+
+def load_results(filepath: Path) -> Dict[str, Any]:
+    """Load a full results dict from a .debate or legacy .json file."""
+    return ResultsFile(filepath).load()
+
+
+def list_results(results_dir: Path) -> list[Path]:
+    """All results files in a directory, in either format."""
+    files = []
+    for pattern in RESULT_PATTERNS:
+        files.extend(results_dir.glob(pattern))
+    return files
+
+
+def compact(results_dir: Path, codec: Optional[str] = None, delete: bool = False) -> None:
+    """Convert legacy .json results in a directory to compressed .debate files."""
+    before = after = 0
+    for filepath in sorted(results_dir.glob("*.json")):
+        with open(filepath, "r") as f:
+            data = json.load(f)
+        target = write_results(data, filepath.with_suffix(SUFFIX), codec)
+        before += filepath.stat().st_size
+        after += target.stat().st_size
+        if delete:
+            filepath.unlink()
+        print(f"✓ {filepath.name} -> {target.name}")
+    if before:
+        print(f"\n{before / 1024:.1f} KB -> {after / 1024:.1f} KB ({before / after:.1f}x smaller)")
+
+
+def main():
+    """Convert a results directory to the compressed format."""
+    parser = argparse.ArgumentParser(description="Compact JSON results into .debate files")
+    parser.add_argument("results_dir", nargs="?", type=Path, default=Path("results"))
+    parser.add_argument("--codec", choices=["zstd", "gzip"], help="Default: zstd if installed, else gzip")
+    parser.add_argument("--delete", action="store_true", help="Remove the original .json files")
+    args = parser.parse_args()
+    compact(args.results_dir, args.codec, args.delete)
+
+
+if __name__ == "__main__":
+    main()
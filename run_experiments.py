@@ -1,130 +1,311 @@
 """Run multiple debate experiments with different configurations."""
 
+import argparse
 import sys
+import tracemalloc
+from pathlib import Path
+from typing import Optional
+
+from analyze_results import result_scores
+from cascade import CascadePolicy, print_cascade_report
+from cassette import Cassette
 from config import DebateConfig
 from debate import run_debate
+from hedging import HedgePolicy, print_hedge_report
+from logs import configure_logging, parse_levels
+from metrics import QUEUE_DEPTH, start_exporters
+from probe import print_probe_report, run_probe
+from results_store import read_header
+from shards import (
+    SHARDS_DIR, ShardRun, cell_id, cell_key, launch_local, merge_shards, parse_shard, print_merge_report,
+    read_keys, sweep_cells, sweep_info,
+)
 
 
-def run_experiment_1():
-    """Experiment 1: 2 agents vs 4 agents (2 rounds each)."""
-    print("\n" + "="*100)
-    print("EXPERIMENT 1: 2 Agents vs 4 Agents")
-    print("="*100 + "\n")
+SPILL_DIR = Path("results") / "spill"
 
-    # Run with 2 agents
-    print("\n>>> Running with 2 agents...")
-    config_2 = DebateConfig(
-        num_agents=2,
-        num_rounds=2,
-        temperature=0.7,
-        verbose=True
-    )
-    results_2 = run_debate(config_2)
-
-    # Run with 4 agents
-    print("\n>>> Running with 4 agents...")
-    config_4 = DebateConfig(
-        num_agents=4,
-        num_rounds=2,
-        temperature=0.7,
-        verbose=True
-    )
-    results_4 = run_debate(config_4)
-
-    return {"2_agents": results_2, "4_agents": results_4}
-
-
-def run_experiment_2():
-    """Experiment 2: 1 round vs 3 rounds (4 agents each)."""
-    print("\n" + "="*100)
-    print("EXPERIMENT 2: 1 Round vs 3 Rounds")
-    print("="*100 + "\n")
 
-    # Run with 1 round
-    print("\n>>> Running with 1 round...")
-    config_1 = DebateConfig(
-        num_agents=4,
-        num_rounds=1,
-        temperature=0.7,
-        verbose=True
-    )
-    results_1 = run_debate(config_1)
-
-    # Run with 3 rounds
-    print("\n>>> Running with 3 rounds...")
-    config_3 = DebateConfig(
-        num_agents=4,
-        num_rounds=3,
-        temperature=0.7,
-        verbose=True
-    )
-    results_3 = run_debate(config_3)
-
-    return {"1_round": results_1, "3_rounds": results_3}
-
-
-def run_experiment_3():
-    """Experiment 3: With vs without Devil's Advocate (4 agents, 2 rounds)."""
-    print("\n" + "="*100)
-    print("EXPERIMENT 3: Synthesizer vs Devil's Advocate")
-    print("="*100 + "\n")
+# Experiment definitions: number -> (title, {label: DebateConfig overrides})
+EXPERIMENTS = {
+    1: ("2 Agents vs 4 Agents", {
+        "2_agents": dict(num_agents=2, num_rounds=2, temperature=0.7),
+        "4_agents": dict(num_agents=4, num_rounds=2, temperature=0.7),
+    }),
+    2: ("1 Round vs 3 Rounds", {
+        "1_round": dict(num_agents=4, num_rounds=1, temperature=0.7),
+        "3_rounds": dict(num_agents=4, num_rounds=3, temperature=0.7),
+    }),
+    3: ("Synthesizer vs Devil's Advocate", {
+        "synthesizer": dict(num_agents=4, num_rounds=2, temperature=0.7, include_devil_advocate=False),
+        "devil_advocate": dict(num_agents=4, num_rounds=2, temperature=0.7, include_devil_advocate=True),
+    }),
+    4: ("Low Temperature (0.3) vs High Temperature (0.9)", {
+        "low_temp": dict(num_agents=4, num_rounds=2, temperature=0.3),
+        "high_temp": dict(num_agents=4, num_rounds=2, temperature=0.9),
+    }),
+    5: ("Critique Chain vs Parallel Critiques", {
+        "chain": dict(num_agents=4, num_rounds=2, temperature=0.7),
+        "parallel_critique": dict(num_agents=5, num_rounds=2, temperature=0.7,
+                                  protocol="parallel_critique", include_devil_advocate=True),
+    }),
+}
+
+
+def experiment_configs(num: int, **overrides) -> dict[str, DebateConfig]:
+    """Build the labelled configs for one experiment."""
+    _, variants = EXPERIMENTS[num]
+    return {
+        label: DebateConfig(**{**params, "verbose": True, **overrides})
+        for label, params in variants.items()
+    }
+
+
+def summarize(results: dict) -> dict:
+    """Lightweight handle for a finished debate whose full results are on disk."""
+    scores = result_scores(results)
+    # Full results carry rounds; a results-file header only round_durations
+    rounds = [r["duration"] for r in results.get("rounds", [])] or results.get("round_durations", [])
+    return {
+        "results_file": results.get("results_file"),
+        "scores": scores,
+        "average_score": round(sum(scores.values()) / len(scores), 2) if scores else 0,
+        "total_duration": round(results["total_duration"], 2),
+        "mean_round_duration": round(sum(rounds) / len(rounds), 2) if rounds else 0,
+    }
 
-    # Run without Devil's Advocate
-    print("\n>>> Running with Synthesizer (no Devil's Advocate)...")
-    config_no_da = DebateConfig(
-        num_agents=4,
-        num_rounds=2,
-        temperature=0.7,
-        include_devil_advocate=False,
-        verbose=True
-    )
-    results_no_da = run_debate(config_no_da)
-
-    # Run with Devil's Advocate
-    print("\n>>> Running with Devil's Advocate...")
-    config_da = DebateConfig(
-        num_agents=4,
-        num_rounds=2,
-        temperature=0.7,
-        include_devil_advocate=True,
-        verbose=True
-    )
-    results_da = run_debate(config_da)
-
-    return {"synthesizer": results_no_da, "devil_advocate": results_da}
-
-
-def run_experiment_4():
-    """Experiment 4: Low temperature vs High temperature (4 agents, 2 rounds)."""
+
+def print_comparison(title: str, results: dict) -> None:
+    """Latency and scores of each variant of an experiment, side by side."""
+    print(f"\n{'='*80}")
+    print(f"COMPARISON: {title}")
+    print(f"{'='*80}")
+    print(f"  {'Variant':<22} {'Round (s)':>10} {'Total (s)':>10} {'Avg score':>10}  Scores")
+    for key, result in results.items():
+        summary = result if "mean_round_duration" in result else summarize(result)
+        scores = ", ".join(f"{k} {v}" for k, v in summary["scores"].items()) or "n/a"
+        print(f"  {key:<22} {summary['mean_round_duration']:>10} {summary['total_duration']:>10} "
+              f"{summary['average_score']:>10}  {scores}")
+    print(f"{'='*80}\n")
+
+
+class MemoryTracker:
+    """tracemalloc-based current/peak memory sampling between debates."""
+
+    def __init__(self):
+        self.samples = []
+        tracemalloc.start()
+
+    def sample(self, label: str) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self.samples.append((label, current, peak))
+        print(f"[memory] {label}: current {current / 2**20:.1f} MB, peak {peak / 2**20:.1f} MB")
+
+    def report(self) -> None:
+        tracemalloc.stop()
+        if not self.samples:
+            return
+        first, last = self.samples[0], self.samples[-1]
+        print(f"\nMemory over {len(self.samples)} debates: "
+              f"current {first[1] / 2**20:.1f} MB -> {last[1] / 2**20:.1f} MB, "
+              f"max peak {max(s[2] for s in self.samples) / 2**20:.1f} MB")
+
+
+def run_experiment(num: int, hedger: Optional[HedgePolicy] = None,
+                   cassette: Optional[Cassette] = None, repeats: int = 1,
+                   stream: bool = False, memory: Optional[MemoryTracker] = None,
+                   structured_logs: bool = False, config_overrides: Optional[dict] = None,
+                   cascade: Optional[CascadePolicy] = None, shard: Optional[ShardRun] = None) -> dict:
+    """Run every configuration of one experiment sequentially.
+
+    In streaming mode each debate's full results are left on disk and only a
+    summary handle is kept, and finished rounds are spilled to disk mid-debate.
+    With structured_logs, debates log JSON events instead of printing banners.
+    config_overrides sets further DebateConfig fields (budgets, model routing).
+    With a shard, only the shard's cells run, and cells it already finished
+    (in an earlier run, or as an identical variant of another experiment)
+    are summarized from disk instead of re-run.
+    """
+    title, _ = EXPERIMENTS[num]
     print("\n" + "="*100)
-    print("EXPERIMENT 4: Low Temperature (0.3) vs High Temperature (0.9)")
+    print(f"EXPERIMENT {num}: {title}")
     print("="*100 + "\n")
 
-    # Run with low temperature
-    print("\n>>> Running with low temperature (0.3)...")
-    config_low = DebateConfig(
-        num_agents=4,
-        num_rounds=2,
-        temperature=0.3,
-        verbose=True
-    )
-    results_low = run_debate(config_low)
-
-    # Run with high temperature
-    print("\n>>> Running with high temperature (0.9)...")
-    config_high = DebateConfig(
-        num_agents=4,
-        num_rounds=2,
-        temperature=0.9,
-        verbose=True
-    )
-    results_high = run_debate(config_high)
-
-    return {"low_temp": results_low, "high_temp": results_high}
+    config_overrides = config_overrides or {}
+    spill_dir = Path(config_overrides["results_dir"]) / "spill" if "results_dir" in config_overrides else SPILL_DIR
+    overrides = {"spill_dir": str(spill_dir)} if stream else {}
+    if structured_logs:
+        overrides["log_mode"] = "structured"
+    overrides.update(config_overrides)
+    results = {}
+    for label, config in experiment_configs(num, **overrides).items():
+        for repeat in range(repeats):
+            key = label if repeats == 1 else f"{label}#{repeat + 1}"
+            cell = cell_id(config, repeat + 1) if shard is not None else None
+            if cell is not None and not shard.owns(cell):
+                continue
+            finished = shard.finished(cell) if cell is not None else None
+            if finished is not None:
+                print(f"\n>>> {key} already finished in this shard: {finished}")
+                shard.record(cell, cell_key(num, label, repeat + 1), finished)
+                results[key] = {**summarize(read_header(finished)), "results_file": str(finished)}
+                continue
+            print(f"\n>>> Running {key}...")
+            QUEUE_DEPTH.dec()
+            debate_results = run_debate(config, hedger=hedger, cassette=cassette, cascade=cascade)
+            if cell is not None:
+                shard.record(cell, cell_key(num, label, repeat + 1), Path(debate_results["results_file"]))
+            results[key] = summarize(debate_results) if stream else debate_results
+            del debate_results
+            if memory is not None:
+                memory.sample(f"experiment_{num}/{key}")
+
+    if results:
+        print_comparison(title, results)
+    return results
+
+
+# Options of the local shard launcher that are not passed on to the shard processes, with
+# the number of values each takes (None: every value up to the next option)
+LAUNCHER_OPTIONS = {"--shards": 1, "--output-dir": 1, "--api-keys-file": 1, "--probe": None,
+                    "--probe-min-quality": 1}
+# Per-process resources that every shard process gets its own one of
+PER_SHARD_OPTIONS = ("--metrics-port", "--metrics-file", "--log-dir")
+
+
+def per_shard_value(option: str, value: str, index: int) -> str:
+    """A per-process resource made unique to one shard."""
+    if option == "--metrics-port":
+        return str(int(value) + index)
+    if option == "--metrics-file":
+        path = Path(value)
+        return str(path.with_name(f"{path.stem}.shard{index}{path.suffix}"))
+    return str(Path(value) / f"shard_{index}")  # --log-dir
+
+
+def shard_process_args(argv: list[str], index: int, model: Optional[str] = None) -> list[str]:
+    """The command line for shard index: this one minus the launcher's own options.
+
+    Each shard gets its own metrics port (PORT + index), metrics file and log
+    directory, and model is the one the launcher's probe chose.
+    """
+    args, rest = [], list(argv)
+    while rest:
+        arg = rest.pop(0)
+        option, inline, value = arg.partition("=")
+        if option in LAUNCHER_OPTIONS:
+            if not inline:
+                count = LAUNCHER_OPTIONS[option]
+                if count is None:
+                    while rest and not rest[0].startswith("-"):
+                        rest.pop(0)
+                else:
+                    del rest[:count]
+        elif option in PER_SHARD_OPTIONS:
+            args += [option, per_shard_value(option, value if inline else rest.pop(0), index)]
+        else:
+            args.append(arg)
+    if model is not None:
+        args += ["--model", model]
+    return args
+
+
+def run_sharded(args: argparse.Namespace) -> None:
+    """Probe once, run every shard as a local process, then merge their outputs."""
+    if args.record:
+        raise SystemExit("--record writes one cassette; record each shard separately with --shard I/N")
+    if args.evidence_store:
+        # A shared store makes each cell's prompts depend on which debates finished before it
+        raise SystemExit("--evidence-store can't be shared by --shards processes; run the sweep unsharded "
+                         "to reuse evidence across it")
+    model = None
+    if args.probe is not None:
+        probe = run_probe(args.probe, min_quality=args.probe_min_quality, base_url=args.api_base_url)
+        print_probe_report(probe)
+        if probe["selected"] is None:
+            raise SystemExit("No probed model is available at the quality floor; not starting the sweep")
+        model = probe["selected"]
+    shard_dirs = launch_local(args.shards, lambda index: shard_process_args(sys.argv[1:], index, model),
+                              SHARDS_DIR, read_keys(args.api_keys_file))
+    report = merge_shards(shard_dirs, args.output_dir or Path("results"))
+    print_merge_report(report)
+    if not report["complete"]:
+        raise SystemExit("Some cells did not finish; re-run the same command to resume the failed shards")
+
+
+def parse_role_model(spec: str) -> tuple[str, str]:
+    role, _, model = spec.partition("=")
+    if not role or not model:
+        raise argparse.ArgumentTypeError(f"expected ROLE=MODEL, got {spec!r}")
+    return role, model
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse experiment numbers and sweep options."""
+    parser = argparse.ArgumentParser(description="Run multi-agent debate experiments")
+    parser.add_argument("experiments", nargs="*", type=int, help="Experiment numbers to run")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Hedge agent calls slower than each role's p95 latency")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", type=Path, metavar="CASSETTE",
+                                help="Record every agent call into a cassette file")
+    cassette_group.add_argument("--replay", type=Path, metavar="CASSETTE",
+                                help="Serve agent calls from a cassette file")
+    parser.add_argument("--strict", action="store_true",
+                        help="With --replay, fail on any prompt missing from the cassette")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="Run each configuration this many times")
+    parser.add_argument("--stream", action="store_true",
+                        help="Keep only summary handles in memory and spill finished rounds to disk")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report tracemalloc current/peak memory after every debate")
+    parser.add_argument("--structured-logs", action="store_true",
+                        help="Log JSON events (per-debate files + compact console) instead of verbose output")
+    parser.add_argument("--log-dir", type=Path, help="Structured log directory (default results/logs)")
+    parser.add_argument("--log-level", action="append", default=[], metavar="COMPONENT=LEVEL",
+                        help="Per-component level, e.g. agent=DEBUG to log full agent outputs")
+    parser.add_argument("--metrics-port", type=int,
+                        help="Serve live Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-file", type=Path,
+                        help="Append a JSON metrics snapshot to this file periodically")
+    parser.add_argument("--metrics-interval", type=float, default=30.0,
+                        help="Seconds between metrics snapshots")
+    parser.add_argument("--max-wall-clock", type=float, metavar="SECONDS",
+                        help="Per-debate wall-clock budget")
+    parser.add_argument("--max-tokens", type=int, help="Per-debate token budget")
+    parser.add_argument("--max-cost", type=float, metavar="USD", help="Per-debate estimated cost budget")
+    parser.add_argument("--role-model", action="append", default=[], type=parse_role_model, metavar="ROLE=MODEL",
+                        help="Route a role to its own model, e.g. Researcher=claude-3-haiku-20240307")
+    parser.add_argument("--cascade", metavar="MODEL",
+                        help="Escalate outputs that fail a quick check to this model")
+    parser.add_argument("--model", help="Run every debate on this model (default the DebateConfig default)")
+    parser.add_argument("--probe", nargs="*", metavar="MODEL",
+                        help="Probe these models (default: all priced models) first and run the sweep "
+                             "on the fastest available one")
+    parser.add_argument("--probe-min-quality", type=float, default=1.0,
+                        help="Quality floor for --probe model selection")
+    parser.add_argument("--evidence-store", type=Path, metavar="DB",
+                        help="Share research evidence across debates through this SQLite store")
+    parser.add_argument("--api-base-url", metavar="URL",
+                        help="Messages API endpoint for every agent, e.g. a local mock_api.py server")
+    shard_group = parser.add_mutually_exclusive_group()
+    shard_group.add_argument("--shard", type=parse_shard, metavar="I/N",
+                             help="Run only shard I of N of the sweep (cells are assigned by config hash)")
+    shard_group.add_argument("--shards", type=int, metavar="N",
+                             help="Run the sweep as N local shard processes and merge their results")
+    parser.add_argument("--output-dir", type=Path,
+                        help="Results directory (default results/; results/shards/shard_I with --shard)")
+    parser.add_argument("--api-keys-file", type=Path,
+                        help="API keys, one per line, handed to --shards processes round-robin")
+    return parser.parse_args()
 
 
 def main():
     """Run selected experiments."""
+    args = parse_args()
+    if args.shards:
+        run_sharded(args)
+        return
     print("\n" + "="*100)
     print("MULTI-AGENT DEBATE - EXPERIMENT RUNNER")
     print("="*100)
@@ -133,34 +314,95 @@ def main():
     print("2. 1 round vs 3 rounds")
     print("3. Synthesizer vs Devil's Advocate")
     print("4. Low temperature (0.3) vs High temperature (0.9)")
+    print("5. Critique chain vs parallel critiques")
     print("\nYou need to run 2 experiments for the assignment.")
     print("="*100 + "\n")
 
-    if len(sys.argv) > 1:
+    # One policy for the whole sweep so latency percentiles warm up across debates
+    hedger = HedgePolicy() if args.hedge else None
+    cassette = None
+    if args.record:
+        cassette = Cassette(args.record, mode="record")
+    elif args.replay:
+        cassette = Cassette(args.replay, mode="strict" if args.strict else "replay")
+
+    if args.experiments:
         # Run specific experiments from command line
-        experiment_nums = [int(x) for x in sys.argv[1:]]
+        experiment_nums = args.experiments
     else:
         # Default: run experiments 1 and 2
         print("Running default experiments: #1 (agents) and #2 (rounds)")
         experiment_nums = [1, 2]
 
+    output_dir = args.output_dir
+    if args.shard is not None and output_dir is None:
+        output_dir = SHARDS_DIR / f"shard_{args.shard[0]}"
+    memory = MemoryTracker() if args.trace_memory else None
+    if args.structured_logs:
+        log_dir = args.log_dir or (output_dir / "logs" if output_dir is not None else None)
+        log_dir = configure_logging(log_dir, parse_levels(args.log_level))
+        print(f"Structured logs: {log_dir}/")
+
+    config_overrides = {
+        name: value for name, value in
+        (("max_wall_clock", args.max_wall_clock), ("max_tokens", args.max_tokens), ("max_cost", args.max_cost),
+         ("cascade_model", args.cascade),
+         ("evidence_store", str(args.evidence_store) if args.evidence_store else None),
+         ("api_base_url", args.api_base_url))
+        if value is not None
+    }
+    if args.model:
+        config_overrides["model_name"] = args.model
+    if args.role_model:
+        config_overrides["role_models"] = dict(args.role_model)
+    if args.probe is not None:
+        probe = run_probe(args.probe, min_quality=args.probe_min_quality, base_url=args.api_base_url)
+        print_probe_report(probe)
+        if probe["selected"] is None:
+            raise SystemExit("No probed model is available at the quality floor; not starting the sweep")
+        config_overrides["model_name"] = probe["selected"]
+    if output_dir is not None:
+        config_overrides["results_dir"] = str(output_dir)
+    shard = None
+    if args.shard is not None:
+        cells = sweep_cells(experiment_nums, args.repeats, **config_overrides)
+        shard = ShardRun(*args.shard, output_dir, sweep_info(cells, experiment_nums, args.repeats, args.shard[1]))
+        owned = [c for c in cells if shard.owns(c.id)]
+        print(f"Shard {args.shard[0]}/{args.shard[1]}: {len(owned)} of {len(cells)} cells "
+              f"({sum(shard.finished(c.id) is not None for c in owned)} already finished) -> {output_dir}/")
+        QUEUE_DEPTH.set(sum(shard.finished(c.id) is None for c in owned))
+    else:
+        QUEUE_DEPTH.set(sum(len(EXPERIMENTS[num][1]) * args.repeats for num in experiment_nums if num in EXPERIMENTS))
+    exporters = start_exporters(args.metrics_port, args.metrics_file, args.metrics_interval)
+    # One policy for the whole sweep so escalation rates cover every debate
+    cascade = CascadePolicy.from_config(DebateConfig(**config_overrides)) if args.cascade else None
+
     results = {}
     for num in experiment_nums:
-        if num == 1:
-            results["experiment_1"] = run_experiment_1()
-        elif num == 2:
-            results["experiment_2"] = run_experiment_2()
-        elif num == 3:
-            results["experiment_3"] = run_experiment_3()
-        elif num == 4:
-            results["experiment_4"] = run_experiment_4()
+        if num in EXPERIMENTS:
+            results[f"experiment_{num}"] = run_experiment(
+                num, hedger, cassette, repeats=args.repeats, stream=args.stream, memory=memory,
+                structured_logs=args.structured_logs, config_overrides=config_overrides, cascade=cascade,
+                shard=shard,
+            )
         else:
             print(f"Unknown experiment number: {num}")
 
+    for exporter in exporters:
+        exporter.stop()
+
     print("\n" + "="*100)
     print("ALL EXPERIMENTS COMPLETED")
     print("="*100)
-    print(f"\nResults saved in the 'results/' directory")
+    if hedger is not None:
+        print_hedge_report(hedger.report())
+    if cascade is not None:
+        print_cascade_report(cascade.report())
+    if memory is not None:
+        memory.report()
+    if cassette is not None:
+        print(f"\nCassette {cassette.path} ({cassette.mode}): {cassette.hits} hits, {cassette.misses} misses")
+    print(f"\nResults saved in the '{output_dir or 'results'}/' directory")
     print("Check the JSON files for detailed outputs and timing information.")
     print("="*100 + "\n")
 
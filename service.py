@@ -0,0 +1,555 @@
+"""Long-running local debate service with a persistent job queue.
+
+Debate jobs (DebateConfig payloads) are stored in SQLite and executed by a
+pool of warm worker threads: crewai is imported and .env loaded once, and each
+worker keeps the agents (and their LLM clients) of recently used agent
+configurations, so a job's startup cost is little more than a queue claim.
+Queued jobs survive a restart; jobs that were running when the service
+stopped are queued again on startup.
+
+HTTP API, over TCP or a Unix socket:
+
+    POST   /jobs              submit a DebateConfig payload
+    GET    /jobs              list jobs (optionally ?status=queued)
+    GET    /jobs/<id>         job status
+    GET    /jobs/<id>/result  full results of a finished job
+    DELETE /jobs/<id>         cancel a queued or running job
+    GET    /health            worker count and queue depth
+    GET    /metrics           Prometheus metrics (see metrics.py)
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, fields, replace
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+from urllib.parse import parse_qs, urlsplit
+
+from crewai import Agent, Task
+from dotenv import load_dotenv
+
+from config import DebateConfig
+from agents import get_debate_agents
+from debate import DebateOrchestrator, drive_steps
+from logs import configure_logging, parse_levels
+from metrics import CONTENT_TYPE, DEBATES, DEBATES_IN_FLIGHT, QUEUE_DEPTH, REGISTRY, SnapshotWriter
+from protocols import round_graph
+from results_store import load_results
+from tasks import TaskCall
+
+
+DB_PATH = Path("results") / "jobs.db"
+DEFAULT_PORT = 8780
+POLL_INTERVAL = 1.0  # seconds between queue checks when idle
+MAX_WARM_CONFIGS = 8  # agent sets kept per worker
+
+log = logging.getLogger("debate.service")
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    config TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    results_file TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at);
+"""
+
+# Config fields that change the agents themselves (and so the warm-agent cache key)
+AGENT_FIELDS = ("topic", "num_agents", "protocol", "roster", "model_name", "temperature", "api_base_url",
+                "role_models", "role_temperatures", "include_devil_advocate", "verbose")
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job is cancelled between agent steps."""
+
+
+class ServiceError(RuntimeError):
+    """An error response from the debate service."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+def parse_config(payload: dict) -> dict:
+    """Validate a DebateConfig payload and return it with every default filled in."""
+    names = {f.name for f in fields(DebateConfig)}
+    unknown = set(payload) - names
+    if unknown:
+        raise ValueError(f"Unknown DebateConfig fields: {', '.join(sorted(unknown))}")
+    config = DebateConfig(**payload)
+    round_graph(config)
+    return asdict(config)
+
+
+class JobQueue:
+    """SQLite-backed debate job queue, safe to share between threads and processes."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit: every statement below is atomic on its own
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job(row: Optional[sqlite3.Row]) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["config"] = json.loads(job["config"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(self, config: dict) -> dict:
+        job_id = uuid.uuid4().hex[:12]
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, config, submitted_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(config), time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            return self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> list[dict]:
+        query, params = "SELECT * FROM jobs", ()
+        if status is not None:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY submitted_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def count(self, status: str) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def claim(self) -> Optional[dict]:
+        """Atomically move the oldest queued job to running and return it."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = "
+                "(SELECT id FROM jobs WHERE status = ? ORDER BY submitted_at LIMIT 1) RETURNING *",
+                (RUNNING, time.time(), QUEUED),
+            ).fetchone()
+        return self._job(row)
+
+    def finish(self, job_id: str, status: str, results_file: Optional[str] = None,
+               error: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, results_file = ?, error = ? WHERE id = ?",
+                (status, time.time(), results_file, error, job_id),
+            )
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel a queued job now, or flag a running one to stop at its next agent step."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            )
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+        return self.get(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def recover(self) -> int:
+        """Re-queue jobs left running by a previous service process; return how many."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND cancel_requested = 1",
+                (CANCELLED, time.time(), RUNNING),
+            )
+            return conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+            ).rowcount
+
+
+class Worker(threading.Thread):
+    """Runs queued jobs one at a time, keeping agents warm between jobs."""
+
+    def __init__(self, jobs: JobQueue, wakeups: queue.Queue, stopping: threading.Event,
+                 backend: Optional[TaskCall] = None, name: Optional[str] = None,
+                 overrides: Optional[dict] = None):
+        super().__init__(name=name, daemon=True)
+        self.jobs = jobs
+        self.wakeups = wakeups
+        self.stopping = stopping
+        self.backend = backend
+        self.overrides = overrides or {}
+        self.agents = {}
+
+    def _agents(self, config: DebateConfig) -> list[Agent]:
+        key = json.dumps([getattr(config, name) for name in AGENT_FIELDS], sort_keys=True)
+        if key not in self.agents:
+            if len(self.agents) >= MAX_WARM_CONFIGS:
+                self.agents.pop(next(iter(self.agents)))
+            self.agents[key] = get_debate_agents(config)
+        return self.agents[key]
+
+    def run(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                job = self.jobs.claim()
+            except Exception:
+                log.exception("claiming a job failed", extra={"worker": self.name})
+                self.stopping.wait(POLL_INTERVAL)
+                continue
+            if job is None:
+                try:
+                    self.wakeups.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    pass
+                continue
+            try:
+                self.execute(job)
+            except Exception as e:
+                # execute records its own failures; this only keeps the worker alive if that fails too
+                log.exception(f"job {job['id']} crashed the worker", extra={"job_id": job["id"], "worker": self.name})
+                with suppress(Exception):
+                    self.jobs.finish(job["id"], FAILED, error=f"{type(e).__name__}: {e}")
+
+    def execute(self, job: dict) -> None:
+        orchestrator = None
+        DEBATES_IN_FLIGHT.inc()
+        try:
+            # The service always saves results, since that is where /result reads them from
+            config = DebateConfig(**{**job["config"], **self.overrides, "save_results": True})
+            if config.log_mode == "structured":
+                # As the orchestrator does, so warm agents don't print crewai's verbose dumps
+                config = replace(config, verbose=False)
+            orchestrator = DebateOrchestrator(config, backend=self.backend, agents=self._agents(config))
+            log.info(f"job {job['id']} started", extra={"job_id": job["id"], "debate_id": orchestrator.debate_id,
+                                                          "event": "job_started", "worker": self.name})
+
+            def run(agent: Agent, task: Task) -> tuple[str, dict]:
+                if self.jobs.cancel_requested(job["id"]):
+                    raise JobCancelled(job["id"])
+                return orchestrator._run_task(agent, task)
+
+            results = drive_steps(orchestrator.debate_steps(), run)
+        except JobCancelled as e:
+            # Logs debate_finished, which also closes the debate's structured log file
+            orchestrator._fail(CANCELLED, e)
+            self.jobs.finish(job["id"], CANCELLED)
+            DEBATES.inc(status=CANCELLED)
+            status = CANCELLED
+        except Exception as e:
+            # Includes configs whose agents or orchestrator can't be built
+            if orchestrator is not None:
+                orchestrator._fail(FAILED, e)
+            self.jobs.finish(job["id"], FAILED, error=f"{type(e).__name__}: {e}")
+            DEBATES.inc(status=FAILED)
+            status = FAILED
+        else:
+            self.jobs.finish(job["id"], DONE, results_file=results["results_file"])
+            DEBATES.inc(status="completed")
+            status = DONE
+        finally:
+            DEBATES_IN_FLIGHT.dec()
+            if orchestrator is not None:
+                orchestrator.transcript.close()
+        log.info(f"job {job['id']} {status}", extra={"job_id": job["id"], "event": "job_finished", "status": status})
+
+
+class DebateService:
+    """The job queue, its worker pool and the HTTP front end."""
+
+    def __init__(self, jobs: JobQueue, workers: int = 4, backend: Optional[TaskCall] = None,
+                 overrides: Optional[dict] = None):
+        self.jobs = jobs
+        self.wakeups = queue.Queue()
+        self.stopping = threading.Event()
+        self.workers = [
+            Worker(jobs, self.wakeups, self.stopping, backend, name=f"debate-worker-{i}", overrides=overrides)
+            for i in range(workers)
+        ]
+
+    def start_workers(self) -> int:
+        """Recover interrupted jobs and start the workers; return the number recovered."""
+        recovered = self.jobs.recover()
+        for worker in self.workers:
+            worker.start()
+        return recovered
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+    def route(self, method: str, target: str, body: bytes) -> tuple[int, Any]:
+        """Handle one API request and return (status, JSON payload)."""
+        url = urlsplit(target)
+        parts = url.path.strip("/").split("/")
+
+        if parts == ["metrics"] and method == "GET":
+            QUEUE_DEPTH.set(self.jobs.count(QUEUED))
+            return 200, REGISTRY.render()
+        if parts == ["health"] and method == "GET":
+            return 200, {"status": "ok", "workers": len(self.workers),
+                         "queued": self.jobs.count(QUEUED), "running": self.jobs.count(RUNNING)}
+        if parts[0] != "jobs" or len(parts) > 3:
+            return 404, {"error": f"Not found: {url.path}"}
+
+        if len(parts) == 1:
+            if method == "POST":
+                job = self.jobs.submit(parse_config(json.loads(body or b"{}")))
+                self.wakeups.put(job["id"])
+                return 201, job
+            if method == "GET":
+                status = parse_qs(url.query).get("status", [None])[0]
+                return 200, self.jobs.list_jobs(status)
+            return 405, {"error": f"{method} not allowed on /jobs"}
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            return 404, {"error": f"No job {parts[1]}"}
+        if len(parts) == 2 and method == "GET":
+            return 200, job
+        if len(parts) == 2 and method == "DELETE":
+            return 200, self.jobs.cancel(job["id"])
+        if parts[2:] == ["result"] and method == "GET":
+            if job["status"] != DONE:
+                return 409, {"error": f"Job {job['id']} is {job['status']}", "job": job}
+            return 200, load_results(Path(job["results_file"]))
+        return 405, {"error": f"{method} not allowed on {url.path}"}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            # SQLite and results-file reads happen off the event loop
+            status, payload = await asyncio.to_thread(self.route, method, target, body)
+        except (ValueError, TypeError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        if isinstance(payload, str):
+            data, content_type = payload.encode(), CONTENT_TYPE
+        else:
+            data, content_type = json.dumps(payload).encode(), "application/json"
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"content-type: {content_type}\r\ncontent-length: {len(data)}\r\n"
+            f"connection: close\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                    socket_path: Optional[Path] = None) -> None:
+        if socket_path is not None:
+            Path(socket_path).unlink(missing_ok=True)
+            server = await asyncio.start_unix_server(self._handle, path=str(socket_path))
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: Union[str, Path], timeout: float = 30):
+        super().__init__("localhost", timeout=timeout)
+        self.path = str(path)
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """Submit and track debates on a running service."""
+
+    def __init__(self, url: str = f"http://127.0.0.1:{DEFAULT_PORT}",
+                 socket_path: Optional[Path] = None, timeout: float = 30):
+        self.url = urlsplit(url)
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[dict] = None) -> Any:
+        if self.socket_path is not None:
+            conn = UnixHTTPConnection(self.socket_path, self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+        try:
+            payload = json.dumps(body).encode() if body is not None else None
+            conn.request(method, path, body=payload, headers={"content-type": "application/json"})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"null")
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise ServiceError(response.status, data.get("error", "") if isinstance(data, dict) else str(data))
+        return data
+
+    def submit(self, config: Union[DebateConfig, dict]) -> dict:
+        payload = asdict(config) if isinstance(config, DebateConfig) else config
+        return self._request("POST", "/jobs", payload)
+
+    def status(self, job_id: str) -> dict:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def jobs(self, status: Optional[str] = None) -> list[dict]:
+        return self._request("GET", "/jobs" + (f"?status={status}" if status else ""))
+
+    def cancel(self, job_id: str) -> dict:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def result(self, job_id: str) -> dict:
+        return self._request("GET", f"/jobs/{job_id}/result")
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def wait(self, job_id: str, poll: float = 1.0, timeout: Optional[float] = None) -> dict:
+        """Block until a job finishes and return its final status."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.status(job_id)
+            if job["status"] in (DONE, FAILED, CANCELLED):
+                return job
+            if deadline is not None and time.time() >= deadline:
+                raise TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(poll)
+
+
+def print_job(job: dict) -> None:
+    config = job["config"]
+    line = (f"{job['id']}  {job['status']:<9}  {config['num_agents']} agents, "
+            f"{config['num_rounds']} rounds, temp {config['temperature']}")
+    if job["started_at"] and job["finished_at"]:
+        line += f"  ({job['finished_at'] - job['started_at']:.1f}s)"
+    if job["results_file"]:
+        line += f"  -> {job['results_file']}"
+    if job["error"]:
+        line += f"  [{job['error'][:80]}]"
+    print(line)
+
+
+def main():
+    """Run the debate service or talk to a running one."""
+    from run_experiments import experiment_configs
+
+    parser = argparse.ArgumentParser(description="Local debate service with a persistent job queue")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}", help="Service URL (clients)")
+    parser.add_argument("--socket", type=Path, help="Unix socket path (instead of TCP)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_p = sub.add_parser("serve", help="Run the service")
+    serve_p.add_argument("--host", default="127.0.0.1")
+    serve_p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_p.add_argument("--workers", type=int, default=4, help="Concurrent debates")
+    serve_p.add_argument("--db", type=Path, default=DB_PATH, help="SQLite job database")
+    serve_p.add_argument("--mock", action="store_true", help="Run debates on the mock backend")
+    serve_p.add_argument("--mock-latency", type=float, default=0.0)
+    serve_p.add_argument("--structured-logs", action="store_true",
+                         help="Run every job with JSON event logging instead of console banners")
+    serve_p.add_argument("--log-dir", type=Path)
+    serve_p.add_argument("--log-level", action="append", default=[], metavar="COMPONENT=LEVEL")
+    serve_p.add_argument("--metrics-file", type=Path, help="Append JSON metrics snapshots to this file")
+    serve_p.add_argument("--metrics-interval", type=float, default=30.0)
+
+    submit_p = sub.add_parser("submit", help="Queue the debates of one experiment")
+    submit_p.add_argument("experiment", type=int, nargs="?", default=1)
+    submit_p.add_argument("--wait", action="store_true", help="Wait for the jobs to finish")
+
+    status_p = sub.add_parser("status", help="Show one job, or recent jobs")
+    status_p.add_argument("job_id", nargs="?")
+    cancel_p = sub.add_parser("cancel", help="Cancel a job")
+    cancel_p.add_argument("job_id")
+    result_p = sub.add_parser("result", help="Print a finished job's verdict")
+    result_p.add_argument("job_id")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        load_dotenv()
+        backend = None
+        if args.mock:
+            from mock_llm import MockBackend
+            backend = MockBackend(latency=args.mock_latency)
+        overrides = {}
+        if args.structured_logs:
+            configure_logging(args.log_dir, parse_levels(args.log_level))
+            overrides["log_mode"] = "structured"
+            if args.log_dir:
+                overrides["log_dir"] = str(args.log_dir)
+        service = DebateService(JobQueue(args.db), args.workers, backend, overrides)
+        recovered = service.start_workers()
+        if args.metrics_file:
+            SnapshotWriter(args.metrics_file, args.metrics_interval).start()
+        where = args.socket or f"http://{args.host}:{args.port}"
+        print(f"Debate service listening on {where} with {args.workers} workers "
+              f"({recovered} interrupted jobs re-queued)")
+        try:
+            asyncio.run(service.serve(args.host, args.port, args.socket))
+        except KeyboardInterrupt:
+            service.stop()
+        return
+
+    client = ServiceClient(args.url, args.socket)
+    if args.command == "submit":
+        jobs = [client.submit(config) for config in experiment_configs(args.experiment).values()]
+        for job in jobs:
+            print_job(job)
+        if args.wait:
+            for job in jobs:
+                print_job(client.wait(job["id"]))
+    elif args.command == "status":
+        for job in ([client.status(args.job_id)] if args.job_id else client.jobs()):
+            print_job(job)
+    elif args.command == "cancel":
+        print_job(client.cancel(args.job_id))
+    elif args.command == "result":
+        results = client.result(args.job_id)
+        print(results["final_verdict"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Sharded sweeps: deterministic cell assignment, shard manifests and merge.
+
+A sweep is split into cells, one per (experiment variant, repeat). A cell's
+id is a hash of its DebateConfig and repeat number. Local-only settings are
+left out of the hash: output and log locations, the API endpoint and the
+evidence store path. Every shard therefore computes the same ids, and a
+cell belongs to shard ``int(id, 16) % num_shards``. Variants of different
+experiments with identical configs are the same cell and run once.
+
+Each shard runs independently (``run_experiments.py --shard I/N``) with its
+own API key and output directory. It records every finished cell in that
+directory's ``shard.manifest``, so an interrupted shard resumes where it
+stopped. ``merge_shards`` checks the manifests and rejects conflicts before
+writing anything, then copies the results files into one directory with a
+``sweep.manifest``. Conflicts are shards of different sweeps, a cell
+outside its shard, a cell with different results in two shards, and a results
+file that no longer matches its manifest.
+
+    python run_experiments.py 1 2 --repeats 5 --shards 4 --api-keys-file keys.txt
+    python shards.py plan 1 2 --repeats 5 --shards 4
+    python shards.py merge results/shards/shard_* --output results/merged
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional
+
+from config import DebateConfig
+
+
+SHARDS_DIR = Path("results") / "shards"
+SHARD_MANIFEST = "shard.manifest"  # JSON; not *.json, so results readers skip it
+SWEEP_MANIFEST = "sweep.manifest"
+
+# Settings that may differ between shards without changing what a cell runs
+LOCAL_FIELDS = ("verbose", "save_results", "results_dir", "spill_dir", "results_format", "log_mode", "log_dir",
+                "api_base_url", "evidence_store")
+
+
+class MergeConflict(ValueError):
+    """Shard outputs that cannot be merged into one results store."""
+
+    def __init__(self, conflicts: list[str]):
+        super().__init__(f"{len(conflicts)} merge conflict(s):\n  " + "\n  ".join(conflicts))
+        self.conflicts = conflicts
+
+
+class Cell(NamedTuple):
+    """One debate of a sweep and the experiment keys it answers."""
+    id: str
+    keys: tuple[str, ...]  # "experiment_<n>/<label>#<repeat>"
+    config: DebateConfig
+    repeat: int
+
+
+def cell_id(config: DebateConfig, repeat: int) -> str:
+    """Stable id of a (config, repeat) cell, the same on every machine."""
+    fields = {k: v for k, v in asdict(config).items() if k not in LOCAL_FIELDS}
+    payload = json.dumps({"config": fields, "repeat": repeat}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def shard_of(cell: str, num_shards: int) -> int:
+    return int(cell, 16) % num_shards
+
+
+def cell_key(num: int, label: str, repeat: int) -> str:
+    return f"experiment_{num}/{label}#{repeat}"
+
+
+def sweep_cells(experiment_nums: list[int], repeats: int = 1, **overrides) -> list[Cell]:
+    """Every distinct cell of a sweep, in run order."""
+    from run_experiments import EXPERIMENTS, experiment_configs
+
+    cells = {}
+    for num in experiment_nums:
+        if num not in EXPERIMENTS:
+            continue
+        for label, config in experiment_configs(num, **overrides).items():
+            for repeat in range(1, repeats + 1):
+                cid = cell_id(config, repeat)
+                key = cell_key(num, label, repeat)
+                if cid in cells:
+                    cells[cid] = cells[cid]._replace(keys=cells[cid].keys + (key,))
+                else:
+                    cells[cid] = Cell(cid, (key,), config, repeat)
+    return list(cells.values())
+
+
+def sweep_info(cells: list[Cell], experiment_nums: list[int], repeats: int, num_shards: int) -> dict:
+    """What every shard of one sweep agrees on; the fingerprint covers every cell id."""
+    return {
+        "fingerprint": hashlib.sha256("\n".join(sorted(c.id for c in cells)).encode()).hexdigest(),
+        "experiments": list(experiment_nums),
+        "repeats": repeats,
+        "num_shards": num_shards,
+        "cells": len(cells),
+    }
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """"I/N" -> (I, N) with 0 <= I < N."""
+    index, _, count = spec.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {spec!r}") from None
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{count - 1}, got {index}")
+    return index, count
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json(path: Path, data: dict) -> None:
+    """Replace a JSON file atomically, so a killed shard never leaves half a manifest."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class ShardRun:
+    """One shard's share of a sweep and its manifest of finished cells."""
+
+    def __init__(self, index: int, num_shards: int, output_dir: Path, sweep: dict):
+        self.index = index
+        self.num_shards = num_shards
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.output_dir / SHARD_MANIFEST
+        self.manifest = {"sweep": sweep, "shard": index, "cells": {}}
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                previous = json.load(f)
+            if previous["sweep"]["fingerprint"] != sweep["fingerprint"] or previous["shard"] != index:
+                raise ValueError(f"{self.output_dir} holds shard {previous['shard']} of a different sweep; "
+                                 f"use a fresh --output-dir")
+            self.manifest["cells"] = previous["cells"]
+        # Written up front so a shard with no cells, or one that fails early, can still be merged
+        write_json(self.path, self.manifest)
+
+    def owns(self, cell: str) -> bool:
+        return shard_of(cell, self.num_shards) == self.index
+
+    def finished(self, cell: str) -> Optional[Path]:
+        """The results file of a cell this shard already ran."""
+        entry = self.manifest["cells"].get(cell)
+        return self.output_dir / entry["results_file"] if entry else None
+
+    def record(self, cell: str, key: str, results_file: Path) -> None:
+        entry = self.manifest["cells"].setdefault(cell, {"keys": []})
+        if key not in entry["keys"]:
+            entry["keys"].append(key)
+        if "results_file" not in entry:
+            path = Path(results_file)
+            entry.update({"results_file": path.name, "sha256": file_sha256(path), "finished": time.time()})
+        write_json(self.path, self.manifest)
+
+
+def load_manifest(shard_dir: Path) -> dict:
+    path = Path(shard_dir) / SHARD_MANIFEST
+    if not path.exists():
+        raise FileNotFoundError(f"No {SHARD_MANIFEST} in {shard_dir}")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def merge_shards(shard_dirs: list[Path], output_dir: Path) -> dict:
+    """Combine shard outputs into one deduplicated results directory.
+
+    Everything is checked before anything is copied, so a rejected merge
+    leaves output_dir untouched. Merging the same shards again is a no-op.
+    """
+    manifests = [(Path(d), load_manifest(d)) for d in shard_dirs]
+    conflicts = []
+    sweeps = {m["sweep"]["fingerprint"]: m["sweep"] for _, m in manifests}
+    if len(sweeps) > 1:
+        raise MergeConflict([f"{d} belongs to sweep {m['sweep']['fingerprint'][:12]}" for d, m in manifests])
+    sweep = next(iter(sweeps.values()))
+
+    merged = {}
+    duplicates = 0
+    for shard_dir, manifest in manifests:
+        for cell, entry in manifest["cells"].items():
+            owner = shard_of(cell, sweep["num_shards"])
+            if owner != manifest["shard"]:
+                conflicts.append(f"cell {cell[:12]} ({entry['keys'][0]}) in shard {manifest['shard']} "
+                                 f"({shard_dir}) belongs to shard {owner}")
+                continue
+            source = shard_dir / entry["results_file"]
+            if not source.exists() or file_sha256(source) != entry["sha256"]:
+                conflicts.append(f"{source} is missing or no longer matches its manifest")
+                continue
+            previous = merged.get(cell)
+            if previous is None:
+                merged[cell] = {**entry, "keys": list(entry["keys"]), "shard": manifest["shard"], "source": source}
+            elif previous["sha256"] == entry["sha256"]:
+                # The same shard output passed twice (or copied); keep one
+                duplicates += 1
+                previous["keys"] = sorted(set(previous["keys"]) | set(entry["keys"]))
+            else:
+                conflicts.append(f"cell {cell[:12]} ({entry['keys'][0]}) has different results in "
+                                 f"{previous['source'].parent} and {shard_dir}")
+    if conflicts:
+        raise MergeConflict(conflicts)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    cells = {}
+    for cell, entry in merged.items():
+        source = entry.pop("source")
+        target = output_dir / source.name
+        if target.exists() and file_sha256(target) != entry["sha256"]:
+            # Results names are per machine; two shards can pick the same one
+            target = output_dir / f"{source.stem}_shard{entry['shard']}{source.suffix}"
+        if not target.exists():
+            shutil.copy2(source, target)
+            copied += 1
+        cells[cell] = {**entry, "results_file": target.name}
+    report = {
+        "sweep": sweep,
+        "shards": sorted({m["shard"] for _, m in manifests}),
+        "cells": cells,
+        "complete": len(cells) == sweep["cells"],
+        "missing": sweep["cells"] - len(cells),
+        "duplicates": duplicates,
+        "copied": copied,
+    }
+    write_json(output_dir / SWEEP_MANIFEST, report)
+    return report
+
+
+def read_keys(path: Optional[Path]) -> list[str]:
+    """API keys, one per line (blank lines and # comments skipped)."""
+    if path is None:
+        return []
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def launch_local(num_shards: int, args: Callable[[int], list[str]], base_dir: Path = SHARDS_DIR,
+                 api_keys: Optional[list[str]] = None) -> list[Path]:
+    """Run every shard as its own run_experiments.py process and wait for all of them.
+
+    args(i) is shard i's command line. Shards share nothing: each gets its
+    own output directory (shard_<i>), log file and, round-robin, API key.
+    Returns the shard directories.
+    """
+    script = Path(__file__).with_name("run_experiments.py")
+    shard_dirs, processes = [], []
+    for index in range(num_shards):
+        shard_dir = Path(base_dir) / f"shard_{index}"
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        env = dict(os.environ)
+        if api_keys:
+            env["ANTHROPIC_API_KEY"] = api_keys[index % len(api_keys)]
+        log = open(shard_dir / "shard.log", "a")
+        processes.append((index, log, subprocess.Popen(
+            [sys.executable, str(script), *args(index), "--shard", f"{index}/{num_shards}", "--output-dir", str(shard_dir)],
+            env=env, stdout=log, stderr=subprocess.STDOUT,
+        )))
+        shard_dirs.append(shard_dir)
+    failed = []
+    for index, log, process in processes:
+        if process.wait() != 0:
+            failed.append(index)
+        log.close()
+    for index in failed:
+        print(f"Shard {index} exited with an error; see {shard_dirs[index] / 'shard.log'}")
+    return shard_dirs
+
+
+def print_plan(cells: list[Cell], num_shards: int) -> None:
+    """How many cells each shard gets."""
+    counts = Counter(shard_of(c.id, num_shards) for c in cells)
+    print(f"{len(cells)} cells over {num_shards} shards")
+    for index in range(num_shards):
+        print(f"  shard {index}: {counts.get(index, 0)} cells")
+        for cell in cells:
+            if shard_of(cell.id, num_shards) == index:
+                print(f"    {cell.id[:12]}  {', '.join(cell.keys)}")
+
+
+def print_merge_report(report: dict) -> None:
+    status = "complete" if report["complete"] else f"{report['missing']} cells missing"
+    print(f"Merged {len(report['cells'])}/{report['sweep']['cells']} cells from shards "
+          f"{report['shards']} ({status}; {report['copied']} files copied, "
+          f"{report['duplicates']} duplicates dropped)")
+
+
+def main():
+    """Plan a sharded sweep or merge shard outputs."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    plan_p = sub.add_parser("plan", help="Show which shard runs each cell")
+    plan_p.add_argument("experiments", nargs="+", type=int)
+    plan_p.add_argument("--repeats", type=int, default=1)
+    plan_p.add_argument("--shards", type=int, required=True)
+    merge_p = sub.add_parser("merge", help="Merge shard output directories")
+    merge_p.add_argument("shard_dirs", nargs="+", type=Path)
+    merge_p.add_argument("--output", type=Path, default=Path("results"), help="Merged results directory")
+    args = parser.parse_args()
+
+    if args.command == "plan":
+        print_plan(sweep_cells(args.experiments, args.repeats), args.shards)
+        return
+    try:
+        report = merge_shards(args.shard_dirs, args.output)
+    except MergeConflict as e:
+        raise SystemExit(f"Merge rejected: {e}")
+    print_merge_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,32 @@
 """Task definitions for the debate workflow."""
 
+from typing import Callable, Optional
+
 from crewai import Task, Agent
 from config import DebateConfig, RUBRIC_CRITERIA
+from protocols import RoleStep
+
+
+# A callable that runs one agent task and returns (output text, token usage)
+TaskCall = Callable[[Agent, Task], tuple[str, dict]]
+
 
+def create_research_task(researcher: Agent, config: DebateConfig, round_num: int, previous_output: str = "",
+                         stance: Optional[str] = None, evidence: Optional[list[str]] = None) -> Task:
+    """Create research task for gathering and presenting arguments.
 
-def create_research_task(researcher: Agent, config: DebateConfig, round_num: int, previous_output: str = "") -> Task:
-    """Create research task for gathering and presenting arguments."""
+    evidence is a list of snippets retrieved from earlier debates; the
+    researcher is asked to build on them rather than re-derive them.
+    """
     context_str = f"\n\nPrevious round output:\n{previous_output}" if previous_output else ""
+    if evidence:
+        known = "\n".join(f"- {snippet}" for snippet in evidence)
+        context_str = (
+            "\n\nKnown evidence from earlier debates (cite what you use in a few words instead of "
+            f"re-deriving it, and spend the rest of your answer on new reasoning):\n{known}{context_str}"
+        )
+    if stance:
+        context_str = f"\n\nArgue from this position: {stance}{context_str}"
 
     return Task(
         description=f"""Research and present arguments on the topic: '{config.topic}'
@@ -25,12 +45,14 @@ def create_research_task(researcher: Agent, config: DebateConfig, round_num: int
     )
 
 
-def create_critique_task(critic: Agent, config: DebateConfig, round_num: int, research_output: str) -> Task:
+def create_critique_task(critic: Agent, config: DebateConfig, round_num: int, research_output: str,
+                         stance: Optional[str] = None) -> Task:
     """Create critique task for evaluating arguments."""
+    lens = f"\n\n        Critique it through the lens of {stance}." if stance else ""
     return Task(
         description=f"""Critically evaluate the following argument on '{config.topic}':
 
-        {research_output}
+        {research_output}{lens}
 
         Your task:
         1. Identify strengths in the argument
@@ -71,16 +93,15 @@ def create_synthesis_task(synthesizer: Agent, config: DebateConfig, round_num: i
 
 
 def create_devil_advocate_task(devil_advocate: Agent, config: DebateConfig, round_num: int,
-                               research_output: str, critique_output: str) -> Task:
+                               research_output: str, critique_output: Optional[str] = None) -> Task:
     """Create devil's advocate task for challenging consensus."""
+    # No critique section when it runs alongside the Critic rather than after it
+    critique = f"\n\n        CRITIQUE:\n        {critique_output}" if critique_output is not None else ""
     return Task(
         description=f"""Challenge the emerging consensus on '{config.topic}' based on:
 
         ORIGINAL ARGUMENT:
-        {research_output}
-
-        CRITIQUE:
-        {critique_output}
+        {research_output}{critique}
 
         Your task:
         1. Identify any groupthink or unchallenged assumptions
@@ -95,13 +116,46 @@ def create_devil_advocate_task(devil_advocate: Agent, config: DebateConfig, roun
     )
 
 
-def create_judge_task(judge: Agent, config: DebateConfig, all_outputs: list[str]) -> Task:
+def join_outputs(outputs: dict[str, str]) -> str:
+    """One output as-is, or several as role-headed sections."""
+    if len(outputs) == 1:
+        return next(iter(outputs.values()))
+    return "\n\n".join(f"{role.upper()}:\n{text}" for role, text in outputs.items())
+
+
+def create_step_task(agent: Agent, config: DebateConfig, round_num: int, step: RoleStep,
+                     previous_output: str, outputs: dict[str, str], kinds: dict[str, str],
+                     evidence: Optional[list[str]] = None) -> Task:
+    """Create the task for a round-graph step from the outputs of its inputs.
+
+    kinds maps each role in the round to its step kind, so a synthesis step can
+    tell the arguments it refines from the critiques of them. evidence only
+    applies to research steps.
+    """
+    if step.kind == "research":
+        return create_research_task(agent, config, round_num, previous_output, step.stance, evidence)
+    arguments = {r: outputs[r] for r in step.inputs if kinds[r] == "research"}
+    critiques = {r: outputs[r] for r in step.inputs if kinds[r] != "research"}
+    if step.kind == "critique":
+        # A critic reviewing other critiques sees them alongside the arguments
+        return create_critique_task(agent, config, round_num, join_outputs({**arguments, **critiques}), step.stance)
+    if step.kind == "devil_advocate" and not critiques:
+        return create_devil_advocate_task(agent, config, round_num, join_outputs(arguments))
+    factory = create_devil_advocate_task if step.kind == "devil_advocate" else create_synthesis_task
+    return factory(agent, config, round_num, join_outputs(arguments) if arguments else "(none)",
+                   join_outputs(critiques) if critiques else "(none)")
+
+
+def create_judge_task(judge: Agent, config: DebateConfig, all_outputs: list[str],
+                      rubric: Optional[dict[str, str]] = None) -> Task:
     """Create final judgment task for evaluating the debate."""
+    rubric = rubric or RUBRIC_CRITERIA
     debate_history = "\n\n=== DEBATE HISTORY ===\n\n".join(
         [f"Round {i+1}:\n{output}" for i, output in enumerate(all_outputs)]
     )
 
-    rubric_desc = "\n".join([f"- {k.title()}: {v}" for k, v in RUBRIC_CRITERIA.items()])
+    rubric_desc = "\n".join([f"- {k.title()}: {v}" for k, v in rubric.items()])
+    score_format = "\n".join([f"        - {k.title()}: X/5" for k in rubric])
 
     return Task(
         description=f"""Evaluate the complete debate on '{config.topic}' and issue your final verdict.
@@ -114,10 +168,7 @@ def create_judge_task(judge: Agent, config: DebateConfig, all_outputs: list[str]
 
         2. Provide your scores in this exact format:
         SCORES:
-        - Evidence: X/5
-        - Feasibility: X/5
-        - Risks: X/5
-        - Clarity: X/5
+{score_format}
 
         3. Determine the outcome:
            - Did the debate reach a clear conclusion?
@@ -132,3 +183,43 @@ def create_judge_task(judge: Agent, config: DebateConfig, all_outputs: list[str]
         agent=judge,
         expected_output="Rubric scores (0-5), final verdict or non-consensus statement, key excerpts, and overall assessment"
     )
+
+
+def create_team_judge_task(judge: Agent, config: DebateConfig, all_outputs: list[str], teams: list[str],
+                           rubric: Optional[dict[str, str]] = None) -> Task:
+    """Create a head-to-head judgment task for a team-vs-team debate."""
+    rubric = rubric or RUBRIC_CRITERIA
+    debate_history = "\n\n=== DEBATE HISTORY ===\n\n".join(
+        [f"Round {i+1}:\n{output}" for i, output in enumerate(all_outputs)]
+    )
+
+    rubric_desc = "\n".join([f"- {k.title()}: {v}" for k, v in rubric.items()])
+    score_format = "\n\n".join(
+        f"        {team.upper()} SCORES:\n" + "\n".join(f"        - {k.title()}: X/5" for k in rubric)
+        for team in teams
+    )
+    choices = " | ".join([team.upper() for team in teams] + ["TIE"])
+
+    return Task(
+        description=f"""Judge the head-to-head debate on '{config.topic}' between the {' and '.join(t.upper() for t in teams)} teams.
+
+        {debate_history}
+
+        Your task:
+        1. Score each team's final argument on each rubric criterion (0-5 scale):
+        {rubric_desc}
+
+        2. Provide your scores in this exact format:
+{score_format}
+
+        3. Declare the winner on a single line in this exact format:
+        WINNER: {choices}
+
+        4. Highlight the 1-2 exchanges that decided the outcome
+
+        5. Overall assessment: which rebuttals landed and which claims went unanswered
+
+        Be objective, specific, and provide clear reasoning for your scores.""",
+        agent=judge,
+        expected_output="Rubric scores (0-5) per team, the winner, deciding exchanges, and overall assessment"
+    )
@@ -0,0 +1,182 @@
+"""Structured debate transcript.
+
+Each agent output is stored once as a Message; prompt context, the judge's
+debate history and the legacy "RESEARCHER:\\n...\\n\\nCRITIC:\\n..." round
+strings are rendered from the messages only when needed.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+LEGACY_HEADER = re.compile(r"(?:^|\n\n)(RESEARCHER|CRITIC|SYNTHESIZER|DEVIL'S ADVOCATE):\n")
+LEGACY_ROLES = {
+    "RESEARCHER": "Researcher",
+    "CRITIC": "Critic",
+    "SYNTHESIZER": "Synthesizer",
+    "DEVIL'S ADVOCATE": "Devil's Advocate",
+}
+
+
+class Message:
+    """One agent output (round is None for the final judgment).
+
+    retry is the part of duration spent on attempts whose output was discarded
+    (an escalated cascade call, or a hedged call until its duplicate won).
+    """
+
+    __slots__ = ("round", "role", "text", "start", "duration", "prompt_tokens", "completion_tokens", "retry")
+
+    def __init__(self, round: Optional[int], role: str, text: str, start: float = 0.0,
+                 duration: float = 0.0, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 retry: float = 0.0):
+        self.round = round
+        self.role = role
+        self.text = text
+        self.start = start
+        self.duration = duration
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.retry = retry
+
+    def to_dict(self) -> dict:
+        data = {
+            "role": self.role,
+            "text": self.text,
+            "start": self.start,
+            "duration": self.duration,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+        if self.retry:
+            data["retry"] = self.retry
+        return data
+
+    @classmethod
+    def from_dict(cls, round: Optional[int], data: dict) -> "Message":
+        return cls(
+            round, data["role"], data["text"], data.get("start", 0.0), data.get("duration", 0.0),
+            data.get("prompt_tokens", 0), data.get("completion_tokens", 0), data.get("retry", 0.0),
+        )
+
+
+class Transcript:
+    """Ordered messages with O(1) lookup by (round, role).
+
+    With a spill_path, finished rounds can be moved to a JSON-lines file on
+    disk and are read back only when a later prompt or the results need them.
+    """
+
+    __slots__ = ("messages", "_by_key", "_by_round", "spill_path", "_spilled")
+
+    def __init__(self, spill_path: Optional[Path] = None):
+        self.messages = []
+        self._by_key = {}
+        self._by_round = {}
+        self.spill_path = spill_path
+        self._spilled = {}
+
+    def add(self, message: Message) -> Message:
+        self.messages.append(message)
+        self._by_key[(message.round, message.role)] = message
+        self._by_round.setdefault(message.round, []).append(message)
+        return message
+
+    def __iter__(self) -> Iterator[Message]:
+        for round_num in self.rounds():
+            yield from self.round_messages(round_num)
+        yield from self._by_round.get(None, [])
+
+    def __len__(self) -> int:
+        return len(self.messages) + sum(count for _, _, count in self._spilled.values())
+
+    def get(self, round: Optional[int], role: str) -> Optional[Message]:
+        if round in self._spilled:
+            return next((m for m in self._load(round) if m.role == role), None)
+        return self._by_key.get((round, role))
+
+    def round_messages(self, round: int) -> list[Message]:
+        if round in self._spilled:
+            return self._load(round)
+        return self._by_round.get(round, [])
+
+    def rounds(self) -> list[int]:
+        return sorted(r for r in (*self._by_round, *self._spilled) if r is not None)
+
+    def spill(self, keep_from: int) -> None:
+        """Move every in-memory round before keep_from to the spill file."""
+        rounds = [r for r in self._by_round if r is not None and r < keep_from]
+        if not rounds or self.spill_path is None:
+            return
+        with open(self.spill_path, "ab") as f:
+            for round_num in rounds:
+                messages = self._by_round.pop(round_num)
+                offset = f.tell()
+                for m in messages:
+                    f.write(json.dumps(m.to_dict()).encode() + b"\n")
+                    del self._by_key[(round_num, m.role)]
+                self._spilled[round_num] = (offset, f.tell() - offset, len(messages))
+        self.messages = [m for m in self.messages if m.round not in self._spilled]
+
+    def _load(self, round: int) -> list[Message]:
+        offset, size, _ = self._spilled[round]
+        with open(self.spill_path, "rb") as f:
+            f.seek(offset)
+            lines = f.read(size).splitlines()
+        return [Message.from_dict(round, json.loads(line)) for line in lines]
+
+    def close(self) -> None:
+        """Delete the spill file, if any."""
+        if self.spill_path is not None:
+            self.spill_path.unlink(missing_ok=True)
+
+    def render_round(self, round: int) -> str:
+        """Legacy round string: bare text for one agent, role-headed sections otherwise."""
+        messages = self.round_messages(round)
+        if len(messages) == 1:
+            return messages[0].text
+        return "\n\n".join(f"{m.role.upper()}:\n{m.text}" for m in messages)
+
+    def round_outputs(self) -> list[str]:
+        """Legacy round strings for every round, e.g. for the judge's debate history."""
+        return [self.render_round(r) for r in self.rounds()]
+
+    def round_dict(self, round: int, duration: float) -> dict:
+        """Results-file record for one round."""
+        return {
+            "round": round,
+            "duration": duration,
+            "messages": [m.to_dict() for m in self.round_messages(round)],
+        }
+
+    @classmethod
+    def from_results(cls, data: dict) -> "Transcript":
+        """Build a transcript from a results dict in either the message or legacy format."""
+        transcript = cls()
+        for i, round_data in enumerate(data.get("rounds", []), 1):
+            round_num = round_data.get("round", i)
+            if "messages" in round_data:
+                for message in round_data["messages"]:
+                    transcript.add(Message.from_dict(round_num, message))
+            else:
+                for role, text in parse_legacy_round(round_data.get("output", "")):
+                    transcript.add(Message(round_num, role, text))
+        if "final_verdict" in data:
+            judgment = data.get("judgment", {})
+            transcript.add(Message.from_dict(None, {**judgment, "role": "Judge", "text": data["final_verdict"]}))
+        return transcript
+
+
+def parse_legacy_round(output: str) -> list[tuple[str, str]]:
+    """Split a legacy concatenated round string into (role, text) pairs."""
+    headers = list(LEGACY_HEADER.finditer(output))
+    if not headers or headers[0].start() != 0:
+        return [("Researcher", output)]
+    sections = []
+    for header, following in zip(headers, headers[1:] + [None]):
+        end = following.start() if following else len(output)
+        sections.append((LEGACY_ROLES[header.group(1)], output[header.end():end]))
+    return sections
+